@@ -0,0 +1,100 @@
+import numpy as np
+
+
+def trace_columns(trace):
+    """Column names for a worker trace dict: time, x, y1, y2 if it has one, then any extra columns.
+
+    `extra_columns` maps further column names to labels; they are recorded
+    and saved but not plotted.
+    """
+    columns = ["time", "x", "y1"]
+    if "y2_label" in trace:
+        columns.append("y2")
+    columns.extend(trace.get("extra_columns", {}))
+    return columns
+
+
+class AcquisitionBuffer:
+    """Array-backed store for acquired samples, one float64 column per channel.
+
+    Columns are kept contiguous so column() returns a view without copying.
+    By default the capacity doubles as samples arrive; with `max_points` set
+    the buffer is a ring that keeps only the newest samples. The ring is
+    mirrored (every sample is written twice, `max_points` apart) so the
+    retained window is always one contiguous slice and still zero-copy.
+    """
+
+    def __init__(self, columns=("time", "x", "y"), capacity=1024, max_points=None):
+        self.columns = tuple(columns)
+        self._index = {name: i for i, name in enumerate(self.columns)}
+        self.max_points = max_points
+        if max_points:
+            self._data = np.full((len(self.columns), 2 * max_points), np.nan)
+        else:
+            self._data = np.full((len(self.columns), max(capacity, 1)), np.nan)
+        self._written = 0
+
+    def __len__(self):
+        if self.max_points:
+            return min(self._written, self.max_points)
+        return self._written
+
+    @property
+    def total_written(self):
+        """Samples appended since creation, including any dropped by the ring."""
+        return self._written
+
+    def clear(self):
+        self._written = 0
+
+    def extend(self, rows):
+        """Append rows of values in column order; None becomes NaN."""
+        if len(rows) == 0:
+            return
+        block = np.array(rows, dtype=np.float64).reshape(-1, len(self.columns)).T
+        if self.max_points:
+            self._extend_ring(block)
+        else:
+            self._extend_growing(block)
+
+    def append(self, row):
+        self.extend([row])
+
+    def _extend_growing(self, block):
+        n = block.shape[1]
+        needed = self._written + n
+        if needed > self._data.shape[1]:
+            capacity = max(needed, 2 * self._data.shape[1])
+            grown = np.full((len(self.columns), capacity), np.nan)
+            grown[:, :self._written] = self._data[:, :self._written]
+            self._data = grown
+        self._data[:, self._written:needed] = block
+        self._written = needed
+
+    def _extend_ring(self, block):
+        size = self.max_points
+        if block.shape[1] > size:
+            self._written += block.shape[1] - size
+            block = block[:, -size:]
+        pos = (self._written + np.arange(block.shape[1])) % size
+        self._data[:, pos] = block
+        self._data[:, pos + size] = block
+        self._written += block.shape[1]
+
+    def _window(self):
+        n = len(self)
+        start = (self._written - n) % self.max_points if self.max_points else 0
+        return start, start + n
+
+    def column(self, name):
+        """Zero-copy view of one column's retained samples."""
+        start, stop = self._window()
+        return self._data[self._index[name], start:stop]
+
+    def has_column(self, name):
+        return name in self._index
+
+    def as_array(self):
+        """View of all retained samples, shape (len(columns), n)."""
+        start, stop = self._window()
+        return self._data[:, start:stop]
@@ -0,0 +1,87 @@
+import time
+from collections import namedtuple
+
+
+# index: sample number; scheduled/actual: seconds since the scheduler started
+SampleTick = namedtuple("SampleTick", "index scheduled actual")
+
+
+class AcquisitionScheduler:
+    """Drift-free sample clock for timed acquisitions.
+
+    Deadlines sit on a fixed grid (start + slot * interval) measured with
+    time.perf_counter_ns, so measurement latency never accumulates. Each wait
+    sleeps coarsely until `spin` seconds before the deadline and then spins,
+    which keeps jitter low without burning a core. If a measurement overruns
+    into later slots those slots are counted as missed and skipped rather
+    than bunched up.
+    """
+
+    def __init__(self, interval, spin=0.002, stop_check=None):
+        self.interval_ns = max(int(interval * 1e9), 0)
+        self.spin_ns = int(spin * 1e9)
+        self.stop_check = stop_check
+        # running jitter statistics, so a long run keeps no per-sample history
+        self.samples = 0
+        self.jitter_total = 0.0
+        self.jitter_max = 0.0
+        self.missed = 0
+
+    def ticks(self, count=None, duration=None):
+        """Yield a SampleTick at each deadline.
+
+        Stops after `count` grid slots (sampled or missed), once `duration`
+        seconds have elapsed, or when stop_check returns True.
+        """
+        duration_ns = None if duration is None else int(duration * 1e9)
+        start = time.perf_counter_ns()
+        slot = 0
+        index = 0
+        while count is None or slot < count:
+            deadline = start + slot * self.interval_ns
+            if duration_ns is not None and deadline - start >= duration_ns:
+                return
+            if not self._wait_until(deadline):
+                return
+
+            now = time.perf_counter_ns()
+            if duration_ns is not None and now - start >= duration_ns:
+                return
+            if self.interval_ns and now - deadline >= self.interval_ns:
+                skipped = (now - deadline) // self.interval_ns
+                self.missed += skipped
+                slot += skipped
+                deadline += skipped * self.interval_ns
+                if count is not None and slot >= count:
+                    return
+
+            jitter = (now - deadline) / 1e9
+            self.samples += 1
+            self.jitter_total += jitter
+            self.jitter_max = max(self.jitter_max, jitter)
+            yield SampleTick(index, (deadline - start) / 1e9, (now - start) / 1e9)
+            index += 1
+            slot += 1
+
+    def _wait_until(self, deadline):
+        while True:
+            if self.stop_check is not None and self.stop_check():
+                return False
+            remaining = deadline - time.perf_counter_ns()
+            if remaining <= 0:
+                return True
+            if remaining > self.spin_ns:
+                time.sleep(min((remaining - self.spin_ns) / 1e9, 0.05))
+            else:
+                while time.perf_counter_ns() < deadline:
+                    pass
+                return True
+
+    def summary(self):
+        """One-line report of samples taken, missed deadlines and jitter."""
+        if not self.samples:
+            return f"0 samples, {self.missed} missed deadlines"
+        mean_ms = 1000 * self.jitter_total / self.samples
+        max_ms = 1000 * self.jitter_max
+        return (f"{self.samples} samples, {self.missed} missed deadlines, "
+                f"jitter mean {mean_ms:.3f} ms / max {max_ms:.3f} ms")
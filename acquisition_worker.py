@@ -0,0 +1,110 @@
+import time
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from acquisition_buffer import trace_columns
+
+
+class AcquisitionWorker(QThread):
+    """Run an experiment off the GUI thread.
+
+    `experiment` is a callable taking the worker and returning an iterable.
+    Tuples it yields are data points; they are stamped with the seconds since
+    the run started (perf_counter) and reach the GUI in batches through
+    points_ready as (t, x, y1[, y2]) rows. Dicts describe a new plot trace
+    (labels, title) and are sent through trace_started once any pending
+    points have been flushed. Lists are blocks of points read in one
+    transfer (e.g. from an instrument buffer); they are stamped the same way
+    and delivered at once instead of waiting for the next batch interval.
+
+    If a StreamRecorder is given, every batch is also handed to it from this
+    thread and the recorder is closed when the run ends.
+    """
+
+    points_ready = pyqtSignal(list)
+    trace_started = pyqtSignal(dict)
+    status_changed = pyqtSignal(str)
+    failed = pyqtSignal(str)
+
+    def __init__(self, experiment, batch_interval=1 / 60, recorder=None, parent=None):
+        super().__init__(parent)
+        self.experiment = experiment
+        self.batch_interval = batch_interval
+        self.recorder = recorder
+        # Set by the experiment for a short report appended to the final status
+        self.summary = ""
+        # perf_counter() at the start of run(); point timestamps are relative to it
+        self.started_at = None
+        self._stop_requested = False
+
+    def stop(self):
+        self._stop_requested = True
+
+    def should_stop(self):
+        return self._stop_requested
+
+    def sleep(self, seconds):
+        """Sleep in short slices so a stop request is honoured promptly.
+
+        Returns False if the wait was cut short by stop().
+        """
+        deadline = time.perf_counter() + seconds
+        while not self._stop_requested:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return True
+            time.sleep(min(remaining, 0.05))
+        return False
+
+    def _emit(self, batch):
+        if self.recorder is not None:
+            self.recorder.write(batch)
+        self.points_ready.emit(batch)
+
+    def run(self):
+        batch = []
+        start = last_emit = self.started_at = time.perf_counter()
+        points = None
+        try:
+            points = iter(self.experiment(self))
+            for item in points:
+                now = time.perf_counter()
+                if isinstance(item, dict):
+                    if batch:
+                        self._emit(batch)
+                        batch = []
+                    if self.recorder is not None:
+                        self.recorder.begin_trace(item, trace_columns(item))
+                    self.trace_started.emit(item)
+                elif isinstance(item, list):
+                    batch.extend((now - start,) + tuple(point) for point in item)
+                    self._emit(batch)
+                    batch = []
+                    last_emit = now
+                else:
+                    batch.append((now - start,) + tuple(item))
+
+                if batch and now - last_emit >= self.batch_interval:
+                    self._emit(batch)
+                    batch = []
+                    last_emit = now
+
+                if self._stop_requested:
+                    break
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            # Run the experiment's own cleanup (output off etc.) on this thread.
+            close = getattr(points, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception as e:
+                    self.failed.emit(str(e))
+            if batch:
+                self._emit(batch)
+            if self.recorder is not None:
+                try:
+                    self.recorder.close()
+                except Exception as e:
+                    self.failed.emit(f"Recording to {self.recorder.path} failed: {e}")
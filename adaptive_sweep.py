@@ -0,0 +1,90 @@
+import numpy as np
+
+
+class AdaptiveSweep:
+    """Coarse-to-fine sampling of a response over [start, stop] within a point budget.
+
+    The sweep starts with `initial_points` evenly spaced values (in log10 if
+    `log`) and then bisects the intervals where the measured response
+    changes or bends the most. With x and every channel scaled to the range
+    seen so far, an interval's score is the largest of the change across it
+    and the deviation of its end points from the straight line through
+    their neighbours; intervals scoring above `threshold` are split at
+    their midpoint, worst first. Refinement stops when nothing scores above
+    the threshold, `max_points` have been measured, or intervals reach
+    `resolution` (a fraction of the full span).
+
+    Use it as an ask/tell loop: measure every value of each batch from
+    batches() and report it with add() before asking for the next batch.
+    """
+
+    def __init__(self, start, stop, initial_points=11, max_points=101, threshold=0.05,
+                 log=False, resolution=1e-3):
+        if log and (start <= 0 or stop <= 0):
+            raise ValueError("Log spacing needs positive start and stop values")
+        if initial_points < 2:
+            raise ValueError("An adaptive sweep needs at least 2 initial points")
+        self.start = start
+        self.stop = stop
+        self.initial_points = initial_points
+        self.max_points = max(max_points, initial_points)
+        self.threshold = threshold
+        self.log = log
+        self.resolution = resolution
+        self.x = []
+        self.values = []
+
+    def _to_u(self, x):
+        return np.log10(x) if self.log else np.asarray(x, dtype=float)
+
+    def _from_u(self, u):
+        return 10.0 ** u if self.log else u
+
+    def add(self, x, values):
+        """Record the measured channel values (a number or a tuple) at x."""
+        if np.isscalar(values) or values is None:
+            values = (values,)
+        self.x.append(float(x))
+        self.values.append([np.nan if v is None else float(v) for v in values])
+
+    def batches(self):
+        """Yield arrays of x values to measure: the coarse grid, then each refinement."""
+        u0, u1 = self._to_u(self.start), self._to_u(self.stop)
+        batch = self._from_u(np.linspace(u0, u1, self.initial_points))
+        while len(batch):
+            yield batch
+            batch = self.refine()
+
+    def refine(self):
+        """x values of the next refinement pass (ascending), or an empty array when done."""
+        remaining = self.max_points - len(self.x)
+        if remaining <= 0 or len(self.x) < 2:
+            return np.array([])
+
+        order = np.argsort(self.x)
+        u_measured = self._to_u(np.array(self.x)[order])
+        y = np.array(self.values, dtype=float)[order]
+        span = u_measured[-1] - u_measured[0]
+        if span == 0:
+            return np.array([])
+        u = (u_measured - u_measured[0]) / span
+        scale = np.nanmax(y, axis=0) - np.nanmin(y, axis=0)
+        scale[~(scale > 0)] = 1.0
+        y = np.nan_to_num(y / scale)
+
+        # Change across each interval and each point's distance from the chord of its neighbours
+        change = np.abs(np.diff(y, axis=0))
+        bend = np.zeros_like(y)
+        if len(u) > 2:
+            weight = ((u[1:-1] - u[:-2]) / (u[2:] - u[:-2]))[:, None]
+            chord = y[:-2] + (y[2:] - y[:-2]) * weight
+            bend[1:-1] = np.abs(y[1:-1] - chord)
+        score = np.maximum(change, np.maximum(bend[:-1], bend[1:])).max(axis=1)
+
+        width = np.diff(u)
+        candidates = np.flatnonzero((score > self.threshold) & (width > 2 * self.resolution))
+        if candidates.size == 0:
+            return np.array([])
+        worst = candidates[np.argsort(score[candidates])[::-1]][:remaining]
+        midpoints = u[worst] + width[worst] / 2
+        return np.sort(self._from_u(u_measured[0] + midpoints * span))
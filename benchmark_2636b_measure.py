@@ -0,0 +1,56 @@
+"""Readings/s of Keithley2636B.measure: legacy flush-and-sleep vs framed query.
+
+Runs against the simulated 2636B with a fixed bus latency, so it needs no
+hardware:
+
+    python benchmark_2636b_measure.py --readings 20 --latency 0.002
+"""
+import argparse
+import time
+
+import pyvisa as visa
+
+from keithley_2636B import Keithley2636B
+from simulated_instruments import SIM_ADDRESSES, SimulatedResourceManager
+
+
+def legacy_measure(smu, channel="smua"):
+    """The pre-framing protocol: discard buffer, sleep 0.3 s, then query."""
+    smu.flush(visa.constants.VI_READ_BUF_DISCARD)
+    time.sleep(0.3)
+    return float(smu.query(f"print({channel}.measure.i())").strip())
+
+
+def readings_per_second(measure, readings):
+    start = time.perf_counter()
+    for _ in range(readings):
+        measure()
+    return readings / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readings", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.002,
+                        help="simulated bus round-trip in seconds")
+    parser.add_argument("--nplc", type=float, default=0.01,
+                        help="integration time of each simulated reading")
+    args = parser.parse_args()
+
+    keithley = Keithley2636B(rm=SimulatedResourceManager(latency=args.latency))
+    keithley.smu = keithley.rm.open_resource(SIM_ADDRESSES["Keithley2636B"])
+    keithley.smu.write(f"smua.measure.nplc = {args.nplc}")
+
+    before = readings_per_second(
+        lambda: legacy_measure(keithley.smu), args.readings)
+    after = readings_per_second(
+        lambda: keithley.measure("Current"), args.readings)
+
+    print(f"Bus latency:          {args.latency * 1000:.1f} ms")
+    print(f"Legacy flush + sleep: {before:8.1f} readings/s")
+    print(f"Framed query:         {after:8.1f} readings/s")
+    print(f"Speed-up:             {after / before:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
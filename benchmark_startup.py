@@ -0,0 +1,82 @@
+"""Cold-start benchmark for the GUI.
+
+Each run launches a fresh interpreter that imports nplcgui, builds the main
+window and shows it, and reports when each stage finished, measured from
+the moment the process was launched:
+
+  imports   nplcgui and its dependencies imported (QApplication created)
+  built     InstrumentControlGUI constructed
+  shown     window shown and the first events processed
+  plot      matplotlib loaded and the plot canvas created
+
+    python benchmark_startup.py
+    python benchmark_startup.py --runs 10 --budget 0.8
+
+With --budget the exit status is 1 if the median time to "shown" exceeds it.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+STAGES = ("imports", "built", "shown", "plot")
+
+
+def child(launched):
+    """Run in the launched interpreter: start the GUI and print stage times as JSON."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication(sys.argv[:1])
+    import nplcgui
+    times = {"imports": time.time() - launched}
+    gui = nplcgui.InstrumentControlGUI()
+    times["built"] = time.time() - launched
+    gui.show()
+    app.processEvents()
+    times["shown"] = time.time() - launched
+    gui.init_plot()
+    times["plot"] = time.time() - launched
+    print(json.dumps(times))
+
+
+def run_once():
+    launched = time.time()
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", repr(launched)],
+        capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=None,
+                        help="fail if the median time to a shown window exceeds this (s)")
+    parser.add_argument("--child", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        child(args.child)
+        return 0
+
+    runs = [run_once() for _ in range(args.runs)]
+    print(f"{'stage':<10}{'median s':>10}{'max s':>10}")
+    for stage in STAGES:
+        values = sorted(run[stage] for run in runs)
+        print(f"{stage:<10}{values[len(values) // 2]:>10.3f}{values[-1]:>10.3f}")
+
+    if args.budget is not None:
+        shown = sorted(run["shown"] for run in runs)[len(runs) // 2]
+        if shown > args.budget:
+            print(f"Window took {shown:.3f} s to appear (budget {args.budget:.3f} s)")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
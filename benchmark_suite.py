@@ -0,0 +1,375 @@
+"""Throughput benchmark for every start_sweep experiment on simulated instruments.
+
+Each experiment is run headless through the real GUI: the instruments are
+connected with the Connect buttons' handlers against a
+SimulatedResourceManager, the experiment is picked from the experiment list
+and started with start_sweep, exactly as the Start button does. Reported
+per experiment:
+
+  points/s        points delivered to the GUI per second of run time
+  latency         acquisition-to-GUI delay of each point (p50 / p95 / max)
+  frame           interval between ticks of a 16 ms GUI timer (p50 / p95 / max),
+                  i.e. how responsive the event loop stays during the run
+
+    python benchmark_suite.py
+    python benchmark_suite.py --save baseline.json
+    python benchmark_suite.py --baseline baseline.json --tolerance 0.2
+
+With --baseline the exit status is 1 if any experiment got slower than the
+tolerance allows, so it can run as a regression check.
+"""
+import argparse
+import json
+import os
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+from PyQt5.QtCore import QEventLoop, QTimer
+from PyQt5.QtWidgets import QApplication, QMessageBox
+
+from nplcgui import InstrumentControlGUI
+from simulated_instruments import SimulatedResourceManager
+
+
+# The experiments dispatched by start_sweep, with small parameter sets so the
+# whole suite runs in a few minutes. "settings" maps GUI widget attributes to
+# the text (or checked state) entered before starting.
+BENCHMARKS = [
+    {"label": "IV Sweep", "experiment": "IV Sweep", "instruments": ["Keithley"],
+     "settings": {"start_v_input": "0", "stop_v_input": "1", "steps_input": "50",
+                  "delay_input": "0", "nplc_input": "0.1"}},
+    {"label": "IV Sweep + LakeShore", "experiment": "IV Sweep",
+     "instruments": ["Keithley", "LakeShore"],
+     "settings": {"start_v_input": "0", "stop_v_input": "1", "steps_input": "50",
+                  "delay_input": "0", "nplc_input": "0.1", "temp_input": "21.85",
+                  "stability_window_input": "1"}},
+    {"label": "IV Sweep + LakeShore (3 setpoints)", "experiment": "IV Sweep",
+     "instruments": ["Keithley", "LakeShore"],
+     "settings": {"start_v_input": "0", "stop_v_input": "1", "steps_input": "20",
+                  "delay_input": "0", "nplc_input": "0.1", "temp_series_input": "20:24:2",
+                  "stability_window_input": "1"}},
+    {"label": "Temperature Dependent IV (both SMUs)",
+     "experiment": "Temperature Dependent IV",
+     "instruments": ["Keithley", "Keithley2450", "LakeShore"],
+     "settings": {"start_v_input": "0", "stop_v_input": "1", "steps_input": "10",
+                  "delay_input": "0", "nplc_input": "0.1", "k2450_steps_input": "10",
+                  "k2450_nplc_input": "0.1", "temp_series_input": "20, 22",
+                  "stability_window_input": "1"}},
+    {"label": "Temperature Ramp", "experiment": "Temperature Ramp",
+     "instruments": ["Keithley", "LakeShore"],
+     "settings": {"temp_input": "21.85", "ramp_stop_input": "23.85", "ramp_rate_input": "60",
+                  "ramp_interval_input": "0.02", "stability_window_input": "1"}},
+    {"label": "IV Sweep (TSP)", "experiment": "IV Sweep", "instruments": ["Keithley"],
+     "settings": {"start_v_input": "0", "stop_v_input": "1", "steps_input": "50",
+                  "delay_input": "0", "nplc_input": "0.1", "tsp_sweep_checkbox": True}},
+    {"label": "IV Sweep (adaptive)", "experiment": "IV Sweep", "instruments": ["Keithley"],
+     "settings": {"start_v_input": "-1", "stop_v_input": "1", "steps_input": "11",
+                  "delay_input": "0", "nplc_input": "0.1", "adaptive_sweep_checkbox": True,
+                  "adaptive_max_points_input": "50"}},
+    {"label": "IV Sweep 2450", "experiment": "IV Sweep 2450", "instruments": ["Keithley2450"],
+     "settings": {"k2450_start_input": "0", "k2450_stop_input": "1", "k2450_steps_input": "20",
+                  "k2450_nplc_input": "0.1"}},
+    {"label": "IV Sweep 2450 (buffered, binary)", "experiment": "IV Sweep 2450",
+     "instruments": ["Keithley2450"],
+     "settings": {"k2450_start_input": "0", "k2450_stop_input": "1", "k2450_steps_input": "20",
+                  "k2450_nplc_input": "0.1", "k2450_buffered_checkbox": True,
+                  "k2450_binary_checkbox": True}},
+    {"label": "IV Sweep 2450 (adaptive, buffered)", "experiment": "IV Sweep 2450",
+     "instruments": ["Keithley2450"],
+     "settings": {"k2450_start_input": "-1", "k2450_stop_input": "1", "k2450_steps_input": "11",
+                  "k2450_nplc_input": "0.1", "k2450_buffered_checkbox": True,
+                  "k2450_adaptive_checkbox": True, "k2450_adaptive_max_points_input": "50"}},
+    {"label": "Pulse IV Sweep", "experiment": "Pulse IV Sweep", "instruments": ["Keithley"],
+     "settings": {"start_v_input": "0", "stop_v_input": "1", "steps_input": "20"}},
+    {"label": "Time Logging", "experiment": "Time Logging", "instruments": ["Keithley"],
+     "settings": {"interval_input": "20", "total_time_input": "2000", "nplc_input": "0.1"}},
+    {"label": "Time Logging (last 50 points)", "experiment": "Time Logging",
+     "instruments": ["Keithley"],
+     "settings": {"interval_input": "20", "total_time_input": "2000", "nplc_input": "0.1",
+                  "memory_points_input": "50"}},
+    {"label": "Time Logging 2450", "experiment": "Time Logging 2450",
+     "instruments": ["Keithley2450"],
+     "settings": {"interval_input": "20", "total_time_input": "2000",
+                  "k2450_nplc_input": "0.1"}},
+    {"label": "Temperature Stabilization", "experiment": "Temperature Stabilization",
+     "instruments": ["LakeShore"],
+     "settings": {"temp_input": "22.85", "stability_window_input": "1"}},
+    {"label": "Temperature Stabilization 325", "experiment": "Temperature Stabilization 325",
+     "instruments": ["LakeShore325"], "settings": {"l325_temp_input": "22.85"}},
+    {"label": "Harmonic Detection", "experiment": "Harmonic Detection", "instruments": ["LockIn"],
+     "settings": {"lockin_harmonics_input": "10"}},
+    {"label": "AC Signal Measurement", "experiment": "AC Signal Measurement",
+     "instruments": ["LockIn"],
+     "settings": {"lockin_duration_input": "2", "lockin_interval_input": "0.02"}},
+    {"label": "AC Signal Measurement (SR830 buffer)", "experiment": "AC Signal Measurement",
+     "instruments": ["LockIn"],
+     "settings": {"lockin_duration_input": "2", "lockin_interval_input": "0.002",
+                  "lockin_buffered_checkbox": True}},
+    {"label": "AC I-V Measurement (2636B)", "experiment": "AC I-V Measurement (2636B)",
+     "instruments": ["Keithley", "LockIn"],
+     "settings": {"ac_start_input": "0", "ac_stop_input": "1", "ac_steps_input": "10"}},
+    {"label": "AC I-V Measurement (2450)", "experiment": "AC I-V Measurement (2450)",
+     "instruments": ["Keithley2450", "LockIn"],
+     "settings": {"ac_start_input": "0", "ac_stop_input": "1", "ac_steps_input": "10"}},
+    {"label": "Temperature Dependent AC I-V (2636B)",
+     "experiment": "Temperature Dependent AC I-V (2636B)",
+     "instruments": ["Keithley", "LockIn", "LakeShore"],
+     "settings": {"ac_start_input": "0", "ac_stop_input": "1", "ac_steps_input": "10"}},
+    {"label": "Temperature Dependent AC I-V (2450)",
+     "experiment": "Temperature Dependent AC I-V (2450)",
+     "instruments": ["Keithley2450", "LockIn", "LakeShore"],
+     "settings": {"ac_start_input": "0", "ac_stop_input": "1", "ac_steps_input": "10"}},
+    {"label": "Frequency Sweep", "experiment": "Frequency Sweep", "instruments": ["LockIn"],
+     "settings": {"lockin_freq_start_input": "100", "lockin_freq_stop_input": "1000",
+                  "lockin_freq_interval_input": "100"}},
+    {"label": "Frequency Sweep (log)", "experiment": "Frequency Sweep", "instruments": ["LockIn"],
+     "settings": {"lockin_freq_start_input": "1", "lockin_freq_stop_input": "100000",
+                  "lockin_freq_spacing_select": "Log", "lockin_freq_points_input": "51",
+                  "lockin_sens_select": "18"}},
+    {"label": "Frequency Sweep (log, auto sensitivity)", "experiment": "Frequency Sweep",
+     "instruments": ["LockIn"],
+     "settings": {"lockin_freq_start_input": "1", "lockin_freq_stop_input": "100000",
+                  "lockin_freq_spacing_select": "Log", "lockin_freq_points_input": "51",
+                  "lockin_autorange_checkbox": True}},
+    {"label": "Frequency Sweep (adaptive)", "experiment": "Frequency Sweep",
+     "instruments": ["LockIn"],
+     "settings": {"lockin_freq_start_input": "1", "lockin_freq_stop_input": "100000",
+                  "lockin_freq_spacing_select": "Adaptive", "lockin_freq_points_input": "11",
+                  "lockin_freq_max_points_input": "51", "lockin_sens_select": "18"}},
+    {"label": "Impedance vs Time", "experiment": "Impedance vs Time", "instruments": ["LockIn"],
+     "settings": {"imp_duration_input": "2", "imp_interval_input": "0.02"}},
+    {"label": "Impedance vs Time (SR830 buffer)", "experiment": "Impedance vs Time",
+     "instruments": ["LockIn"],
+     "settings": {"imp_duration_input": "2", "imp_interval_input": "0.002",
+                  "lockin_buffered_checkbox": True}},
+    {"label": "AC I-V Measurement (Lock-in Only)",
+     "experiment": "AC I-V Measurement (Lock-in Only)", "instruments": ["LockIn"],
+     "settings": {"ac_start_input": "0", "ac_stop_input": "1", "ac_steps_input": "10"}},
+]
+
+CONNECT_HANDLERS = {
+    "Keithley": "connect_keithley",
+    "Keithley2450": "connect_keithley_2450",
+    "LakeShore": "connect_lakeshore",
+    "LakeShore325": "connect_lakeshore325",
+    "LockIn": "connect_lockin",
+}
+
+
+class MessageLog:
+    """Replaces the modal QMessageBox helpers so nothing blocks a headless run."""
+
+    def __init__(self):
+        self.messages = []
+
+    def install(self):
+        for kind in ("information", "warning", "critical"):
+            setattr(QMessageBox, kind, staticmethod(self._recorder(kind)))
+
+    def _recorder(self, kind):
+        def record(parent, title, text, *args, **kwargs):
+            self.messages.append((kind, title, text))
+            return QMessageBox.Ok
+        return record
+
+    def since(self, index, kind):
+        return [text for k, _, text in self.messages[index:] if k == kind]
+
+
+def percentiles(values, scale=1000.0):
+    """(p50, p95, max) of `values` in milliseconds, or None if empty."""
+    if len(values) == 0:
+        return None
+    values = np.asarray(values) * scale
+    return (float(np.percentile(values, 50)), float(np.percentile(values, 95)),
+            float(values.max()))
+
+
+def set_widget(widget, value):
+    if isinstance(value, bool):
+        widget.setChecked(value)
+    elif hasattr(widget, "setCurrentText"):
+        widget.setCurrentText(value)
+    else:
+        widget.setText(value)
+
+
+def run_benchmark(spec, rm, log, timeout):
+    """Run one experiment through the GUI and return its result dict."""
+    result = {"label": spec["label"], "experiment": spec["experiment"], "error": None}
+    gui = InstrumentControlGUI(rm=rm)
+    try:
+        for name in spec["instruments"]:
+            first = len(log.messages)
+            getattr(gui, CONNECT_HANDLERS[name])()
+            errors = log.since(first, "critical")
+            if errors:
+                result["error"] = f"connecting {name}: {errors[-1]}"
+                return result
+            gui.instrument_checkboxes[name].setChecked(True)
+        gui.update_experiment_types()
+
+        index = gui.experiment_select.findText(spec["experiment"])
+        if index < 0:
+            result["error"] = "not offered in the experiment list"
+            return result
+        gui.experiment_select.setCurrentIndex(index)
+        for attribute, value in spec["settings"].items():
+            set_widget(getattr(gui, attribute), value)
+
+        # Record every batch as it reaches the GUI thread.
+        received = []
+        deliver = gui.on_points_ready
+
+        def on_points_ready(rows):
+            now = time.perf_counter()
+            received.append((now, rows))
+            deliver(rows)
+        gui.on_points_ready = on_points_ready
+
+        frames = []
+        probe = QTimer()
+        probe.setInterval(16)
+        probe.timeout.connect(lambda: frames.append(time.perf_counter()))
+
+        first = len(log.messages)
+        previous_worker = gui.worker
+        gui.start_sweep()
+        worker = gui.worker
+        if worker is None or worker is previous_worker:
+            messages = log.since(first, "critical") + log.since(first, "information")
+            result["error"] = messages[-1] if messages else "experiment did not start"
+            return result
+
+        loop = QEventLoop()
+        worker.finished.connect(loop.quit)
+        watchdog = QTimer()
+        watchdog.setSingleShot(True)
+        watchdog.timeout.connect(loop.quit)
+        watchdog.start(int(timeout * 1000))
+        probe.start()
+        if not worker.isFinished():
+            loop.exec_()
+        probe.stop()
+        if worker.isRunning():
+            worker.stop()
+            worker.wait()
+            result["error"] = f"timed out after {timeout:.0f} s"
+        # Let the queued finished/points signals reach the GUI.
+        QApplication.processEvents()
+
+        errors = log.since(first, "critical")
+        if errors and result["error"] is None:
+            result["error"] = errors[-1]
+
+        points = sum(len(rows) for _, rows in received)
+        # run time = start of the run until the last batch reached the GUI
+        duration = max((t - worker.started_at for t, _ in received), default=0.0)
+        latency = [t - (worker.started_at + row[0]) for t, rows in received for row in rows]
+        result.update({
+            "points": points,
+            "duration_s": duration,
+            "points_per_s": points / duration if duration > 0 else 0.0,
+            "latency_ms": percentiles(latency),
+            "frame_ms": percentiles(np.diff(frames)) if len(frames) > 1 else None,
+        })
+        return result
+    finally:
+        gui.temperature_monitor.stop()
+        gui.deleteLater()
+        QApplication.processEvents()
+
+
+def format_triplet(values):
+    if values is None:
+        return "-"
+    return "{:.1f} / {:.1f} / {:.1f}".format(*values)
+
+
+def print_table(results):
+    print(f"{'experiment':40s} {'points':>7s} {'points/s':>9s}  "
+          f"{'latency ms p50/p95/max':>24s}  {'frame ms p50/p95/max':>22s}")
+    for r in results:
+        error = (r["error"] or "").replace("\n", " ")
+        if "points" not in r:
+            print(f"{r['label']:40s} FAILED: {error}")
+            continue
+        print(f"{r['label']:40s} {r['points']:7d} {r['points_per_s']:9.1f}  "
+              f"{format_triplet(r['latency_ms']):>24s}  {format_triplet(r['frame_ms']):>22s}")
+        if error:
+            print(f"{'':40s} error: {error}")
+
+
+def find_regressions(results, baseline, tolerance):
+    """Experiments whose points/s dropped, or frame p95 grew, by more than `tolerance`."""
+    reference = {r["label"]: r for r in baseline}
+    regressions = []
+    for r in results:
+        old = reference.get(r["label"])
+        if old is None or "points" not in old:
+            continue
+        if "points" not in r:
+            regressions.append(f"{r['label']}: now fails ({r['error']})")
+            continue
+        if r["points_per_s"] < old["points_per_s"] * (1 - tolerance):
+            regressions.append(
+                f"{r['label']}: {r['points_per_s']:.1f} points/s, baseline {old['points_per_s']:.1f}")
+        if r["frame_ms"] and old["frame_ms"] and r["frame_ms"][1] > old["frame_ms"][1] * (1 + tolerance) + 2.0:
+            regressions.append(
+                f"{r['label']}: frame p95 {r['frame_ms'][1]:.1f} ms, baseline {old['frame_ms'][1]:.1f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.002,
+                        help="simulated bus round-trip in seconds")
+    parser.add_argument("--noise", type=float, default=1e-3,
+                        help="relative noise of simulated readings")
+    parser.add_argument("--temperature-tau", type=float, default=0.5,
+                        help="time constant of the simulated cryostat in seconds")
+    parser.add_argument("--timeout", type=float, default=120.0,
+                        help="per-experiment time limit in seconds")
+    parser.add_argument("--only", action="append", metavar="LABEL",
+                        help="run only this benchmark (repeatable)")
+    parser.add_argument("--save", metavar="JSON", help="write the results to a file")
+    parser.add_argument("--baseline", metavar="JSON",
+                        help="compare with saved results and fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative slow-down against the baseline")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    log = MessageLog()
+    log.install()
+    rm = SimulatedResourceManager(latency=args.latency, noise=args.noise,
+                                  temperature_time_constant=args.temperature_tau)
+
+    specs = [s for s in BENCHMARKS if not args.only or s["label"] in args.only]
+    results = []
+    for spec in specs:
+        print(f"Running {spec['label']}...", flush=True)
+        results.append(run_benchmark(spec, rm, log, args.timeout))
+    print()
+    print_table(results)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  {line}")
+            raise SystemExit(1)
+        print("\nNo regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
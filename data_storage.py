@@ -0,0 +1,175 @@
+import json
+import os
+
+import numpy as np
+
+from stream_recorder import StreamRecorder
+
+# HDF5 is optional (.npz and .csv work without it) and slow to import, so
+# h5py is only loaded when an HDF5 file is first read or written
+h5py = None
+
+
+HDF5_EXTENSIONS = (".h5", ".hdf5")
+
+
+def _require_h5py():
+    global h5py
+    if h5py is not None:
+        return
+    try:
+        import h5py as module
+    except ImportError:
+        raise RuntimeError(
+            "HDF5 output needs h5py (pip install h5py); use a .npz file instead.")
+    h5py = module
+
+
+def _attr_value(value):
+    """h5py attributes take numbers and strings only."""
+    if value is None:
+        return ""
+    if isinstance(value, (bool, int, float, str, np.number)):
+        return value
+    return json.dumps(value)
+
+
+def _create_trace_group(h5file, name, columns, metadata, trace=None, chunk_rows=4096):
+    """Create a group with one resizable, chunked, gzip-compressed dataset per column."""
+    group = h5file.create_group(name)
+    for key, value in metadata.items():
+        group.attrs[key] = _attr_value(value)
+    for key, value in (trace or {}).items():
+        group.attrs[f"trace_{key}"] = _attr_value(value)
+    for column in columns:
+        group.create_dataset(column, shape=(0,), maxshape=(None,), dtype="f8",
+                             chunks=(chunk_rows,), compression="gzip", shuffle=True)
+    return group
+
+
+def _append_rows(group, columns, rows):
+    """Append an (n, len(columns)) block to the group's datasets."""
+    n = rows.shape[0]
+    for i, column in enumerate(columns):
+        dataset = group[column]
+        old = dataset.shape[0]
+        dataset.resize((old + n,))
+        dataset[old:] = rows[:, i]
+
+
+def save_hdf5(path, traces, metadata):
+    """Write (trace, AcquisitionBuffer) pairs to HDF5, one group per trace, with the metadata as attributes."""
+    _require_h5py()
+    with h5py.File(path, "w") as f:
+        for number, (trace, buffer) in enumerate(traces):
+            group = _create_trace_group(
+                f, f"trace_{number:03d}", buffer.columns, metadata, trace)
+            _append_rows(group, buffer.columns, buffer.as_array().T)
+
+
+def save_npz(path, traces, metadata):
+    """Write (trace, AcquisitionBuffer) pairs to a compressed .npz with JSON metadata.
+
+    A single trace keeps its plain column names; with several, each column
+    is stored as "trace_000/x", "trace_001/x", ... like the HDF5 groups.
+    """
+    arrays = {}
+    info = dict(metadata)
+    for number, (trace, buffer) in enumerate(traces):
+        prefix = "" if len(traces) == 1 else f"trace_{number:03d}/"
+        arrays.update({prefix + column: buffer.column(column) for column in buffer.columns})
+    if len(traces) == 1:
+        info["trace"] = traces[0][0]
+    else:
+        info["traces"] = [trace for trace, buffer in traces]
+    np.savez_compressed(path, metadata=np.array(json.dumps(info)), **arrays)
+
+
+def save_data(path, traces, metadata):
+    """Save (trace, AcquisitionBuffer) pairs to HDF5 or .npz depending on the file extension."""
+    if os.path.splitext(path)[1].lower() in HDF5_EXTENSIONS:
+        save_hdf5(path, traces, metadata)
+    else:
+        save_npz(path, traces, metadata)
+
+
+def load_data(path, trace=None):
+    """Load a file written by this module as (dict of column arrays, metadata).
+
+    `trace` picks a trace by name ("trace_000", ...) in files holding
+    several; the last one is used by default.
+    """
+    if os.path.splitext(path)[1].lower() in HDF5_EXTENSIONS:
+        _require_h5py()
+        with h5py.File(path, "r") as f:
+            name = trace or sorted(f.keys())[-1]
+            group = f[name]
+            columns = {key: group[key][()] for key in group.keys()}
+            metadata = {key: group.attrs[key] for key in group.attrs.keys()}
+        return columns, metadata
+
+    with np.load(path) as data:
+        metadata = json.loads(str(data["metadata"]))
+        keys = [key for key in data.files if key != "metadata"]
+        names = sorted({key.split("/")[0] for key in keys if "/" in key})
+        if not names:
+            return {key: data[key] for key in keys}, metadata
+        prefix = (trace or names[-1]) + "/"
+        columns = {key[len(prefix):]: data[key] for key in keys if key.startswith(prefix)}
+    return columns, metadata
+
+
+class HDF5StreamRecorder(StreamRecorder):
+    """Recording to an HDF5 file, by way of a crash-safe CSV stream.
+
+    An HDF5 file left open by a crash or kill is often unreadable, so
+    during the run the rows go to "<path>.csv" exactly as a CSV recording
+    would. Only when the run ends is the HDF5 file written from that
+    stream, one compressed group per trace (a trace begun again later in
+    the run appends to its group), and the CSV removed. After a crash the
+    CSV holds everything recorded so far.
+    """
+
+    def _open(self):
+        # fail when the run starts rather than when it ends
+        _require_h5py()
+        self.stream_path = self.path + ".csv"
+        self._fresh = not os.path.exists(self.stream_path)
+        super()._open()
+        # this run's part of the stream starts here, after any earlier crashed run
+        self._start = self._file.tell()
+        # [trace, columns, rows] per block, in the order they were streamed
+        self._blocks = []
+
+    def _begin_block(self, trace, columns):
+        super()._begin_block(trace, columns)
+        self._blocks.append([trace, columns, 0])
+
+    def _write_chunk(self, rows):
+        super()._write_chunk(rows)
+        self._blocks[-1][2] += rows.shape[0]
+
+    def _close(self):
+        super()._close()
+        with open(self.stream_path) as stream, h5py.File(self.path, "a") as f:
+            stream.seek(self._start)
+            # headers and comments are the lines that are not rows of numbers
+            rows = (line for line in stream if line[:1] in "0123456789+-.nNiI")
+            groups = {}
+            for trace, columns, count in self._blocks:
+                key = (trace.get("title"), tuple(columns))
+                if key not in groups:
+                    groups[key] = _create_trace_group(
+                        f, f"trace_{len(f.keys()):03d}", columns, self.metadata, trace)
+                block = np.loadtxt([next(rows) for _ in range(count)], delimiter=",",
+                                   ndmin=2).reshape(-1, len(columns))
+                _append_rows(groups[key], columns, block)
+        if self._fresh:
+            os.remove(self.stream_path)
+
+
+def open_recorder(path, metadata=None):
+    """Streaming recorder for `path`: HDF5 for .h5/.hdf5, CSV otherwise."""
+    if os.path.splitext(path)[1].lower() in HDF5_EXTENSIONS:
+        return HDF5StreamRecorder(path, metadata)
+    return StreamRecorder(path, metadata)
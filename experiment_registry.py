@@ -0,0 +1,77 @@
+import importlib
+from collections import namedtuple
+from functools import partial
+
+
+# name:     entry in the experiment list
+# requires: instrument checkboxes that must all be ticked
+# any_of:   at least one of these must be ticked as well (empty: no further condition)
+# run:      InstrumentControlGUI method that reads the panels and starts the run,
+#           or "module:function" called as function(gui); plugin modules are only
+#           imported the first time their experiment is started
+# panels:   optional input groups (GUI widget attributes) the experiment reads,
+#           shown only while it is selected
+# args:     positional arguments passed to `run`, e.g. which SMU it may drive
+Experiment = namedtuple("Experiment", "name requires any_of run panels args", defaults=((),))
+
+KEITHLEYS = ("Keithley", "Keithley2450")
+
+EXPERIMENTS = [
+    Experiment("IV Sweep", ("Keithley",), (), "run_iv_sweep", (), (("Keithley",),)),
+    Experiment("IV Sweep 2450", ("Keithley2450",), (), "run_iv_sweep", (), (("Keithley2450",),)),
+    Experiment("Pulse IV Sweep", ("Keithley",), (), "run_pulse_iv_2636b", ()),
+    Experiment("Time Logging", ("Keithley",), (), "start_time_logging", (), (("Keithley",),)),
+    Experiment("Time Logging 2450", ("Keithley2450",), (), "start_time_logging", (),
+               (("Keithley2450",),)),
+    Experiment("Temperature Dependent IV", ("LakeShore",), KEITHLEYS, "run_iv_sweep", ()),
+    Experiment("Temperature Ramp", ("LakeShore",), KEITHLEYS + ("LockIn",),
+               "run_temperature_ramp", ()),
+    Experiment("Temperature Stabilization", ("LakeShore",), (),
+               "stabilization_experiments:run_lakeshore335", ()),
+    Experiment("Temperature Stabilization 325", ("LakeShore325",), (),
+               "stabilization_experiments:run_lakeshore325", ()),
+    Experiment("AC Signal Measurement", ("LockIn",), (), "start_ac_signal_measurement",
+               ("ac_signal_inputs_widget",)),
+    Experiment("Impedance vs Time", ("LockIn",), (), "run_impedance_vs_time",
+               ("impedance_inputs_widget",)),
+    Experiment("Frequency Sweep", ("LockIn",), (), "run_lockin_frequency_sweep", ()),
+    Experiment("Harmonic Detection", ("LockIn",), (), "run_lockin_harmonic_detection",
+               ("harmonic_inputs_widget",)),
+    Experiment("AC I-V Measurement (Lock-in Only)", ("LockIn",), (), "run_ac_iv_lockin_only",
+               ("ac_iv_inputs_widget",)),
+    Experiment("AC I-V Measurement (2636B)", ("Keithley", "LockIn"), (), "run_ac_iv_2636b",
+               ("ac_iv_inputs_widget",)),
+    Experiment("AC I-V Measurement (2450)", ("Keithley2450", "LockIn"), (), "run_ac_iv_2450",
+               ("ac_iv_inputs_widget",)),
+    Experiment("Temperature Dependent AC I-V (2636B)", ("Keithley", "LockIn", "LakeShore"), (),
+               "run_temp_ac_iv_2636b", ("ac_iv_inputs_widget",)),
+    Experiment("Temperature Dependent AC I-V (2450)", ("Keithley2450", "LockIn", "LakeShore"), (),
+               "run_temp_ac_iv_2450", ("ac_iv_inputs_widget",)),
+]
+
+# Every optional input group some experiment uses
+PANELS = tuple(dict.fromkeys(panel for experiment in EXPERIMENTS for panel in experiment.panels))
+
+
+def available_experiments(selected):
+    """Names of the experiments the selected instruments can run, sorted."""
+    return sorted(
+        experiment.name for experiment in EXPERIMENTS
+        if all(name in selected for name in experiment.requires)
+        and (not experiment.any_of or any(name in selected for name in experiment.any_of)))
+
+
+def find_experiment(name):
+    for experiment in EXPERIMENTS:
+        if experiment.name == name:
+            return experiment
+    return None
+
+
+def runner(experiment, gui):
+    """Callable that starts `experiment` on `gui`, importing a plugin module if needed."""
+    if ":" not in experiment.run:
+        return partial(getattr(gui, experiment.run), *experiment.args)
+    module_name, function_name = experiment.run.split(":")
+    module = importlib.import_module(module_name)
+    return partial(getattr(module, function_name), gui, *experiment.args)
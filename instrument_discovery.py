@@ -0,0 +1,142 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Driver name -> substrings of its *IDN? reply (upper case)
+IDN_PATTERNS = {
+    "Keithley2636B": ("MODEL 2636B",),
+    "Keithley2450": ("MODEL 2450",),
+    "SR830": ("SR830",),
+    "LakeShore335": ("MODEL335", "MODEL 335"),
+    "LakeShore325": ("MODEL325", "MODEL 325"),
+}
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".nplcgui", "instruments.json")
+
+
+def driver_for(idn):
+    """Driver name matching an *IDN? reply, or None."""
+    upper = idn.upper()
+    for driver, patterns in IDN_PATTERNS.items():
+        if any(pattern in upper for pattern in patterns):
+            return driver
+    return None
+
+
+class InstrumentDiscovery:
+    """Find which VISA address each instrument is on, probing as little as possible.
+
+    scan() sends *IDN? to every listed resource at once (one thread per
+    resource, `probe_timeout` ms each) and remembers address -> IDN ->
+    driver. The result is saved to `cache_path` and reused for `ttl`
+    seconds, so later launches resolve addresses without touching the bus;
+    pass cache_path=None to keep it in memory only. If a cached address
+    turns out to be wrong, forget() the driver and the next find() rescans.
+
+    Addresses whose pooled session a connected driver holds are not probed:
+    changing the timeout or sending *IDN? there could land in the middle of
+    that driver's own traffic. They keep the entry of the previous scan.
+    """
+
+    def __init__(self, rm, cache_path=DEFAULT_CACHE_PATH, ttl=24 * 3600, probe_timeout=2000):
+        self.rm = rm
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.probe_timeout = probe_timeout
+        self.resources = None
+        self.scanned_at = None
+        # True while self.resources came from disk rather than a scan in this session
+        self.from_cache = False
+        self._load()
+
+    def _load(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path) as f:
+                cache = json.load(f)
+            if time.time() - cache["scanned_at"] < self.ttl:
+                self.resources = cache["resources"]
+                self.scanned_at = cache["scanned_at"]
+                self.from_cache = True
+        except Exception as e:
+            print(f"[WARN] Ignoring instrument cache {self.cache_path}: {e}")
+
+    def _save(self):
+        if not self.cache_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(self.cache_path, "w") as f:
+                json.dump({"scanned_at": self.scanned_at, "resources": self.resources}, f, indent=1)
+        except OSError as e:
+            print(f"[WARN] Could not save instrument cache {self.cache_path}: {e}")
+
+    def _held(self, address):
+        in_use = getattr(self.rm, "in_use", None)
+        return in_use is not None and in_use(address) > 0
+
+    def _probe(self, address):
+        if self._held(address):
+            entry = (self.resources or {}).get(address)
+            return entry["idn"] if entry else None
+        try:
+            inst = self.rm.open_resource(address)
+        except Exception:
+            return None
+        try:
+            timeout = inst.timeout
+            inst.timeout = self.probe_timeout
+            try:
+                return inst.query("*IDN?").strip()
+            finally:
+                inst.timeout = timeout
+        except Exception:
+            return None
+        finally:
+            inst.close()
+
+    def scan(self):
+        """Probe every resource in parallel and cache what answered; returns address -> entry."""
+        addresses = list(self.rm.list_resources())
+        with ThreadPoolExecutor(max_workers=max(len(addresses), 1)) as pool:
+            replies = list(pool.map(self._probe, addresses))
+        self.resources = {
+            address: {"idn": idn, "driver": driver_for(idn)}
+            for address, idn in zip(addresses, replies) if idn
+        }
+        self.scanned_at = time.time()
+        self.from_cache = False
+        self._save()
+        return self.resources
+
+    def find(self, driver):
+        """Address of the first instrument matching `driver`, or None.
+
+        Scans when nothing is cached or the cache has expired, and once more
+        if a cache loaded from disk does not know the instrument (it may have
+        been plugged in since).
+        """
+        if self.resources is None or time.time() - self.scanned_at >= self.ttl:
+            self.scan()
+        address = self._lookup(driver)
+        if address is None and self.from_cache:
+            self.scan()
+            address = self._lookup(driver)
+        return address
+
+    def _lookup(self, driver):
+        for address, entry in self.resources.items():
+            if entry["driver"] == driver:
+                return address
+        return None
+
+    def forget(self, driver):
+        """Drop cached addresses for `driver` after a failed connect."""
+        if self.resources is None:
+            return
+        self.resources = {address: entry for address, entry in self.resources.items()
+                          if entry["driver"] != driver}
+        self._save()
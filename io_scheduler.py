@@ -0,0 +1,58 @@
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+
+# value: what the call returned; started/finished: perf_counter() around the call
+TimedReading = namedtuple("TimedReading", "value started finished")
+
+
+class InstrumentIOPool:
+    """Issue queries to several instruments concurrently.
+
+    Every VISA session gets its own single worker thread, so calls to one
+    instrument stay in order while different instruments are talked to at
+    the same time. A point that reads a USB SMU and a GPIB controller then
+    costs the slower of the two round-trips instead of their sum.
+
+    Exclusive access is not the pool's job: sessions opened through a
+    SessionPool (see visa_resources.PooledSession) lock the session, and
+    the GPIB board it sits on, around every I/O call, including the calls
+    experiments make directly on their own thread. Calls on GPIB sessions
+    should still be single bus transactions (a query, a write); long waits
+    belong in the caller, where they do not hold the board.
+    """
+
+    def __init__(self):
+        self._executors = {}
+        self._lock = threading.Lock()
+
+    def _executor(self, resource_name):
+        with self._lock:
+            executor = self._executors.get(resource_name)
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix=f"io-{resource_name}")
+                self._executors[resource_name] = executor
+            return executor
+
+    def _timed_call(self, fn, args):
+        started = time.perf_counter()
+        return TimedReading(fn(*args), started, time.perf_counter())
+
+    def submit(self, resource_name, fn, *args):
+        """Queue fn(*args) on the session's thread; returns a Future of a TimedReading."""
+        return self._executor(resource_name).submit(self._timed_call, fn, args)
+
+    def gather(self, *calls):
+        """Run (resource_name, fn, *args) calls concurrently and return their TimedReadings in order."""
+        futures = [self.submit(resource_name, fn, *args) for resource_name, fn, *args in calls]
+        return [future.result() for future in futures]
+
+    def close(self):
+        with self._lock:
+            executors = list(self._executors.values())
+            self._executors.clear()
+        for executor in executors:
+            executor.shutdown(wait=True)
@@ -1,36 +1,54 @@
-import pyvisa
 import time
 import numpy as np
-import matplotlib.pyplot as plt
+
+from visa_resources import shared_resource_manager
 
 
 class Keithley2450:
-    def __init__(self):
-        self.rm = pyvisa.ResourceManager()
+    SENSE_FUNCTIONS = {"Current": "CURR", "Voltage": "VOLT", "Resistance": "RES"}
+    # Source values per SOUR:LIST command, keeping each command line short
+    LIST_CHUNK = 100
+
+    def __init__(self, rm=None):
+        self.rm = rm or shared_resource_manager()
         self.smu = None
         self.voltage_data = []
         self.current_data = []
         self.address = None
+        self.nplc = 1
+        # Mains frequency (Hz) that NPLC counts in; read from the instrument on connect
+        self.line_frequency = 50.0
 
     def connect(self, address=None):
         try:
-            resources = self.rm.list_resources()
-            if not resources:
-                raise ValueError("No instruments found!")
-            address = address if address else resources[0]
+            if not address:
+                resources = self.rm.list_resources()
+                if not resources:
+                    raise ValueError("No instruments found!")
+                address = resources[0]
             self.smu = self.rm.open_resource(address)
             self.smu.timeout = 5000
             self.address = address
             print(f"Connected to: {self.smu.query('*IDN?')}")
+            self.line_frequency = self._read_line_frequency()
             return True
         except Exception as e:
             print(f"Connection failed: {e}")
             return False
 
+    def _read_line_frequency(self):
+        """:SYST:LFR?, or 50 Hz (the longer NPLC) if it cannot be read."""
+        try:
+            return float(self.smu.query(":SYST:LFR?"))
+        except Exception as e:
+            print(f"[WARN] Could not read line frequency, assuming 50 Hz: {e}")
+            return 50.0
+
     def configure_smu(self, source_type="Voltage", source_value=0.0, current_limit=0.01, nplc=1):
         try:
             self.smu.write("*RST")
             time.sleep(1)
+            self.nplc = nplc
             if source_type == "Voltage":
                 self.smu.write("SOUR:FUNC VOLT")
                 self.smu.write(f"SOUR:VOLT {source_value}")
@@ -52,6 +70,21 @@ class Keithley2450:
             print(f"Configuration error: {e}")
             return False
 
+    def set_source_value(self, source_type, value):
+        """Change the source level without reconfiguring the SMU."""
+        if source_type == "Voltage":
+            self.smu.write(f"SOUR:VOLT {value}")
+        elif source_type == "Current":
+            self.smu.write(f"SOUR:CURR {value}")
+        else:
+            raise ValueError("Invalid source type. Choose 'Voltage' or 'Current'.")
+
+    def output_on(self):
+        self.smu.write("OUTP ON")
+
+    def output_off(self):
+        self.smu.write("OUTP OFF")
+
     def measure(self, measure_type="Current"):
         try:
             if measure_type == "Current":
@@ -66,8 +99,10 @@ class Keithley2450:
             print(f"Measurement error: {e}")
             return None
 
-    def sweep(self, source_type="Voltage", measure_type="Current", start=0, stop=1, steps=20, delay=0.1):
-        x_values = np.linspace(start, stop, steps)
+    def sweep(self, source_type="Voltage", measure_type="Current", start=0, stop=1, steps=20, delay=0.1,
+              values=None):
+        """Step the source through start..stop (or the given `values`) and measure each point."""
+        x_values = np.linspace(start, stop, steps) if values is None else np.asarray(values, dtype=float)
         y_values = []
         try:
             self.smu.write(":OUTP ON")
@@ -85,6 +120,109 @@ class Keithley2450:
             print(f"Sweep error: {e}")
         return x_values, y_values
 
+    def _prepare_buffer(self, measure_type, points, binary):
+        sense = self.SENSE_FUNCTIONS.get(measure_type)
+        if sense is None:
+            raise ValueError("Invalid measure_type")
+        self.smu.write(f'SENS:FUNC "{sense}"')
+        self.smu.write(f'TRAC:POIN {max(points, 10)}, "defbuffer1"')
+        self.smu.write('TRAC:CLE "defbuffer1"')
+        if binary:
+            self.smu.write("FORM:DATA REAL")
+            self.smu.write("FORM:BORD SWAP")
+        else:
+            self.smu.write("FORM:DATA ASC")
+
+    def _read_buffer(self, first, last, elements, binary):
+        """Read readings first..last (1-based) of defbuffer1 in one TRAC:DATA? block.
+
+        Returns an array with one column per requested buffer element.
+        """
+        query = f'TRAC:DATA? {first}, {last}, "defbuffer1", {", ".join(elements)}'
+        if binary:
+            data = self.smu.query_binary_values(
+                query, datatype='d', is_big_endian=False, container=np.array)
+        else:
+            data = np.array([float(v)
+                            for v in self.smu.query(query).strip().split(",")])
+        return data.reshape(-1, len(elements))
+
+    def buffered_sweep(self, source_type="Voltage", measure_type="Current", start=0, stop=1, steps=20,
+                       delay=0.1, values=None, binary=False, poll_interval=0.05):
+        """Run a sweep on the 2450 trigger model and read it back in one block.
+
+        Uses SOUR:SWE:<func>:LIN for a linear ramp, or SOUR:LIST (sent
+        LIST_CHUNK values per command) with SOUR:SWE:<func>:LIST when
+        explicit `values` are given. Returns numpy
+        arrays (source values, readings).
+        """
+        func = {"Voltage": "VOLT", "Current": "CURR"}.get(source_type)
+        if func is None:
+            raise ValueError("Invalid source type. Choose 'Voltage' or 'Current'.")
+
+        points = steps if values is None else len(values)
+        if points == 0:
+            return np.array([]), np.array([])
+
+        self._prepare_buffer(measure_type, points, binary)
+        if values is None:
+            self.smu.write(
+                f'SOUR:SWE:{func}:LIN {start}, {stop}, {steps}, {delay}, 1, BEST, OFF, OFF, "defbuffer1"')
+        else:
+            for first in range(0, len(values), self.LIST_CHUNK):
+                chunk = ", ".join(f"{v:.9g}" for v in values[first:first + self.LIST_CHUNK])
+                # the first command replaces the list, the rest append to it
+                self.smu.write(f"SOUR:LIST:{func}{':APP' if first else ''} {chunk}")
+            self.smu.write(
+                f'SOUR:SWE:{func}:LIST 1, {delay}, 1, OFF, "defbuffer1"')
+
+        point_time = delay + self.nplc / self.line_frequency + 0.005
+        deadline = time.monotonic() + points * point_time * 2 + 5
+        try:
+            self.smu.write("INIT")
+            # short TRAC:ACT? polls instead of one read blocking for the whole sweep,
+            # which would keep a GPIB board from everything else on it
+            while int(self.smu.query('TRAC:ACT? "defbuffer1"')) < points:
+                if time.monotonic() > deadline:
+                    self.smu.write("ABOR")
+                    raise RuntimeError(f"Sweep of {points} points did not finish in time")
+                time.sleep(poll_interval)
+            data = self._read_buffer(1, points, ["SOUR", "READ"], binary)
+        finally:
+            self.smu.write(":OUTP OFF")
+            if binary:
+                self.smu.write("FORM:DATA ASC")
+        return data[:, 0], data[:, 1]
+
+    def buffered_time_log(self, measure_type="Current", count=100, delay=0.0, binary=False,
+                          poll_interval=0.1):
+        """Log `count` readings on the instrument's SimpleLoop trigger model.
+
+        The 2450 takes readings at its own rate (NPLC plus `delay`) while this
+        generator polls TRAC:ACT? and yields each newly stored block as numpy
+        arrays (seconds since the first reading, readings). Closing the
+        generator early aborts the trigger model.
+        """
+        self._prepare_buffer(measure_type, count, binary)
+        self.smu.write(f'TRIG:LOAD "SimpleLoop", {count}, {delay}, "defbuffer1"')
+        self.smu.write("INIT")
+        read = 0
+        try:
+            while read < count:
+                time.sleep(poll_interval)
+                available = int(self.smu.query('TRAC:ACT? "defbuffer1"'))
+                if available > read:
+                    data = self._read_buffer(
+                        read + 1, available, ["REL", "READ"], binary)
+                    read = available
+                    yield data[:, 0], data[:, 1]
+        finally:
+            if read < count:
+                self.smu.write("ABOR")
+            if binary:
+                # MEAS? queries elsewhere expect ASCII replies
+                self.smu.write("FORM:DATA ASC")
+
     def disconnect(self):
         if self.smu:
             self.smu.write(":OUTP OFF")
@@ -93,6 +231,8 @@ class Keithley2450:
 
 
 if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
     keithley = Keithley2450()
     if keithley.connect():
         keithley.configure_smu(source_type="Voltage",
@@ -1,25 +1,35 @@
-import pyvisa as visa
 import time
 import numpy as np
-import matplotlib.pyplot as plt
+
+from visa_resources import VI_READ_BUF_DISCARD, exclusive, shared_resource_manager, wait_for_message
 
 
 class Keithley2636B:
-    def __init__(self):
-        self.rm = visa.ResourceManager()
+    # Source levels per command line when a level list is uploaded
+    LIST_CHUNK = 100
+
+    def __init__(self, rm=None):
+        self.rm = rm or shared_resource_manager()
         self.smu = None
         self.channel = "smua"
         self.voltage_data = []
         self.current_data = []
         self.address = None
+        self.nplc = 1
+        self.source_delay = 0.1
+        # Mains frequency (Hz) that NPLC counts in; read from the instrument on connect
+        self.line_frequency = 50.0
+        self._tsp_scripts = set()
+        self._query_seq = 0
 
     def connect(self, address=None):
         """Connect to the Keithley 2636B."""
         try:
-            resources = self.rm.list_resources()
-            if not resources:
-                raise ValueError("No instruments found!")
-            address = address if address else resources[0]
+            if not address:
+                resources = self.rm.list_resources()
+                if not resources:
+                    raise ValueError("No instruments found!")
+                address = resources[0]
             self.smu = self.rm.open_resource(address)
             self.smu.timeout = 5000
             self.address = address
@@ -32,16 +42,25 @@ class Keithley2636B:
             # print(f"Connected to: {self.smu.query('*IDN?')}")
             idn_response = self.smu.query("*IDN?").strip()
             time.sleep(0.5)
-            self.smu.flush(visa.constants.VI_READ_BUF_DISCARD)
+            self.smu.flush(VI_READ_BUF_DISCARD)
             print(f"Connected to: {idn_response}")
             time.sleep(0.5)
             # clear read buffer
-            self.smu.flush(visa.constants.VI_READ_BUF_DISCARD)
+            self.smu.flush(VI_READ_BUF_DISCARD)
+            self.line_frequency = self._read_line_frequency()
             return True
         except Exception as e:
             print(f"Connection failed: {e}")
             return False
 
+    def _read_line_frequency(self):
+        """localnode.linefreq, or 50 Hz (the longer NPLC) if it cannot be read."""
+        try:
+            return float(self.smu.query("print(localnode.linefreq)"))
+        except Exception as e:
+            print(f"[WARN] Could not read line frequency, assuming 50 Hz: {e}")
+            return 50.0
+
     def set_channel(self, channel_name):
         if channel_name.lower() in ["smua", "smub"]:
             self.channel = channel_name.lower()
@@ -56,6 +75,10 @@ class Keithley2636B:
         try:
             self.smu.write("*RST")
             time.sleep(1)
+            # *RST clears the script memory, so sweep scripts must be reloaded
+            self._tsp_scripts.clear()
+            self.nplc = nplc
+            self.source_delay = source_delay
             self.smu.write(f"{self.channel}.source.delay = {source_delay}")
 
             if source_type == "Voltage":
@@ -88,114 +111,68 @@ class Keithley2636B:
             print(f"Configuration error: {e}")
             return False
 
-    # def measure(self, measure_type="Current"):
-    #     """Generic measurement method."""
-    #     if measure_type == "Current":
-    #         return float(self.smu.query(f"print({self.channel}.measure.i())"))
-    #     elif measure_type == "Voltage":
-    #         return float(self.smu.query(f"print({self.channel}.measure.v())"))
-    #     elif measure_type == "Resistance":
-    #         return float(self.smu.query(f"print({self.channel}.measure.r())"))
-    #     else:
-    #         raise ValueError("Invalid measure_type")
-
-    # def measure(self, measure_type="Current"):
-    #     if not self.smu:
-    #         raise RuntimeError("Keithley not connected!")
-
-    #     try:
-    #         if measure_type == "Current":
-    #             response = self.smu.query(f"print({self.channel}.measure.i())")
-    #         elif measure_type == "Voltage":
-    #             response = self.smu.query(f"print({self.channel}.measure.v())")
-    #         elif measure_type == "Resistance":
-    #             response = self.smu.query(f"print({self.channel}.measure.r())")
-    #         else:
-    #             raise ValueError("Invalid measure_type")
-
-    #         response = response.strip()
-    #         print(f"[DEBUG] Response: {repr(response)}")
-
-    #         value=float(response)
-    #         return value
-    #         # Check if it's a valid float
-    #         # if any(keyword in response.lower() for keyword in ["keithley", "model", "inc", ","]):
-    #         #     raise ValueError(f"Invalid measurement (probably leftover IDN response): {response}")
-
-    #         # return float(response)
-
-    #     except Exception as e:
-    #         raise RuntimeError(f"fail to parce measurment.raw response:'{response}' \nError: {e}") # Let the GUI catch and display the error
-    # def measure(self, measure_type="Current"):
-    #         if not self.smu:
-    #             raise RuntimeError("Keithley not connected!")
-
-    #         try:
-    #             self.smu.flush(visa.constants.VI_READ_BUF_DISCARD)
-    #             if measure_type == "Current":
-    #                 response = self.smu.query(f"print({self.channel}.measure.i())")
-    #             elif measure_type == "Voltage":
-    #                 response = self.smu.query(f"print({self.channel}.measure.v())")
-    #             elif measure_type == "Resistance":
-    #                 response = self.smu.query(f"print({self.channel}.measure.r())")
-    #             else:
-    #                 raise ValueError("Invalid measure_type")
-
-    #             response = response.strip()
-
-    #         # Add stricter float check
-    #             try:
-    #                 val = float(response)
-    #             except ValueError:
-    #                 raise ValueError(f"Non-numeric response from instrument: {response}")
-
-    #             print(f"[DEBUG] {measure_type}: {val}")
-    #             return val
-
-    #         except Exception as e:
-    #             print(f"[ERROR] Measurement failed: {e}")
-    #             raise
+    def _next_tag(self):
+        self._query_seq = (self._query_seq + 1) % 1000000
+        return f"#{self._query_seq}#"
+
+    def _read_until_tag(self, tag, max_stale=10):
+        """Read lines until one starts with `tag` and return the rest of it.
+
+        Anything else in the output queue (e.g. an unread *IDN? reply or the
+        answer to a query that timed out) is stale and is discarded.
+        """
+        for _ in range(max_stale + 1):
+            line = self.smu.read().strip()
+            if line.startswith(tag):
+                return line[len(tag):]
+            print(f"[WARN] Discarding stale response: {line}")
+        raise RuntimeError(
+            f"No response tagged {tag} after {max_stale} stale lines")
+
+    def framed_query(self, expression):
+        """Evaluate a TSP expression and return its printed value.
+
+        The reply is prefixed with a sequence token so it can be matched to
+        this request deterministically instead of flushing and sleeping.
+        """
+        with exclusive(self.smu):
+            tag = self._next_tag()
+            self.smu.write(f'print("{tag}" .. tostring({expression}))')
+            return self._read_until_tag(tag)
+
     def measure(self, measure_type="Current"):
         if not self.smu:
             raise RuntimeError("Keithley not connected!")
 
-        try:
-            self.smu.flush(visa.constants.VI_READ_BUF_DISCARD)
-            time.sleep(0.3)  # Give Keithley time to clear any garbage
-
-            if measure_type == "Current":
-                query_cmd = f"print({self.channel}.measure.i())"
-            elif measure_type == "Voltage":
-                query_cmd = f"print({self.channel}.measure.v())"
-            elif measure_type == "Resistance":
-                query_cmd = f"print({self.channel}.measure.r())"
-            else:
-                raise ValueError("Invalid measure_type")
-
-            for attempt in range(3):
-                response = self.smu.query(query_cmd).strip()
-                print(
-                    f"[DEBUG attempt {attempt+1}] {measure_type} response: {response}")
-
-                # If it's a valid float, return it
-                try:
-                    return float(response)
-                except ValueError:
-                    # If it's not a number, flush again and retry
-                    if any(k in response.lower() for k in ["keithley", "model", "inc", ","]):
-                        self.smu.flush(visa.constants.VI_READ_BUF_DISCARD)
-                        time.sleep(0.2)
-                        continue
-                    raise ValueError(
-                        f"Unexpected non-numeric response: {response}")
-
-            raise RuntimeError(
-                f"Failed to get numeric response from instrument after 3 tries")
+        if measure_type == "Current":
+            expression = f"{self.channel}.measure.i()"
+        elif measure_type == "Voltage":
+            expression = f"{self.channel}.measure.v()"
+        elif measure_type == "Resistance":
+            expression = f"{self.channel}.measure.r()"
+        else:
+            raise ValueError("Invalid measure_type")
 
+        try:
+            response = self.framed_query(expression)
+            try:
+                return float(response)
+            except ValueError:
+                raise ValueError(
+                    f"Unexpected non-numeric response: {response}")
         except Exception as e:
             print(f"[ERROR] Measurement failed: {e}")
             raise
 
+    def set_source_value(self, source_type, value):
+        """Change the source level without reconfiguring the SMU."""
+        if source_type == "Voltage":
+            self.smu.write(f"{self.channel}.source.levelv = {value}")
+        elif source_type == "Current":
+            self.smu.write(f"{self.channel}.source.leveli = {value}")
+        else:
+            raise ValueError("Invalid source type. Choose 'Voltage' or 'Current'.")
+
     def output_on(self):
         self.smu.write(
             f"{self.channel}.source.output = {self.channel}.OUTPUT_ON")
@@ -290,6 +267,104 @@ class Keithley2636B:
                 self.smu.write(
                     f"{self.channel}.source.output = {self.channel}.OUTPUT_OFF")
 
+    def _load_tsp_sweep_script(self, source_type, measure_type):
+        """Upload (once) a TSP function that runs a triggered sweep into nvbuffer1."""
+        src = {"Voltage": "v", "Current": "i"}.get(source_type)
+        meas = {"Current": "i", "Voltage": "v", "Resistance": "r"}.get(measure_type)
+        if src is None:
+            raise ValueError("Invalid source type")
+        if meas is None:
+            raise ValueError("Invalid measure_type")
+
+        ch = self.channel
+        name = f"daqsweep_{ch}_{src}{meas}"
+        if name in self._tsp_scripts:
+            return name
+
+        lines = [
+            f"loadscript {name}_script",
+            f"function {name}(start, stop, n, levels)",
+            f"  {ch}.nvbuffer1.clear()",
+            f"  {ch}.nvbuffer1.appendmode = 1",
+            f"  {ch}.nvbuffer1.collectsourcevalues = 1",
+            "  if levels then",
+            f"    {ch}.trigger.source.list{src}(levels)",
+            "  else",
+            f"    {ch}.trigger.source.linear{src}(start, stop, n)",
+            "  end",
+            f"  {ch}.trigger.source.action = {ch}.ENABLE",
+            f"  {ch}.trigger.measure.action = {ch}.ENABLE",
+            f"  {ch}.trigger.measure.{meas}({ch}.nvbuffer1)",
+            f"  {ch}.trigger.endpulse.action = {ch}.SOURCE_HOLD",
+            f"  {ch}.trigger.endsweep.action = {ch}.SOURCE_IDLE",
+            f"  {ch}.trigger.count = n",
+            f"  {ch}.source.output = {ch}.OUTPUT_ON",
+            f"  {ch}.trigger.initiate()",
+            "  waitcomplete()",
+            f"  {ch}.source.output = {ch}.OUTPUT_OFF",
+            "  format.data = format.ASCII",
+            "  format.asciiprecision = 7",
+            f"  printbuffer(1, {ch}.nvbuffer1.n, {ch}.nvbuffer1.sourcevalues, {ch}.nvbuffer1.readings)",
+            "end",
+            "endscript",
+        ]
+        # nothing else may be written between loadscript and endscript
+        with exclusive(self.smu):
+            for line in lines:
+                self.smu.write(line)
+            self.smu.write(f"{name}_script.run()")
+        self._tsp_scripts.add(name)
+        return name
+
+    def _send_levels(self, levels):
+        """Build the global TSP table daqsweep_levels from `levels`, LIST_CHUNK values per line."""
+        self.smu.write("daqsweep_levels = {}")
+        for first in range(0, len(levels), self.LIST_CHUNK):
+            chunk = ",".join(f"{v:.9g}" for v in levels[first:first + self.LIST_CHUNK])
+            self.smu.write(
+                f"for _, v in ipairs({{{chunk}}}) do table.insert(daqsweep_levels, v) end")
+
+    def tsp_sweep(self, source_type="Voltage", measure_type="Current", start=0, stop=5, steps=50, values=None):
+        """Hardware-timed sweep: the instrument runs the whole sweep from a TSP script.
+
+        The source levels are either a linear start/stop/steps ramp (sent as
+        trigger.source.linear*) or an explicit `values` list (listv/listi,
+        uploaded LIST_CHUNK values per line). The trigger model steps through them at the
+        source delay and NPLC set by configure_smu, stores source and reading
+        in nvbuffer1, and the result is read back with a single printbuffer.
+        Returns numpy arrays (source values, readings).
+        """
+        if not self.smu:
+            raise RuntimeError("Keithley not connected!")
+
+        levels = np.linspace(start, stop, steps) if values is None else np.asarray(values, dtype=float)
+        if levels.size == 0:
+            return levels, np.array([])
+
+        name = self._load_tsp_sweep_script(source_type, measure_type)
+
+        point_time = self.source_delay + self.nplc / self.line_frequency + 0.005
+        with exclusive(self.smu):
+            if values is None:
+                call = f"{name}({start}, {stop}, {levels.size}, nil)"
+            else:
+                self._send_levels(levels)
+                call = f"{name}(0, 0, {levels.size}, daqsweep_levels)"
+            tag = self._next_tag()
+            self.smu.write(f'print("{tag}") {call}')
+            self._read_until_tag(tag)
+            # printbuffer only answers once the sweep is done; poll for it
+            # rather than block in read() with the GPIB board held
+            wait_for_message(self.smu, levels.size * point_time * 2 + 5)
+            response = self.smu.read()
+
+        data = np.array([float(v) for v in response.strip().split(",")])
+        if data.size != 2 * levels.size:
+            raise RuntimeError(
+                f"Expected {2 * levels.size} values from printbuffer, got {data.size}")
+        data = data.reshape(-1, 2)
+        return data[:, 0], data[:, 1]
+
     def pulse_iv_sweep(self, source_type="Voltage", measure_type="Current",
                        start=0, stop=1, steps=10, pulse_width=0.01, pulse_delay=0.1, compliance=0.1):
         if not self.smu:
@@ -342,6 +417,8 @@ class Keithley2636B:
         if not self.current_data:
             raise RuntimeError("No data to plot!")
 
+        import matplotlib.pyplot as plt
+
         plt.figure(figsize=(10, 6))
         plt.plot(self.voltage_data, self.current_data, 'b-')
         plt.xlabel("Voltage (V)")
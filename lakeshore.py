@@ -1,17 +1,24 @@
-import pyvisa as visa
 import time
 
 # or use PySide2.QtWidgets if you use PySide2
 from PyQt5.QtWidgets import QMessageBox
 
+from temperature_settling import TemperatureSettler
+from visa_resources import shared_resource_manager
+
 
 class LakeShoreController335:
-    def __init__(self):
+    # The 335 updates its sensor readings ten times a second
+    READING_INTERVAL = 0.1
+
+    def __init__(self, rm=None):
         """Initialize the LakeShore Temperature Controller."""
-        self.rm = visa.ResourceManager(
+        self.rm = rm or shared_resource_manager(
         )  # resourcemanager identifies which instrument is to be connected and how self.lakeshore = None #gpib-general purpose interface bus
         self.lakeshore = None
         self.address = None
+        # sensor channel -> (°C, time.monotonic()) of the last successful reading
+        self.last_reading = {}
 
     def connect(self, address=None):
         """Connect to the LakeShore controller."""
@@ -59,37 +66,100 @@ class LakeShoreController335:
             return False
 
     # channel A,B is the i/p sensor channel, it reads the temperauture from sensor
-    def get_temperature(self, channel='A'):
-        """Read the current temperature from sensor channel."""
+    def get_temperature(self, channel='A', max_age=None):
+        """Read the current temperature from sensor channel.
+
+        With max_age (s), a reading taken at most that long ago is returned
+        instead of querying the controller again.
+        """
         if not self.lakeshore:
             print("LakeShore not connected!")
             return None
 
+        if max_age is not None:
+            cached = self.last_reading.get(channel)
+            if cached is not None and time.monotonic() - cached[1] <= max_age:
+                return cached[0]
         try:
             # KRDG it asks whats the reading temperature in channel 1
             temp_kelvin = float(self.lakeshore.query(f"KRDG? {channel}"))
+            self.last_reading[channel] = (temp_kelvin - 273.15, time.monotonic())
             return temp_kelvin - 273.15
         except Exception as e:
             print(f"Read temperature error: {e}")
             return None
 
-    def stabilize_temperature(self, target_temp, tolerance=0.1, timeout=300, channel='A'):
-        """Wait until the temperature stabilizes around the target value."""
-        start_time = time.time()
+    def set_ramp(self, rate, channel=1, enabled=True):
+        """Ramp setpoint changes on a control loop at `rate` K/min (RAMP); disabled, they are immediate."""
+        if not self.lakeshore:
+            print("LakeShore not connected!")
+            return False
+
+        try:
+            self.lakeshore.write(f"RAMP {channel},{1 if enabled else 0},{rate:.3f}")
+            return True
+        except Exception as e:
+            print(f"Set ramp error: {e}")
+            return False
+
+    def is_ramping(self, channel=1):
+        """True while the control loop's setpoint is still ramping (RAMPST?)."""
+        if not self.lakeshore:
+            print("LakeShore not connected!")
+            return None
+
+        try:
+            return self.lakeshore.query(f"RAMPST? {channel}").strip() == "1"
+        except Exception as e:
+            print(f"Read ramp status error: {e}")
+            return None
+
+    def stabilize_temperature(self, target_temp, tolerance=0.1, timeout=300, channel='A', stop_check=None,
+                              window=10.0, poll_interval=0.5, progress=None):
+        """Wait until the temperature has settled at the target value.
+
+        The sensor is read every `poll_interval` seconds and a
+        TemperatureSettler decides from the last `window` seconds of readings
+        (mean within `tolerance`, low scatter and drift, time in band). The
+        wait is given up early once the predicted settling time runs well
+        past `timeout`.
+
+        stop_check is an optional callable; when it returns True the wait is
+        abandoned and False is returned. progress, if given, is called with
+        a short status string after every reading.
+        """
+        settler = TemperatureSettler(target_temp, tolerance, window)
+        start_time = time.monotonic()
         while True:
+            if stop_check is not None and stop_check():
+                print("Temperature stabilization cancelled.")
+                return False
+
             current_temp = self.get_temperature(channel)
             if current_temp is None:
                 return False
+            elapsed = time.monotonic() - start_time
+            settler.add(elapsed, current_temp)
+            if progress is not None:
+                progress(settler.status())
 
-            if abs(current_temp - target_temp) <= tolerance:
-                print(f"Stabilized at {current_temp:.2f}°C")
+            if settler.is_stable():
+                print(f"Stabilized at {current_temp:.2f}°C after {elapsed:.0f} s")
                 return True
 
-            if time.time() - start_time > timeout:
+            if elapsed > timeout:
                 print(f"Timeout: Could not stabilize at {target_temp}°C")
                 return False
+            eta = settler.remaining()
+            if elapsed >= window and eta is not None and elapsed + eta > 2 * timeout:
+                print(f"Timeout: {target_temp}°C predicted to take another {eta:.0f} s")
+                return False
 
-            time.sleep(1)
+            deadline = time.monotonic() + poll_interval
+            while time.monotonic() < deadline:
+                if stop_check is not None and stop_check():
+                    break
+                time.sleep(min(0.05, max(deadline - time.monotonic(), 0)))
 
     def set_l335_heater_range(self):
         try:
@@ -1,11 +1,15 @@
-import pyvisa
+import time
+
+from visa_resources import shared_resource_manager
 
 
 class LakeShoreController325:
-    def __init__(self):
-        self.rm = pyvisa.ResourceManager()
+    def __init__(self, rm=None):
+        self.rm = rm or shared_resource_manager()
         self.instrument = None
         self.address = None
+        # input channel -> (reading, time.monotonic()) of the last successful reading
+        self.last_reading = {}
 
     def connect(self, address=None):
         try:
@@ -24,16 +28,18 @@ class LakeShoreController325:
                 for res in self.rm.list_resources():
                     try:
                         inst = self.rm.open_resource(res)
+                    except Exception:
+                        continue
+                    try:
                         inst.timeout = 2000
                         idn = inst.query("*IDN?")
                         if "LSCI" in idn or "MODEL 325" in idn.upper():
                             self.instrument = inst
                             self.address = inst.resource_name
                             return True
-                        else:
-                            inst.close()
                     except Exception:
-                        continue
+                        pass
+                    inst.close()
                 return False
         except Exception as e:
             print(f"LakeShore connection error: {e}")
@@ -43,9 +49,16 @@ class LakeShoreController325:
         if self.instrument:
             self.instrument.write(f"SETP {loop},{temp}")
 
-    def get_temperature(self, input_channel=1):
+    def get_temperature(self, input_channel=1, max_age=None):
+        """KRDG? reading; with max_age (s), a reading at most that old is reused."""
+        if max_age is not None:
+            cached = self.last_reading.get(input_channel)
+            if cached is not None and time.monotonic() - cached[1] <= max_age:
+                return cached[0]
         if self.instrument:
-            return float(self.instrument.query(f"KRDG? {input_channel}"))
+            value = float(self.instrument.query(f"KRDG? {input_channel}"))
+            self.last_reading[input_channel] = (value, time.monotonic())
+            return value
         return None
 
     def get_setpoint(self, loop=1):
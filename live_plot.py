@@ -0,0 +1,162 @@
+import math
+import time
+
+import numpy as np
+
+
+class LivePlot:
+    """Incrementally updated plot for data streaming in during a run.
+
+    One Line2D per trace is created when the run starts; each frame pushes
+    zero-copy column views of the run's AcquisitionBuffer with set_data.
+    Frames are blitted
+    over a cached background and capped at max_fps; the axes are fully
+    redrawn only when the data outgrows the current limits. The mplcursors
+    hover is attached once the run has finished.
+    """
+
+    STYLES = ("b-", "r--")
+    COLORS = ("b", "r")
+
+    def __init__(self, figure, canvas, max_fps=30):
+        self.figure = figure
+        self.canvas = canvas
+        self.min_frame_interval = 1.0 / max_fps
+        self.axes = []
+        self.lines = []
+        self.buffer = None
+        self.y_columns = ()
+        self.sort_x = False
+        self._background = None
+        self._last_frame = 0.0
+        self._dirty = False
+        self._cursor = None
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def start(self, buffer, x_label, y_labels, title, log_x=False, log_y=False, sort_x=False):
+        """Set up empty axes and one animated line per entry in y_labels.
+
+        The lines plot buffer columns "y1", "y2", ... against "x". With
+        `sort_x` the points are drawn in x order rather than acquisition
+        order, for sweeps that fill in points between earlier ones.
+        """
+        self.buffer = buffer
+        self.sort_x = sort_x
+        self.y_columns = tuple(f"y{i + 1}" for i in range(len(y_labels)))
+        self.figure.clear()
+        self._cursor = None
+        ax = self.figure.add_subplot(111)
+        self.axes = [ax]
+        if len(y_labels) > 1:
+            self.axes.append(ax.twinx())
+
+        dual = len(self.axes) > 1
+        self.lines = []
+        for axis, label, style, color in zip(self.axes, y_labels, self.STYLES, self.COLORS):
+            line, = axis.plot([], [], style, label=label, animated=True)
+            self.lines.append(line)
+            if dual:
+                axis.set_ylabel(label, color=color)
+            else:
+                axis.set_ylabel(label)
+            if log_y:
+                axis.set_yscale('log')
+
+        ax.set_xlabel(x_label)
+        ax.set_title(title)
+        ax.grid(True)
+        if log_x:
+            ax.set_xscale('log')
+
+        self._dirty = False
+        self.figure.tight_layout()
+        self.canvas.draw()
+
+    def mark_dirty(self):
+        """Note that the buffer has new samples to draw on the next frame."""
+        if self.lines:
+            self._dirty = True
+
+    def refresh(self, force=False):
+        """Draw pending points, at most once per frame interval unless forced."""
+        if not self._dirty:
+            return
+        now = time.perf_counter()
+        if not force and now - self._last_frame < self.min_frame_interval:
+            return
+        self._last_frame = now
+        self._dirty = False
+
+        x = self.buffer.column("x")
+        order = np.argsort(x, kind="stable") if self.sort_x else slice(None)
+        for line, column in zip(self.lines, self.y_columns):
+            line.set_data(x[order], self.buffer.column(column)[order])
+
+        if self._rescale() or self._background is None:
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self._background)
+            for axis, line in zip(self.axes, self.lines):
+                axis.draw_artist(line)
+            self.canvas.blit(self.figure.bbox)
+
+    def finish(self):
+        """Freeze the lines into the figure and attach the hover cursor."""
+        self.refresh(force=True)
+        if not self.lines:
+            return
+        for line in self.lines:
+            line.set_animated(False)
+        self._background = None
+        self.canvas.draw()
+
+        import mplcursors  # only needed once a run has finished
+
+        self._cursor = mplcursors.cursor(self.lines, hover=True)
+        self._cursor.connect("add", lambda sel: sel.annotation.set_text(
+            f"x: {sel.target[0]:.3f}\ny: {sel.target[1]:.3e}"))
+
+    def _rescale(self):
+        """Grow axis limits with headroom when data leaves them.
+
+        Returns True if any limit changed (a full redraw is then needed).
+        """
+        changed = self._fit(self.axes[0], self.buffer.column("x"), "x")
+        for axis, column in zip(self.axes, self.y_columns):
+            changed |= self._fit(axis, self.buffer.column(column), "y")
+        return changed
+
+    def _fit(self, axis, data, which):
+        log = (axis.get_xscale() if which == "x" else axis.get_yscale()) == "log"
+        finite = data[np.isfinite(data)]
+        if log:
+            finite = finite[finite > 0]
+        if finite.size == 0:
+            return False
+        lo, hi = float(finite.min()), float(finite.max())
+        get_lim = axis.get_xlim if which == "x" else axis.get_ylim
+        set_lim = axis.set_xlim if which == "x" else axis.set_ylim
+
+        cur_lo, cur_hi = sorted(get_lim())
+        if len(self.buffer) > 1 and cur_lo <= lo and hi <= cur_hi:
+            return False
+
+        if log:
+            lo_exp, hi_exp = math.log10(lo), math.log10(hi)
+            span = max(hi_exp - lo_exp, 1.0)
+            set_lim(10 ** (lo_exp - 0.1 * span), 10 ** (hi_exp + 0.1 * span))
+        else:
+            span = hi - lo if hi > lo else max(abs(hi), 1e-12)
+            # Extra headroom on growth keeps full redraws logarithmic in n.
+            set_lim(lo - 0.25 * span, hi + 0.25 * span)
+        return True
+
+    def _on_draw(self, event):
+        # Ignore draws after someone else cleared the figure (e.g. Clear Plot).
+        if not self.axes or self.axes[0] not in self.figure.axes:
+            return
+        if not any(line.get_animated() for line in self.lines):
+            return
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        for axis, line in zip(self.axes, self.lines):
+            axis.draw_artist(line)
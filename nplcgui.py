@@ -1,45 +1,97 @@
 import sys
 import time
+from collections import deque
+
 import numpy as np
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
     QLineEdit, QPushButton, QMessageBox, QFileDialog, QComboBox, QCheckBox, QScrollArea, QSizePolicy, QGridLayout
 )
 from PyQt5.QtCore import QTimer, Qt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-import mplcursors
 
 from keithley_2636B import Keithley2636B
 from lakeshore import LakeShoreController335
 from lakeshore325 import LakeShoreController325
 from keithley2450 import Keithley2450
-from sr830_controller1 import SR830Controller
-# from mock_instruments import MockKeithley2636B as Keithley2636B
-# from mock_instruments import MockLakeShoreController as LakeShoreController
-# from mock2450 import Keithley2450
-
-from PyQt5.QtCore import QThread, pyqtSignal
+from sr830_controller import SR830Controller
+from visa_resources import SessionPool, shared_resource_manager
+from instrument_discovery import DEFAULT_CACHE_PATH, InstrumentDiscovery
+from experiment_registry import KEITHLEYS, PANELS, available_experiments, find_experiment, runner
+
+from acquisition_scheduler import AcquisitionScheduler
+from io_scheduler import InstrumentIOPool
+from temperature_monitor import TemperatureMonitor
+from temperature_ramp import TemperatureTrack
+from adaptive_sweep import AdaptiveSweep
+from acquisition_worker import AcquisitionWorker
+from acquisition_buffer import AcquisitionBuffer, trace_columns
+from live_plot import LivePlot
+from data_storage import open_recorder, save_data
 
 
 class InstrumentControlGUI(QWidget):
-    def __init__(self):
+    # SR830 SNAP? parameters read for each lock-in output mode
+    LOCKIN_CHANNELS = {"X/Y": ("X", "Y"), "R/θ": ("R", "THETA")}
+
+    def __init__(self, rm=None):
         super().__init__()
         self.setWindowTitle("Instrument Control - DAQ GUI")
-        self.keithley = Keithley2636B()
-        self.lakeshore = LakeShoreController335()
-        self.keithley2450 = Keithley2450()
+        # rm: VISA resource manager shared by all drivers; pass a
+        # SimulatedResourceManager to run without hardware. Sessions are
+        # pooled per address (see visa_resources) and opened on first connect.
+        self.rm = SessionPool(rm) if rm is not None else shared_resource_manager()
+        self.keithley = Keithley2636B(rm=self.rm)
+        self.lakeshore = LakeShoreController335(rm=self.rm)
+        self.lakeshore325 = LakeShoreController325(rm=self.rm)
+        self.keithley2450 = Keithley2450(rm=self.rm)
+        # Resolves blank address fields; an injected resource manager (e.g. the
+        # simulator) is not cached to disk
+        self.discovery = InstrumentDiscovery(
+            self.rm, cache_path=DEFAULT_CACHE_PATH if rm is None else None)
         self.keithley2450_address = "Not connected"
         self.keithley_address = "Not connected"
         self.lakeshore_address = "Not connected"
         self.lakeshore325_address = "Not connected"
+        # Runs reads on different instruments concurrently during experiments
+        self.io_pool = InstrumentIOPool()
         self.init_ui()
-
-        self.temp_timer = QTimer()
-        self.temp_timer.timeout.connect(self.update_temperature_display)
-        self.temp_timer.start(1000)
+        if rm is not None:
+            from simulated_instruments import SimulatedResourceManager
+            if isinstance(rm, SimulatedResourceManager):
+                self.use_simulated_addresses()
+
+        # Live temperature labels, fed by readings taken off the GUI thread
+        self.temperature_monitor = TemperatureMonitor(self.io_pool)
+        self.temperature_monitor.reading_ready.connect(self.on_temperature_reading)
+        self.temperature_monitor.reading_failed.connect(self.on_temperature_failed)
+        self.temperature_monitor.start()
         self.stop_requested = False
 
+        # Experiments run on an AcquisitionWorker; the live plot is refreshed
+        # from the points it sends at most once per frame.
+        self.worker = None
+        # title -> trace dict / AcquisitionBuffer of every trace in the current run
+        self.run_traces = {}
+        self.run_buffers = {}
+        self.data_buffer = None
+        # matplotlib takes longer to load than the rest of the window, so the
+        # plot is created just after the window has been painted (or when
+        # first needed)
+        self.figure = self.canvas = self.ax = self.live_plot = None
+        QTimer.singleShot(50, self.init_plot)
+        self.plot_timer = QTimer()
+        self.plot_timer.setInterval(16)
+        self.plot_timer.timeout.connect(self.refresh_live_plot)
+
+    def use_simulated_addresses(self):
+        from simulated_instruments import SIM_ADDRESSES
+
+        self.setWindowTitle("Instrument Control - DAQ GUI (simulated instruments)")
+        self.k_address_input.setText(SIM_ADDRESSES["Keithley2636B"])
+        self.k2450_address_input.setText(SIM_ADDRESSES["Keithley2450"])
+        self.l_address_input.setText(SIM_ADDRESSES["LakeShore335"])
+        self.l325_address_input.setText(SIM_ADDRESSES["LakeShore325"])
+
     def update_source_labels(self):
         unit = "V" if self.source_select.currentText() == "Voltage" else "A"
         self.start_label.setText(f"Start Source ({unit}):")
@@ -94,17 +146,11 @@ class InstrumentControlGUI(QWidget):
             instrument_layout.addWidget(checkbox)
         control_panel.addLayout(instrument_layout)
 
-        # # Container widgets for Keithley and Lake Shore controls
-        # self.keithley_controls = QWidget()
-        # self.lakeshore_controls = QWidget()
-        # self.keithley_controls_layout = QVBoxLayout()
-        # self.lakeshore_controls_layout = QVBoxLayout()
-        # self.keithley_controls.setLayout(self.keithley_controls_layout)
-        # self.lakeshore_controls.setLayout(self.lakeshore_controls_layout)
-
         # Dynamic experiment type dropdown
         self.experiment_select = QComboBox()
         self.experiment_select.setEditable(False)
+        self.experiment_select.currentIndexChanged.connect(
+            self.update_lockin_inputs_visibility)
         control_panel.addLayout(self.labeled_input(
             "Experiment Type:", self.experiment_select))
 
@@ -231,6 +277,12 @@ class InstrumentControlGUI(QWidget):
         self.lakeshore_controls_layout.addLayout(
             self.labeled_input("Set Temperature (°C):", self.temp_input))
 
+        # Several setpoints run the experiment at each in turn; blank = Set Temperature only
+        self.temp_series_input = QLineEdit("")
+        self.temp_series_input.setPlaceholderText("e.g. 10, 20, 30 or 10:100:10")
+        self.lakeshore_controls_layout.addLayout(
+            self.labeled_input("Setpoint Series (°C):", self.temp_series_input))
+
         self.output_channel_select = QComboBox()
         self.output_channel_select.addItems(["1", "2", "3", "4"])
         self.lakeshore_controls_layout.addLayout(
@@ -238,9 +290,32 @@ class InstrumentControlGUI(QWidget):
 
         self.input_channel_select = QComboBox()
         self.input_channel_select.addItems(["A", "B", "C", "D"])
+        self.input_channel_select.currentTextChanged.connect(lambda _: self.watch_lakeshore())
         self.lakeshore_controls_layout.addLayout(
             self.labeled_input("Sensor Channel:", self.input_channel_select))
 
+        # Stable once a rolling window of readings stays in the band with low drift
+        self.stability_band_input = QLineEdit("0.1")
+        self.lakeshore_controls_layout.addLayout(
+            self.labeled_input("Stability Band (±°C):", self.stability_band_input))
+        self.stability_window_input = QLineEdit("10")
+        self.lakeshore_controls_layout.addLayout(
+            self.labeled_input("Stability Window (s):", self.stability_window_input))
+        self.stability_timeout_input = QLineEdit("300")
+        self.lakeshore_controls_layout.addLayout(
+            self.labeled_input("Stabilization Timeout (s):", self.stability_timeout_input))
+
+        # Temperature Ramp: from Set Temperature to Ramp To, sampling all the way
+        self.ramp_stop_input = QLineEdit("30")
+        self.lakeshore_controls_layout.addLayout(
+            self.labeled_input("Ramp To (°C):", self.ramp_stop_input))
+        self.ramp_rate_input = QLineEdit("1")
+        self.lakeshore_controls_layout.addLayout(
+            self.labeled_input("Ramp Rate (K/min):", self.ramp_rate_input))
+        self.ramp_interval_input = QLineEdit("0.5")
+        self.lakeshore_controls_layout.addLayout(
+            self.labeled_input("Ramp Sample Interval (s):", self.ramp_interval_input))
+
         self.live_temp_label = QLabel("Current Temperature: -- °C")
         self.lakeshore_controls_layout.addWidget(self.live_temp_label)
 
@@ -281,6 +356,8 @@ class InstrumentControlGUI(QWidget):
 
         self.l325_input_channel_select = QComboBox()
         self.l325_input_channel_select.addItems(["1", "2"])
+        self.l325_input_channel_select.currentTextChanged.connect(
+            lambda _: self.watch_lakeshore325())
         self.lakeshore325_controls_layout.addLayout(
             self.labeled_input("Sensor Channel:",
                                self.l325_input_channel_select)
@@ -319,6 +396,11 @@ class InstrumentControlGUI(QWidget):
             "Stop Voltage (V):", self.ac_stop_input))
         ac_iv_layout.addLayout(self.labeled_input(
             "Steps:", self.ac_steps_input))
+        # What the Keithley sources during the AC I-V sweeps
+        self.ac_source_type = QComboBox()
+        self.ac_source_type.addItems(["Voltage", "Current"])
+        ac_iv_layout.addLayout(self.labeled_input(
+            "Keithley Source:", self.ac_source_type))
 
         self.lockin_controls_layout.addWidget(self.ac_iv_inputs_widget)
         self.ac_iv_inputs_widget.hide()
@@ -338,6 +420,32 @@ class InstrumentControlGUI(QWidget):
         self.lockin_controls_layout.addWidget(self.impedance_inputs_widget)
         self.impedance_inputs_widget.hide()
 
+        # --- AC Signal Measurement Input Fields ---
+        self.ac_signal_inputs_widget = QWidget()
+        ac_signal_layout = QVBoxLayout(self.ac_signal_inputs_widget)
+
+        self.lockin_duration_input = QLineEdit("10")
+        self.lockin_interval_input = QLineEdit("0.1")
+
+        ac_signal_layout.addLayout(self.labeled_input(
+            "Measurement Duration (s):", self.lockin_duration_input))
+        ac_signal_layout.addLayout(self.labeled_input(
+            "Interval (s):", self.lockin_interval_input))
+
+        self.lockin_controls_layout.addWidget(self.ac_signal_inputs_widget)
+        self.ac_signal_inputs_widget.hide()
+
+        # --- Harmonic Detection Input Fields ---
+        self.harmonic_inputs_widget = QWidget()
+        harmonic_layout = QVBoxLayout(self.harmonic_inputs_widget)
+
+        self.lockin_harmonics_input = QLineEdit("5")
+        harmonic_layout.addLayout(self.labeled_input(
+            "Highest Harmonic:", self.lockin_harmonics_input))
+
+        self.lockin_controls_layout.addWidget(self.harmonic_inputs_widget)
+        self.harmonic_inputs_widget.hide()
+
         # Frequency and Amplitude
         self.lockin_freq_input = QLineEdit("1000")
         self.lockin_amp_input = QLineEdit("1.0")
@@ -371,6 +479,22 @@ class InstrumentControlGUI(QWidget):
         self.lockin_controls_layout.addLayout(self.freq_interval_layout)
         self.freq_interval_layout.setEnabled(False)
 
+        # Log spacing covers decades evenly; adaptive spacing starts from a
+        # coarse log grid and adds points where R/θ (or X/Y) change fastest
+        self.lockin_freq_spacing_select = QComboBox()
+        self.lockin_freq_spacing_select.addItems(["Linear", "Log", "Adaptive"])
+        self.lockin_controls_layout.addLayout(self.labeled_input(
+            "Frequency Spacing:", self.lockin_freq_spacing_select))
+        self.lockin_freq_points_input = QLineEdit("21")
+        self.lockin_controls_layout.addLayout(self.labeled_input(
+            "Points (Log / Adaptive Start):", self.lockin_freq_points_input))
+        self.lockin_freq_max_points_input = QLineEdit("101")
+        self.lockin_controls_layout.addLayout(self.labeled_input(
+            "Max Points (Adaptive):", self.lockin_freq_max_points_input))
+        self.lockin_refine_threshold_input = QLineEdit("5")
+        self.lockin_controls_layout.addLayout(self.labeled_input(
+            "Refine Threshold (%):", self.lockin_refine_threshold_input))
+
         # Time Constant
         self.lockin_tc_select = QComboBox()
         self.lockin_tc_select.addItems(
@@ -378,12 +502,29 @@ class InstrumentControlGUI(QWidget):
         self.lockin_controls_layout.addLayout(self.labeled_input(
             "Time Constant Index:", self.lockin_tc_select))
 
+        # Filter slope and settling: lock-in sweeps wait 5-10 time constants
+        # after each step, or until readings converge if a tolerance is given
+        self.lockin_slope_select = QComboBox()
+        self.lockin_slope_select.addItems(["6", "12", "18", "24"])
+        self.lockin_slope_select.setCurrentIndex(1)
+        self.lockin_controls_layout.addLayout(self.labeled_input(
+            "Filter Slope (dB/oct):", self.lockin_slope_select))
+        self.lockin_settle_tol_input = QLineEdit()
+        self.lockin_settle_tol_input.setPlaceholderText(
+            "Blank: fixed wait of 5-10 time constants")
+        self.lockin_controls_layout.addLayout(self.labeled_input(
+            "Settle Tolerance (%):", self.lockin_settle_tol_input))
+
         # Sensitivity
         self.lockin_sens_select = QComboBox()
         self.lockin_sens_select.addItems(
             [str(i) for i in range(27)])  # SR830 levels
         self.lockin_controls_layout.addLayout(self.labeled_input(
             "Sensitivity Index:", self.lockin_sens_select))
+        # Stepped sweeps can pick the range per point instead (starting from the index above)
+        self.lockin_autorange_checkbox = QCheckBox(
+            "Auto Sensitivity (stepped sweeps, range recorded per point)")
+        self.lockin_controls_layout.addWidget(self.lockin_autorange_checkbox)
 
         # Output Mode
         self.lockin_output_mode = QComboBox()
@@ -391,9 +532,26 @@ class InstrumentControlGUI(QWidget):
         self.lockin_controls_layout.addLayout(
             self.labeled_input("Output Mode:", self.lockin_output_mode))
 
+        # Timed lock-in runs can sample into the SR830's own buffer instead of polling
+        self.lockin_buffered_checkbox = QCheckBox(
+            "Stream from SR830 Buffer (up to 512 Hz)")
+        self.lockin_controls_layout.addWidget(self.lockin_buffered_checkbox)
+
         # Dual sweep checkbox
         self.dual_sweep_checkbox = QCheckBox("Enable Dual Sweep")
         self.keithley_controls_layout.addWidget(self.dual_sweep_checkbox)
+        self.tsp_sweep_checkbox = QCheckBox("Hardware-Timed Sweep (TSP)")
+        self.keithley_controls_layout.addWidget(self.tsp_sweep_checkbox)
+        # Adaptive steps: Steps sets the coarse first pass, then points are
+        # added where the response changes or bends, up to Max Points
+        self.adaptive_sweep_checkbox = QCheckBox("Adaptive Steps")
+        self.keithley_controls_layout.addWidget(self.adaptive_sweep_checkbox)
+        self.adaptive_max_points_input = QLineEdit("200")
+        self.keithley_controls_layout.addLayout(self.labeled_input(
+            "Max Points (Adaptive):", self.adaptive_max_points_input))
+        self.adaptive_threshold_input = QLineEdit("5")
+        self.keithley_controls_layout.addLayout(self.labeled_input(
+            "Refine Threshold (%):", self.adaptive_threshold_input))
         self.keithley2450_controls_layout.addWidget(
             QCheckBox("Enable Dual Sweep"))
         self.dual_sweep_checkbox_2450 = self.keithley2450_controls_layout.itemAt(
@@ -409,6 +567,20 @@ class InstrumentControlGUI(QWidget):
         control_panel.addWidget(self.log_x_checkbox)
         control_panel.addWidget(self.log_y_checkbox)
 
+        # Crash-safe recording: rows are appended to disk while the run is going
+        self.record_checkbox = QCheckBox("Record to Disk During Run")
+        control_panel.addWidget(self.record_checkbox)
+        self.record_path_input = QLineEdit()
+        self.record_path_input.setPlaceholderText(
+            "Auto: run_<date>_<time>.csv (.h5 for HDF5)")
+        control_panel.addLayout(self.labeled_input(
+            "Recording File:", self.record_path_input))
+        # Continuous runs (time logging, ramps, lock-in vs time) keep only the
+        # newest points in memory; record to disk to keep the whole run
+        self.memory_points_input = QLineEdit("0")
+        control_panel.addLayout(self.labeled_input(
+            "Keep Last N Points (0 = all):", self.memory_points_input))
+
         # Buttons - always visible
         # btn_layout = QHBoxLayout()
         btn_layout = QGridLayout()
@@ -418,8 +590,10 @@ class InstrumentControlGUI(QWidget):
         self.clear_btn = QPushButton("Clear Plot")
         self.save_btn = QPushButton("Save Plot")
         self.save_csv_btn = QPushButton("Save CSV")
+        self.save_binary_btn = QPushButton("Save HDF5/NPZ")
         self.stop_btn = QPushButton("Stop")
-        for btn in [self.start_btn, self.start_log_btn, self.stop_btn, self.clear_btn, self.save_btn, self.save_csv_btn]:
+        for btn in [self.start_btn, self.start_log_btn, self.stop_btn, self.clear_btn, self.save_btn, self.save_csv_btn,
+                    self.save_binary_btn]:
             btn.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
 
         self.stop_btn.clicked.connect(self.request_stop)
@@ -430,12 +604,14 @@ class InstrumentControlGUI(QWidget):
         self.clear_btn.clicked.connect(self.clear_plot)
         self.save_btn.clicked.connect(self.save_plot)
         self.save_csv_btn.clicked.connect(self.save_csv)
+        self.save_binary_btn.clicked.connect(self.save_binary)
 
         btn_layout.addWidget(self.start_btn, 0, 0)
         btn_layout.addWidget(self.start_log_btn, 0, 1)
         btn_layout.addWidget(self.clear_btn, 1, 0)
         btn_layout.addWidget(self.save_btn, 1, 1)
         btn_layout.addWidget(self.save_csv_btn, 1, 2)
+        btn_layout.addWidget(self.save_binary_btn, 2, 0, 1, 3)
         control_panel.addLayout(btn_layout)
 
         # Add instrument control widgets
@@ -444,15 +620,13 @@ class InstrumentControlGUI(QWidget):
         control_panel.addWidget(self.lakeshore325_controls)
         self.lakeshore325_controls.setVisible(False)
 
-        # Plot
-        self.figure = Figure()
-        self.canvas = FigureCanvas(self.figure)
-        self.ax = self.figure.add_subplot(111)
-        self.ax.grid(True)
-        self.canvas.draw()
+        # Plot (filled in by init_plot)
+        self.plot_area = QWidget()
+        self.plot_area.setLayout(QVBoxLayout())
+        self.plot_area.layout().setContentsMargins(0, 0, 0, 0)
         # main_layout.addLayout(control_panel, 1)
         main_layout.addWidget(scroll_area, 1)
-        main_layout.addWidget(self.canvas, 4)
+        main_layout.addWidget(self.plot_area, 4)
 
         # Status
         self.status_label = QLabel("Ready")
@@ -521,53 +695,43 @@ class InstrumentControlGUI(QWidget):
         self.keithley2450_controls_layout.addLayout(
             self.labeled_input("NPLC:", self.k2450_nplc_input))
 
+        self.k2450_buffered_checkbox = QCheckBox(
+            "Buffered Acquisition (TRAC:DATA?)")
+        self.keithley2450_controls_layout.addWidget(
+            self.k2450_buffered_checkbox)
+        self.k2450_binary_checkbox = QCheckBox("Binary Transfer (FORM:DATA REAL)")
+        self.keithley2450_controls_layout.addWidget(
+            self.k2450_binary_checkbox)
+
+        self.k2450_adaptive_checkbox = QCheckBox("Adaptive Steps (ignores Dual Sweep)")
+        self.keithley2450_controls_layout.addWidget(self.k2450_adaptive_checkbox)
+        self.k2450_adaptive_max_points_input = QLineEdit("200")
+        self.keithley2450_controls_layout.addLayout(self.labeled_input(
+            "Max Points (Adaptive):", self.k2450_adaptive_max_points_input))
+        self.k2450_adaptive_threshold_input = QLineEdit("5")
+        self.keithley2450_controls_layout.addLayout(self.labeled_input(
+            "Refine Threshold (%):", self.k2450_adaptive_threshold_input))
+
     def update_experiment_types(self):
-        selected = [name for name,
-                    cb in self.instrument_checkboxes.items() if cb.isChecked()]
+        selected = self.selected_instruments()
         self.experiment_select.clear()
-        experiments = set()
 
         self.keithley_controls.setVisible("Keithley" in selected)
         self.lakeshore_controls.setVisible("LakeShore" in selected)
         self.keithley2450_controls.setVisible("Keithley2450" in selected)
         self.lakeshore325_controls.setVisible("LakeShore325" in selected)
-        if "Keithley" in selected:
-            experiments.update(["IV Sweep",  "Time Logging", "Pulse IV Sweep"])
-
-        if "LakeShore" in selected:
-            experiments.update(["Temperature Stabilization"])
-        if "LakeShore325" in selected:
-            experiments.update(["Temperature Stabilization 325"])
-        if ("Keithley" in selected and "LakeShore" in selected) or \
-           ("Keithley2450" in selected and "LakeShore" in selected):
-            experiments.add("Temperature Dependent IV")
-
-        if "Keithley2450" in selected:
-            experiments.update(["IV Sweep 2450", "Time Logging 2450"])
-        if "LockIn" in selected:
-            experiments.update(["AC Signal Measurement", "Impedance vs Time", "Frequency Sweep",
-                               "Harmonic Detection", "AC I-V Measurement (Lock-in Only)"])
-
-        if "Keithley" in selected and "LockIn" in selected:
-            experiments.add("AC I-V Measurement (2636B)")
-
-        if "Keithley2450" in selected and "LockIn" in selected:
-            experiments.add("AC I-V Measurement (2450)")
-
-        if "LockIn" in selected and "LakeShore" in selected:
-            if "Keithley" in selected:
-                experiments.add("Temp Dependent AC I-V (2636B)")
-            if "Keithley2450" in selected:
-                experiments.add("Temp Dependent AC I-V (2450)")
 
+        # What each experiment needs is declared in experiment_registry
+        experiments = available_experiments(selected)
         if not experiments:
             self.experiment_select.addItem("Select instrument(s) first")
         else:
-            self.experiment_select.addItems(sorted(experiments))
+            self.experiment_select.addItems(experiments)
 
         self.lockin_controls.setVisible("LockIn" in selected)
-        self.experiment_select.currentIndexChanged.connect(
-            self.update_lockin_inputs_visibility)
+
+    def selected_instruments(self):
+        return [name for name, cb in self.instrument_checkboxes.items() if cb.isChecked()]
 
     def labeled_input(self, label_text, input_widget):
         layout = QHBoxLayout()
@@ -586,10 +750,20 @@ class InstrumentControlGUI(QWidget):
         layout.addWidget(input_widget, 1)
         return layout
 
+    def instrument_address(self, typed, driver):
+        """The address typed in, else the one discovery has for `driver` (None if not found)."""
+        return typed or self.discovery.find(driver)
+
+    def connect_failed(self, typed, driver):
+        """Drop a discovered address that did not connect so the next attempt rescans."""
+        if not typed:
+            self.discovery.forget(driver)
+
     # ... other methods (connect_keithley, connect_lakeshore, start_sweep, start_time_logging, etc.) remain unchanged ...
     def connect_keithley(self):
         k_address = self.k_address_input.text().strip()
-        k_ok = self.keithley.connect(address=k_address if k_address else None)
+        k_ok = self.keithley.connect(
+            address=self.instrument_address(k_address, "Keithley2636B"))
         if k_ok:
             self.keithley_address = self.keithley.address
             self.k_address_input.setPlaceholderText(
@@ -600,41 +774,49 @@ class InstrumentControlGUI(QWidget):
                 self, "Success", "Keithley connected successfully!")
             self.refresh_address_label()
         else:
+            self.connect_failed(k_address, "Keithley2636B")
             QMessageBox.critical(
                 self, "Error", "Failed to connect to Keithley.")
 
     def connect_lakeshore(self):
         l_address = self.l_address_input.text().strip()
-        l_ok = self.lakeshore.connect(address=l_address if l_address else None)
+        l_ok = self.lakeshore.connect(
+            address=self.instrument_address(l_address, "LakeShore335"))
         if l_ok:
             self.lakeshore_address = self.lakeshore.address
             self.l_address_input.setPlaceholderText(
                 f"Connected: {self.lakeshore_address}")
             self.disconnect_lakeshore_btn.setVisible(True)
             self.refresh_address_label()
+            self.watch_lakeshore()
             QMessageBox.information(
                 self, "Success", "Lake Shore connected successfully!")
         else:
+            self.connect_failed(l_address, "LakeShore335")
             QMessageBox.critical(
                 self, "Error", "Failed to connect to Lake Shore.")
 
     def connect_lakeshore325(self):
         l325_address = self.l325_address_input.text().strip()
         l325_ok = self.lakeshore325.connect(
-            address=l325_address if l325_address else None)
+            address=self.instrument_address(l325_address, "LakeShore325"))
         if l325_ok:
             self.lakeshore325_address = self.lakeshore325.address
             self.l325_address_input.setPlaceholderText(
                 f"Connected: {self.lakeshore325_address}")
             self.disconnect_lakeshore325_btn.setVisible(True)
             self.refresh_address_label()
+            self.watch_lakeshore325()
             QMessageBox.information(
                 self, "Success", "Lake Shore 325 connected successfully!")
         else:
+            self.connect_failed(l325_address, "LakeShore325")
             QMessageBox.critical(
                 self, "Error", "Failed to connect to Lake Shore 325.")
 
     def disconnect_lakeshore325(self):
+        self.temperature_monitor.unwatch("LakeShore325")
+        self.l325_live_temp_label.setText("Current Temperature: -- °C")
         self.lakeshore325.close()
         self.disconnect_lakeshore325_btn.setVisible(False)
         self.l325_address_input.setPlaceholderText("Disconnected")
@@ -643,7 +825,7 @@ class InstrumentControlGUI(QWidget):
 
     def connect_keithley_2450(self):
         address = self.k2450_address_input.text().strip()
-        ok = self.keithley2450.connect(address if address else None)
+        ok = self.keithley2450.connect(self.instrument_address(address, "Keithley2450"))
         if ok:
             self.keithley2450_address = self.keithley2450.address
             self.k2450_address_input.setPlaceholderText(
@@ -653,19 +835,30 @@ class InstrumentControlGUI(QWidget):
             QMessageBox.information(
                 self, "Success", "Keithley 2450 connected successfully!")
         else:
+            self.connect_failed(address, "Keithley2450")
             QMessageBox.critical(
                 self, "Error", "Failed to connect to Keithley 2450.")
 
     def connect_lockin(self):
         try:
-            self.lockin = SR830Controller()
+            self.lockin = SR830Controller(
+                address=self.instrument_address("", "SR830"), rm=self.rm)
             self.disconnect_lockin_btn.setVisible(True)
             QMessageBox.information(
                 self, "Success", "SR830 Lock-in connected.")
         except Exception as e:
+            self.connect_failed("", "SR830")
             QMessageBox.critical(self, "Error", str(e))
 
     def configure_lockin(self):
+        self.lockin_setup()()
+
+    def lockin_setup(self):
+        """Read the lock-in panel and return a function that applies it to the SR830.
+
+        The panel is read here, on the GUI thread; the returned function
+        only talks to the instrument, so it can run on the I/O pool.
+        """
         if not hasattr(self, 'lockin'):
             raise Exception("Lock-in not connected.")
 
@@ -673,13 +866,23 @@ class InstrumentControlGUI(QWidget):
         amp = float(self.lockin_amp_input.text())
         tc_index = int(self.lockin_tc_select.currentText())
         sens_index = int(self.lockin_sens_select.currentText())
-
-        self.lockin.set_reference(freq, amp)
-        self.lockin.set_time_constant(tc_index)
-        self.lockin.set_sensitivity(sens_index)
+        slope_index = self.lockin_slope_select.currentIndex()
+        tolerance = self.lockin_settle_tol_input.text().strip()
+        # read here on the GUI thread for lockin_points on the worker
+        self.lockin_settle_tolerance = float(tolerance) / 100 if tolerance else None
+        self.lockin_autorange = self.lockin_autorange_checkbox.isChecked()
+
+        def apply():
+            self.lockin.set_reference(freq, amp)
+            self.lockin.set_time_constant(tc_index)
+            self.lockin.set_filter_slope(slope_index)
+            self.lockin.set_sensitivity(sens_index)
+        return apply
 
     def request_stop(self):
         self.stop_requested = True
+        if self.worker is not None:
+            self.worker.stop()
         self.status_label.setText("Stopping requested...")
 
     def disconnect_keithley(self):
@@ -690,6 +893,8 @@ class InstrumentControlGUI(QWidget):
         self.refresh_address_label()
 
     def disconnect_lakeshore(self):
+        self.temperature_monitor.unwatch("LakeShore")
+        self.live_temp_label.setText("Current Temperature: -- °C")
         self.lakeshore.disconnect()
         self.disconnect_lakeshore_btn.setVisible(False)
         self.l_address_input.setPlaceholderText("Disconnected")
@@ -710,13 +915,6 @@ class InstrumentControlGUI(QWidget):
         self.disconnect_lockin_btn.setVisible(False)
         QMessageBox.information(self, "Info", "Lock-in disconnected.")
 
-    # def refresh_address_label(self):
-    #     self.instrument_address_label.setText(
-    #         f"Keithley: {self.keithley_address} | "
-    #         f"Lake Shore: {self.lakeshore_address} | "
-    #         f"Keithley 2450: {self.keithley2450_address}"
-    #     )
-
     def refresh_address_label(self):
         self.instrument_address_label.setText(
             f"Keithley: {self.keithley_address} | "
@@ -724,291 +922,426 @@ class InstrumentControlGUI(QWidget):
             f"Keithley 2450: {self.keithley2450_address} | "
             f"Lake Shore 325: {self.lakeshore325_address}"
         )
-    # ... rest of the methods unchanged ...
-    # def start_sweep(self):
-    #     channel = self.channel_select.currentText().lower()  # 'a' or 'b'
-    #     selected = [name for name, cb in self.instrument_checkboxes.items() if cb.isChecked()]
-
-    #     try:
-    #         target_temp = float(self.temp_input.text())
-    #         output_channel = int(self.output_channel_select.currentText())
-    #         input_channel = self.input_channel_select.currentText()
-    #         probe_mode = self.probe_mode_select.currentText()
-
-    #         if self.use_temp_checkbox.isChecked():
-    #            self.lakeshore.set_temperature(target_temp, channel=output_channel)
-    #            if not self.lakeshore.stabilize_temperature(target_temp, channel=input_channel):
-    #               QMessageBox.warning(self, "Warning", "Temperature not stabilized.")
-    #               return
-
-    #         source_type = self.source_select.currentText()
-    #         measure_type = self.measure_select.currentText()
-
-    #         delay = float(self.delay_input.text())
-    #         self.keithley.configure_smu(source_type=source_type, source_value=0, current_limit=0.1, source_delay=delay)
-
-    #         if probe_mode == "4-Probe":
-    #            self.keithley.smu.write(f"smu{channel}.sense = smu{channel}.SENSE_REMOTE")
-    #         else:
-    #             self.keithley.smu.write(f"smu{channel}.sense = smu{channel}.SENSE_LOCAL")
-
-    #         start_v = float(self.start_v_input.text())
-    #         stop_v = float(self.stop_v_input.text())
-    #         steps = int(self.steps_input.text())
-    #         cycles = int(self.cycles_input.text())
-
-    #         x_vals, y_vals = [], []
-
-    #         for cycle in range(cycles):
-    #             for val in np.linspace(start_v, stop_v, steps):
-    #                 if source_type == "Voltage":
-    #                     self.keithley.smu.write(f"smu{channel}.source.levelv = {val}")
-    #                 elif source_type == "Current":
-    #                     self.keithley.smu.write(f"smu{channel}.source.leveli = {val}")
-
-    #                 self.keithley.smu.write(f"smu{channel}.source.output = smu{channel}.OUTPUT_ON")
-
-    #                 time.sleep(0.05)
-    #                 measured = self.keithley.measure(measure_type)
-    #                 x_vals.append(val)
-    #                 y_vals.append(measured)
-    #                 self.plot_data(x_vals, y_vals, x_label=source_type, y_label=measure_type,
-    #                                title=f"{measure_type} vs {source_type} (Cycle {cycle + 1})")
-    #                 QApplication.processEvents()
-    #         self.keithley.smu.write(f"smu{channel}.source.output = smu{channel}.OUTPUT_OFF")
-
-    #     except Exception as e:
-    #         QMessageBox.critical(self, "Error", str(e))
-
-    #     if "Keithley2450" in selected:
-    #         try:
-    #                source_type = self.k2450_source_select.currentText()
-    #                measure_type = self.k2450_measure_select.currentText()
-    #                start_val = float(self.k2450_start_input.text())
-    #                stop_val = float(self.k2450_stop_input.text())
-    #                steps = int(self.k2450_steps_input.text())
-    #                compliance = float(self.k2450_compliance_input.text())
-
-    #                self.keithley2450.configure_smu(
-    #                source_type=source_type,
-    #                source_value=start_val,
-    #                current_limit=compliance
-    #     )
-
-    #                x_vals, y_vals = self.keithley2450.sweep(
-    #                source_type=source_type,
-    #                measure_type=measure_type,
-    #                start=start_val,
-    #                stop=stop_val,
-    #                steps=steps,
-    #                delay=0.1
-    #     )
-
-    #                self.plot_data(
-    #                x_vals, y_vals,
-    #                x_label=source_type,
-    #                y_label=measure_type,
-    #                title="Keithley 2450 Sweep"
-    #     )
-
-    #         except Exception as e:
-    #                QMessageBox.critical(self, "Error", f"2450 Sweep Failed:\n{e}")
-
-    # def start_sweep(self):
-    #     experiment = self.experiment_select.currentText()
-    #     selected = [name for name, cb in self.instrument_checkboxes.items() if cb.isChecked()]
-    #     channel = self.channel_select.currentText().lower()
-
-    #     try:
-    #     # If LakeShore selected, stabilize temperature first
-    #        if "LakeShore" in selected:
-    #            target_temp = float(self.temp_input.text())
-    #            output_channel = int(self.output_channel_select.currentText())
-    #            input_channel = self.input_channel_select.currentText()
-
-    #            self.lakeshore.set_temperature(target_temp, channel=output_channel)
-    #            if not self.lakeshore.stabilize_temperature(target_temp, channel=input_channel):
-    #                 QMessageBox.warning(self, "Warning", "Temperature not stabilized.")
-    #                 return
-
-    #     # --- Keithley 2636B Sweep ---
-    #        if "Keithley" in selected:
-    #             probe_mode = self.probe_mode_select.currentText()
-    #             source_type = self.source_select.currentText()
-    #             measure_type = self.measure_select.currentText()
-    #             delay = float(self.delay_input.text())
-
-    #             self.keithley.configure_smu(
-    #                 source_type=source_type,
-    #                 source_value=0,
-    #                 current_limit=0.1,
-    #                 source_delay=delay
-    #             )
-
-    #             if probe_mode == "4-Probe":
-    #                 self.keithley.smu.write(f"smu{channel}.sense = smu{channel}.SENSE_REMOTE")
-    #             else:
-    #                 self.keithley.smu.write(f"smu{channel}.sense = smu{channel}.SENSE_LOCAL")
-
-    #             start_v = float(self.start_v_input.text())
-    #             stop_v = float(self.stop_v_input.text())
-    #             steps = int(self.steps_input.text())
-    #             cycles = int(self.cycles_input.text())
-
-    #             x_vals, y_vals = [], []
-
-    #             for cycle in range(cycles):
-    #                 for val in np.linspace(start_v, stop_v, steps):
-    #                     if source_type == "Voltage":
-    #                         self.keithley.smu.write(f"smu{channel}.source.levelv = {val}")
-    #                     elif source_type == "Current":
-    #                         self.keithley.smu.write(f"smu{channel}.source.leveli = {val}")
-
-    #                     self.keithley.smu.write(f"smu{channel}.source.output = smu{channel}.OUTPUT_ON")
-    #                     time.sleep(0.05)
-    #                     measured = self.keithley.measure(measure_type)
-    #                     x_vals.append(val)
-    #                     y_vals.append(measured)
-
-    #                     self.plot_data(
-    #                         x_vals, y_vals,
-    #                         x_label=source_type,
-    #                         y_label=measure_type,
-    #                         title=f"Keithley 2636B: {measure_type} vs {source_type} (Cycle {cycle + 1})"
-    #                     )
-    #                     QApplication.processEvents()
-
-    #             self.keithley.smu.write(f"smu{channel}.source.output = smu{channel}.OUTPUT_OFF")
-
-    #     # --- Keithley 2450 Sweep ---
-    #        if "Keithley2450" in selected:
-    #         # Optionally re-check temperature for 2450 as well
-    #             if "LakeShore" in selected:
-    #                 target_temp = float(self.temp_input.text())
-    #                 output_channel = int(self.output_channel_select.currentText())
-    #                 input_channel = self.input_channel_select.currentText()
-
-    #                 self.lakeshore.set_temperature(target_temp, channel=output_channel)
-    #                 if not self.lakeshore.stabilize_temperature(target_temp, channel=input_channel):
-    #                     QMessageBox.warning(self, "Warning", "Temperature not stabilized.")
-    #                     return
-
-    #             source_type = self.k2450_source_select.currentText()
-    #             measure_type = self.k2450_measure_select.currentText()
-    #             start_val = float(self.k2450_start_input.text())
-    #             stop_val = float(self.k2450_stop_input.text())
-    #             steps = int(self.k2450_steps_input.text())
-    #             compliance = float(self.k2450_compliance_input.text())
-    #             cycles = int(self.cycles_input.text())
-
-    #             self.keithley2450.configure_smu(
-    #                 source_type=source_type,
-    #                 source_value=start_val,
-    #                 current_limit=compliance
-    #             )
-
-    #             x_vals, y_vals = [], []
-
-    #             for cycle in range(cycles):
-    #                 x_cycle, y_cycle = self.keithley2450.sweep(
-    #                     source_type=source_type,
-    #                     measure_type=measure_type,
-    #                     start=start_val,
-    #                     stop=stop_val,
-    #                     steps=steps,
-    #                     delay=0.1
-    #                 )
-    #                 x_vals.extend(x_cycle)
-    #                 y_vals.extend(y_cycle)
-
-    #                 self.plot_data(
-    #                     x_vals, y_vals,
-    #                     x_label=source_type,
-    #                     y_label=measure_type,
-    #                     title=f"Keithley 2450 Sweep (Cycle {cycle + 1})"
-    #                 )
-    #                 QApplication.processEvents()
-
-    #     except Exception as e:
-    #         QMessageBox.critical(self, "Error", f"Sweep Failed:\n{e}")
 
     def start_sweep(self):
-        experiment = self.experiment_select.currentText()
-        selected = [name for name,
-                    cb in self.instrument_checkboxes.items() if cb.isChecked()]
+        experiment = find_experiment(self.experiment_select.currentText())
         self.stop_requested = False
+        if experiment is None:
+            QMessageBox.information(
+                self, "Experiment", "Please select a valid experiment.")
+            return
 
         try:
-            if experiment == "IV Sweep":
-                self.run_iv_sweep(selected)
-
-            elif experiment == "IV Sweep 2450":
-                self.run_iv_sweep(selected)
-
-            elif experiment == "Pulse IV Sweep":
-                self.run_pulse_iv_2636b()
-
-            elif experiment == "AC Signal Measurement":
-                self.start_ac_signal_measurement()  # Lock-in only
-
-            elif experiment == "AC I-V Measurement (2636B)":
-                self.run_ac_iv_2636b()
-
-            elif experiment == "AC I-V Measurement (2450)":
-                self.run_ac_iv_2450()
-
-            elif experiment == "Temperature Dependent AC I-V (2636B)":
-                self.run_temp_ac_iv_2636b()
-
-            elif experiment == "Temperature Dependent AC I-V (2450)":
-                self.run_temp_ac_iv_2450()
-            elif experiment == "Frequency Sweep":
-                self.run_lockin_frequency_sweep()
-            elif experiment == "Impedance vs Time":
-                self.run_impedance_vs_time()
-            elif experiment == "Time Logging":
-                self.start_time_logging()
-            elif experiment == "AC I-V Measurement (Lock-in Only)":
-                self.run_ac_iv_lockin_only()
-
-            else:
-                QMessageBox.information(
-                    self, "Experiment", "Please select a valid experiment.")
-
+            runner(experiment, self)()
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Experiment failed:\n{e}")
 
-    def run_iv_sweep(self, selected):
-        # --- Temperature stabilization if LakeShore is selected ---
-        if "LakeShore" in selected:
+    def start_experiment(self, experiment, done_message, error_title="Experiment failed",
+                         stopped_message="Sweep stopped."):
+        """Run an experiment generator on an AcquisitionWorker.
+
+        Widget values must be read before calling this; `experiment` runs on
+        the worker thread and may only talk to the instruments.
+        """
+        if self.worker is not None and self.worker.isRunning():
+            QMessageBox.warning(
+                self, "Busy", "An experiment is already running.")
+            return
+
+        metadata = self.collect_run_metadata()
+        recorder = None
+        if self.record_checkbox.isChecked():
+            path = self.record_path_input.text().strip() or \
+                time.strftime("run_%Y%m%d_%H%M%S.csv")
             try:
-                target_temp = float(self.temp_input.text())
-                output_channel = int(self.output_channel_select.currentText())
-                input_channel = self.input_channel_select.currentText()
-
-                self.lakeshore.set_temperature(
-                    target_temp, channel=output_channel)
-                if not self.lakeshore.stabilize_temperature(target_temp, channel=input_channel):
-                    QMessageBox.warning(
-                        self, "Warning", "Temperature not stabilized.")
-                    return
+                recorder = open_recorder(path, metadata)
             except Exception as e:
-                QMessageBox.critical(self, "LakeShore Error", str(e))
+                QMessageBox.critical(
+                    self, "Error", f"Cannot open recording file:\n{e}")
                 return
 
-        # --- Keithley 2636B Sweep ---
-        if "Keithley" in selected:
+        self.stop_requested = False
+        self.run_traces = {}
+        self.run_buffers = {}
+        self.run_metadata = metadata
+        self.run_recorder = recorder
+        self.run_messages = (done_message, error_title, stopped_message)
+        self.run_failed = False
+
+        self.init_plot()
+        self.worker = AcquisitionWorker(experiment, recorder=recorder)
+        self.worker.trace_started.connect(self.on_trace_started)
+        self.worker.points_ready.connect(self.on_points_ready)
+        self.worker.status_changed.connect(self.status_label.setText)
+        self.worker.failed.connect(self.on_experiment_failed)
+        self.worker.finished.connect(self.on_experiment_finished)
+
+        self.start_btn.setEnabled(False)
+        self.start_log_btn.setEnabled(False)
+        self.status_label.setText("Running...")
+        self.plot_timer.start()
+        self.worker.start()
+
+    def collect_run_metadata(self):
+        """Instrument settings in effect for a run, stored alongside its data."""
+        return {
+            "experiment": self.experiment_select.currentText(),
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "instruments": ", ".join(name for name, cb in self.instrument_checkboxes.items()
+                                     if cb.isChecked()),
+            "keithley_2636b_address": self.keithley_address,
+            "keithley_2636b_channel": self.channel_select.currentText(),
+            "source_type": self.source_select.currentText(),
+            "measure_type": self.measure_select.currentText(),
+            "compliance": self.compliance_input.text(),
+            "nplc": self.nplc_input.text(),
+            "source_delay_s": self.delay_input.text(),
+            "probe_mode": self.probe_mode_select.currentText(),
+            "adaptive_steps": self.adaptive_sweep_checkbox.isChecked(),
+            "keithley_2450_address": self.keithley2450_address,
+            "k2450_source_type": self.k2450_source_select.currentText(),
+            "k2450_measure_type": self.k2450_measure_select.currentText(),
+            "k2450_compliance": self.k2450_compliance_input.text(),
+            "k2450_nplc": self.k2450_nplc_input.text(),
+            "k2450_adaptive_steps": self.k2450_adaptive_checkbox.isChecked(),
+            "lockin_frequency_hz": self.lockin_freq_input.text(),
+            "lockin_amplitude_v": self.lockin_amp_input.text(),
+            "lockin_time_constant_index": self.lockin_tc_select.currentText(),
+            "lockin_filter_slope_db_oct": self.lockin_slope_select.currentText(),
+            "lockin_settle_tolerance_pct": self.lockin_settle_tol_input.text(),
+            "lockin_sensitivity_index": self.lockin_sens_select.currentText(),
+            "lockin_autorange": self.lockin_autorange_checkbox.isChecked(),
+            "lockin_output_mode": self.lockin_output_mode.currentText(),
+            "lockin_frequency_spacing": self.lockin_freq_spacing_select.currentText(),
+            "lockin_buffered": self.lockin_buffered_checkbox.isChecked(),
+            "lakeshore_address": self.lakeshore_address,
+            "temperature_setpoint_c": self.temp_input.text(),
+            "temperature_series_c": self.temp_series_input.text(),
+            "lakeshore_sensor_channel": self.input_channel_select.currentText(),
+            # last monitored reading, so starting a run costs no extra query
+            "temperature_at_start_c": self.temperature_monitor.latest("LakeShore"),
+            "stability_band_c": self.stability_band_input.text(),
+            "stability_window_s": self.stability_window_input.text(),
+            "stability_timeout_s": self.stability_timeout_input.text(),
+            "ramp_to_c": self.ramp_stop_input.text(),
+            "ramp_rate_k_per_min": self.ramp_rate_input.text(),
+            "ramp_interval_s": self.ramp_interval_input.text(),
+            "memory_points": self.memory_points_input.text(),
+        }
+
+    def on_trace_started(self, trace):
+        """Plot a new trace, or switch back to one this run already started.
+
+        Runs that alternate between traces (two SMUs over a temperature
+        series) keep adding to one buffer per title; all of them are saved.
+        """
+        y_labels = [trace["y_label"]]
+        if "y2_label" in trace:
+            y_labels.append(trace["y2_label"])
+        columns = trace_columns(trace)
+        buffer = self.run_buffers.get(trace["title"])
+        if buffer is None or buffer.columns != tuple(columns):
+            buffer = AcquisitionBuffer(columns, max_points=trace.get("max_points"))
+            self.run_buffers[trace["title"]] = buffer
+            self.run_traces[trace["title"]] = trace
+        self.data_buffer = buffer
+        self.live_plot.start(self.data_buffer, trace["x_label"], y_labels, trace["title"],
+                             log_x=trace.get("log_x") or self.log_x_checkbox.isChecked(),
+                             log_y=self.log_y_checkbox.isChecked(),
+                             sort_x=trace.get("sort_x", False))
+        if len(buffer):
+            self.live_plot.mark_dirty()
+
+    def on_points_ready(self, points):
+        if self.data_buffer is None:
+            return
+        self.data_buffer.extend(points)
+        self.live_plot.mark_dirty()
+
+    def refresh_live_plot(self):
+        self.live_plot.refresh()
+
+    def on_experiment_failed(self, message):
+        self.run_failed = True
+        done_message, error_title, stopped_message = self.run_messages
+        self.status_label.setText(f"{error_title}.")
+        QMessageBox.critical(self, "Error", f"{error_title}:\n{message}")
+
+    def on_experiment_finished(self):
+        self.plot_timer.stop()
+        self.live_plot.finish()
+        self.start_btn.setEnabled(True)
+        self.start_log_btn.setEnabled(True)
+
+        done_message, error_title, stopped_message = self.run_messages
+        if self.run_failed:
+            return
+        if self.stop_requested:
+            message = stopped_message
+        else:
+            message = done_message
+        if self.worker.summary:
+            message += f" ({self.worker.summary})"
+        if self.run_recorder is not None:
+            message += f" Data recorded to {self.run_recorder.path}"
+        self.status_label.setText(message)
+
+    def stability_settings(self):
+        """Stability band, window and timeout from the Lake Shore panel, for stabilize_lakeshore."""
+        return {"tolerance": float(self.stability_band_input.text()),
+                "window": float(self.stability_window_input.text()),
+                "timeout": float(self.stability_timeout_input.text())}
+
+    def temperature_setpoints(self):
+        """Setpoints to run at: the series field ("10, 20, 30" or start:stop:step), else Set Temperature."""
+        text = self.temp_series_input.text().strip()
+        if not text:
+            return [float(self.temp_input.text())]
+        if ":" not in text:
+            return [float(value) for value in text.replace(";", ",").split(",") if value.strip()]
+        try:
+            start, stop, step = (float(value) for value in text.split(":"))
+        except ValueError:
+            raise ValueError(f"Setpoint range must be start:stop:step, got {text!r}")
+        if step == 0:
+            raise ValueError("Setpoint step must not be zero")
+        step = abs(step) if stop >= start else -abs(step)
+        count = int(np.floor((stop - start) / step + 1e-9)) + 1
+        return [round(start + i * step, 6) for i in range(count)]
+
+    def stabilize_lakeshore(self, worker, target_temp, output_channel, input_channel,
+                            tolerance=0.1, window=10.0, timeout=300):
+        """Set the Lake Shore 335 setpoint and wait for it from the worker thread."""
+        worker.status_changed.emit(f"Stabilizing at {target_temp} °C...")
+        self.lakeshore.set_temperature(target_temp, channel=output_channel)
+        if not self.lakeshore.stabilize_temperature(
+                target_temp, tolerance=tolerance, timeout=timeout, window=window,
+                channel=input_channel, stop_check=worker.should_stop,
+                progress=lambda text: worker.status_changed.emit(f"Stabilizing (°C): {text}")):
+            if worker.should_stop():
+                return False
+            raise RuntimeError("Temperature not stabilized.")
+        return True
+
+    def temperature_series(self, worker, setpoints, output_channel, input_channel, stability,
+                           measure, prepare=()):
+        """Stabilize at each setpoint in turn and yield from measure(setpoint) there.
+
+        `prepare` is a list of (resource, fn) pairs, typically SMU
+        configuration, run on the I/O pool while the first setpoint is still
+        being approached instead of after it. Each setpoint is sent as soon
+        as the previous measurement is done; the recorder and the GUI handle
+        that data on their own threads during the ramp. Every point gets the
+        setpoint appended as an extra column, and a trace is only re-sent
+        when the measurement switches to a different title, so each
+        instrument's sweeps at all temperatures collect in one trace even
+        when two instruments take turns (see on_trace_started). A setpoint
+        that does not stabilize is skipped (the run fails if it is the only
+        one).
+        """
+        pending = [self.io_pool.submit(resource.resource_name, fn) for resource, fn in prepare]
+        traces = {}
+        current = None
+        skipped = []
+        for number, setpoint in enumerate(setpoints, 1):
+            if worker.should_stop():
+                break
+            try:
+                stable = self.stabilize_lakeshore(
+                    worker, setpoint, output_channel, input_channel, **stability)
+            except RuntimeError:
+                if len(setpoints) == 1:
+                    raise
+                skipped.append(setpoint)
+                worker.status_changed.emit(f"{setpoint} °C not stabilized, skipped.")
+                continue
+            finally:
+                # the instruments must be configured before anything is measured
+                while pending:
+                    pending.pop(0).result()
+            if not stable:
+                return
+            worker.status_changed.emit(
+                f"Setpoint {number} of {len(setpoints)}: measuring at {setpoint} °C")
+            for item in measure(setpoint):
+                if isinstance(item, dict):
+                    if item["title"] == current:
+                        continue
+                    current = item["title"]
+                    if current not in traces:
+                        extra_columns = {**item.get("extra_columns", {}),
+                                         "setpoint": "Setpoint (°C)"}
+                        traces[current] = {**item, "extra_columns": extra_columns}
+                    yield traces[current]
+                elif isinstance(item, list):
+                    yield [tuple(point) + (setpoint,) for point in item]
+                else:
+                    yield tuple(item) + (setpoint,)
+
+        if len(setpoints) > 1:
+            done = len(setpoints) - len(skipped)
+            report = f"{done} of {len(setpoints)} setpoints"
+            if skipped:
+                report += f", skipped {', '.join(f'{t:g}' for t in skipped)} °C"
+            worker.summary = f"{report}; {worker.summary}" if worker.summary else report
+
+    def lockin_points(self, worker, values, set_value, output_mode):
+        """Step `set_value` through `values`, yielding (value, ch1, ch2) lock-in readings.
+
+        Each reading is taken once the lock-in output has settled for its
+        time constant and filter slope (see configure_lockin). With auto
+        sensitivity the full scale used is appended: (value, ch1, ch2, range).
+        """
+        channels = self.LOCKIN_CHANNELS[output_mode]
+        changes = 0
+        for v in values:
+            if worker.should_stop():
+                return
+
+            set_value(v)
+            if not self.lockin_autorange:
+                reading = self.lockin.settle(channels, tolerance=self.lockin_settle_tolerance,
+                                             sleep=worker.sleep)
+                if reading is None:
+                    return
+                ch1, ch2 = reading
+                yield v, ch1, ch2
+                continue
+
+            previous = self.lockin.sensitivity_index
+            result = self.lockin.autorange_settle(
+                channels, tolerance=self.lockin_settle_tolerance, sleep=worker.sleep)
+            if result is None:
+                return
+            (ch1, ch2), full_scale = result
+            if self.lockin.sensitivity_index != previous:
+                changes += 1
+                worker.summary = f"{changes} sensitivity changes"
+            yield v, ch1, ch2, full_scale
+
+    def lockin_buffered_blocks(self, worker, interval, output_mode, duration):
+        """Stream (times, ch1, ch2) blocks from the SR830 buffer at about 1 / `interval`."""
+        blocks = self.lockin.buffered_stream(1.0 / interval, output_mode, duration)
+        rate = self.lockin.SAMPLE_RATES[self.lockin.sample_rate_index(1.0 / interval)]
+        samples = 0
+        try:
+            for block in blocks:
+                samples += len(block[0])
+                yield block
+                if worker.should_stop():
+                    return
+        finally:
+            blocks.close()
+            worker.summary = f"{samples} samples at {rate:g} Hz from the SR830 buffer"
+
+    def adaptive_points(self, worker, measure_points, start, stop, initial_points,
+                        max_points, threshold, log=False, channels=1):
+        """Run an AdaptiveSweep from start to stop, yielding the measured points.
+
+        `measure_points(values)` measures one batch of source values and
+        yields (value, reading, ...) tuples, or lists of them for points read
+        back as a block. The first `channels` readings steer the refinement;
+        any further columns (temperature, lock-in range) are bookkeeping.
+        """
+        sweep = AdaptiveSweep(start, stop, initial_points=initial_points,
+                              max_points=max_points, threshold=threshold, log=log)
+        for batch in sweep.batches():
+            for item in measure_points(batch):
+                for point in (item if isinstance(item, list) else [item]):
+                    sweep.add(point[0], point[1:1 + channels])
+                yield item
+            if worker.should_stop():
+                return
+        worker.summary = f"{len(sweep.x)} adaptive points"
+
+    def read_with_temperature(self, resource, measure, input_channel):
+        """Run measure() and a Lake Shore 335 reading concurrently; returns (reading, °C)."""
+        reading, temperature = self.io_pool.gather(
+            (resource.resource_name, measure),
+            (self.lakeshore.lakeshore.resource_name,
+             # the controller only updates its readings every READING_INTERVAL anyway
+             lambda: self.lakeshore.get_temperature(
+                 input_channel, max_age=self.lakeshore.READING_INTERVAL)))
+        return reading.value, temperature.value
+
+    def lockin_trace(self, x_label, output_mode, title):
+        if output_mode == "X/Y":
+            trace = {"x_label": x_label, "y_label": "X (V)", "y2_label": "Y (V)", "title": title}
+        else:
+            trace = {"x_label": x_label, "y_label": "R (V)", "y2_label": "θ (°)", "title": title}
+        trace.update(self.lockin_range_column())
+        return trace
+
+    def memory_window(self):
+        """Trace entry limiting a continuous run's in-memory buffer to the newest N points."""
+        points = int(self.memory_points_input.text() or 0)
+        if points > 0:
+            return {"max_points": points}
+        return {}
+
+    def lockin_range_column(self):
+        """Trace entry for the sensitivity column lockin_points adds with auto sensitivity."""
+        if getattr(self, "lockin_autorange", False):
+            return {"extra_columns": {"sensitivity": "Sensitivity (V)"}}
+        return {}
+
+    def run_iv_sweep(self, smus=KEITHLEYS):
+        """IV sweep on each selected SMU among `smus` (at every setpoint with the Lake Shore)."""
+        selected = self.selected_instruments()
+        use_lakeshore = "LakeShore" in selected
+        use_2636b = "Keithley" in selected and "Keithley" in smus
+        use_2450 = "Keithley2450" in selected and "Keithley2450" in smus
+
+        if use_lakeshore:
+            setpoints = self.temperature_setpoints()
+            output_channel = int(self.output_channel_select.currentText())
+            input_channel = self.input_channel_select.currentText()
+            stability = self.stability_settings()
+
+        if use_2636b:
             channel = self.channel_select.currentText().lower()
             probe_mode = self.probe_mode_select.currentText()
             source_type = self.source_select.currentText()
             measure_type = self.measure_select.currentText()
             delay = float(self.delay_input.text())
-
+            start_v = float(self.start_v_input.text())
+            stop_v = float(self.stop_v_input.text())
+            steps = int(self.steps_input.text())
+            cycles = int(self.cycles_input.text())
+            nplc = float(self.nplc_input.text())
+            hardware_timed = self.tsp_sweep_checkbox.isChecked()
+            adaptive = self.adaptive_sweep_checkbox.isChecked()
+            max_points = int(self.adaptive_max_points_input.text())
+            threshold = float(self.adaptive_threshold_input.text()) / 100
+
+        if use_2450:
+            k2450_source_type = self.k2450_source_select.currentText()
+            k2450_measure_type = self.k2450_measure_select.currentText()
+            start_val = float(self.k2450_start_input.text())
+            stop_val = float(self.k2450_stop_input.text())
+            k2450_steps = int(self.k2450_steps_input.text())
+            compliance = float(self.k2450_compliance_input.text())
+            k2450_cycles = int(self.k2450_cycles_input.text())
+            k2450_nplc = float(self.k2450_nplc_input.text())
+            dual_sweep = self.dual_sweep_checkbox_2450.isChecked()
+            buffered = self.k2450_buffered_checkbox.isChecked()
+            binary = self.k2450_binary_checkbox.isChecked()
+            k2450_adaptive = self.k2450_adaptive_checkbox.isChecked()
+            k2450_max_points = int(self.k2450_adaptive_max_points_input.text())
+            k2450_threshold = float(self.k2450_adaptive_threshold_input.text()) / 100
+
+        # With the Lake Shore in the run every point also records the sample
+        # temperature, read alongside the SMU rather than after it
+        temperature_column = {"extra_columns": {"temperature": "T (°C)"}} if use_lakeshore else {}
+
+        def configure_2636b():
+            self.keithley.set_channel(f"smu{channel}")
             self.keithley.configure_smu(
                 source_type=source_type,
                 source_value=0,
                 current_limit=0.1,
-                source_delay=delay
+                source_delay=delay,
+                nplc=nplc
             )
 
             if probe_mode == "4-Probe":
@@ -1018,101 +1351,158 @@ class InstrumentControlGUI(QWidget):
                 self.keithley.smu.write(
                     f"smu{channel}.sense = smu{channel}.SENSE_LOCAL")
 
-            start_v = float(self.start_v_input.text())
-            stop_v = float(self.stop_v_input.text())
-            steps = int(self.steps_input.text())
-            cycles = int(self.cycles_input.text())
-
-            x_vals, y_vals = [], []
+        def configure_2450():
+            self.keithley2450.configure_smu(
+                source_type=k2450_source_type,
+                source_value=start_val,
+                current_limit=compliance,
+                nplc=k2450_nplc
+            )
 
-            for cycle in range(cycles):
-                for val in np.linspace(start_v, stop_v, steps):
-                    if self.stop_requested:
-                        self.status_label.setText("Sweep stopped.")
+        def sweeps(worker):
+            # --- Keithley 2636B Sweep ---
+            if use_2636b:
+                def measure_points(values=None):
+                    """Source each value in turn (start..stop if `values` is None) and yield (value, reading)."""
+                    if hardware_timed:
+                        def tsp_sweep():
+                            return self.keithley.tsp_sweep(
+                                source_type=source_type,
+                                measure_type=measure_type,
+                                start=start_v,
+                                stop=stop_v,
+                                steps=steps,
+                                values=values
+                            )
+                        if not use_lakeshore:
+                            x_run, y_run = tsp_sweep()
+                            yield list(zip(x_run, y_run))
+                            return
+                        (x_run, y_run), temperature = self.read_with_temperature(
+                            self.keithley.smu, tsp_sweep, input_channel)
+                        yield [(x, y, temperature) for x, y in zip(x_run, y_run)]
                         return
 
-                    if source_type == "Voltage":
-                        self.keithley.smu.write(
-                            f"smu{channel}.source.levelv = {val}")
-                    elif source_type == "Current":
-                        self.keithley.smu.write(
-                            f"smu{channel}.source.leveli = {val}")
+                    if values is None:
+                        values = np.linspace(start_v, stop_v, steps)
+                    for val in values:
+                        if worker.should_stop():
+                            return
 
+                        if source_type == "Voltage":
+                            self.keithley.smu.write(
+                                f"smu{channel}.source.levelv = {val}")
+                        elif source_type == "Current":
+                            self.keithley.smu.write(
+                                f"smu{channel}.source.leveli = {val}")
+
+                        self.keithley.smu.write(
+                            f"smu{channel}.source.output = smu{channel}.OUTPUT_ON")
+                        time.sleep(0.05)
+                        if not use_lakeshore:
+                            yield val, self.keithley.measure(measure_type)
+                            continue
+                        measured, temperature = self.read_with_temperature(
+                            self.keithley.smu, lambda: self.keithley.measure(measure_type),
+                            input_channel)
+                        yield val, measured, temperature
+
+                yield {"x_label": source_type, "y_label": measure_type,
+                       "title": f"Keithley 2636B: {measure_type} vs {source_type}",
+                       "sort_x": adaptive, **temperature_column}
+                try:
+                    for cycle in range(cycles):
+                        if worker.should_stop():
+                            return
+                        worker.status_changed.emit(
+                            f"Keithley 2636B sweep: cycle {cycle + 1} of {cycles}")
+                        if adaptive:
+                            yield from self.adaptive_points(
+                                worker, measure_points, start_v, stop_v, steps,
+                                max_points, threshold)
+                        else:
+                            yield from measure_points()
+                finally:
                     self.keithley.smu.write(
-                        f"smu{channel}.source.output = smu{channel}.OUTPUT_ON")
-                    time.sleep(0.05)
-                    measured = self.keithley.measure(measure_type)
-                    x_vals.append(val)
-                    y_vals.append(measured)
-
-                    self.plot_data(
-                        x_vals, y_vals,
-                        x_label=source_type,
-                        y_label=measure_type,
-                        title=f"Keithley 2636B: {measure_type} vs {source_type} (Cycle {cycle + 1})"
+                        f"smu{channel}.source.output = smu{channel}.OUTPUT_OFF")
+
+            # --- Keithley 2450 Sweep ---
+            if use_2450:
+                def sweep_2450(values=None, start=start_val, stop=stop_val):
+                    """Sweep the explicit `values`, or the linear start..stop ramp if there are none."""
+                    if buffered:
+                        return self.keithley2450.buffered_sweep(
+                            source_type=k2450_source_type,
+                            measure_type=k2450_measure_type,
+                            start=start,
+                            stop=stop,
+                            steps=k2450_steps,
+                            delay=0.1,
+                            values=values,
+                            binary=binary
+                        )
+                    return self.keithley2450.sweep(
+                        source_type=k2450_source_type,
+                        measure_type=k2450_measure_type,
+                        start=start,
+                        stop=stop,
+                        steps=k2450_steps,
+                        delay=0.1,
+                        values=values
                     )
-                    QApplication.processEvents()
 
-            self.keithley.smu.write(
-                f"smu{channel}.source.output = smu{channel}.OUTPUT_OFF")
-            self.stream_data = (x_vals, y_vals)
-        # --- Keithley 2450 Sweep ---
-        if "Keithley2450" in selected:
-            source_type = self.k2450_source_select.currentText()
-            measure_type = self.k2450_measure_select.currentText()
-            start_val = float(self.k2450_start_input.text())
-            stop_val = float(self.k2450_stop_input.text())
-            steps = int(self.k2450_steps_input.text())
-            compliance = float(self.k2450_compliance_input.text())
-            # cycles = int(self.cycles_input.text())
-            cycles = int(self.k2450_cycles_input.text())
-
-            self.keithley2450.configure_smu(
-                source_type=source_type,
-                source_value=start_val,
-                current_limit=compliance
-            )
-
-            x_vals, y_vals = [], []
+                def measure_2450_points(values=None, start=start_val, stop=stop_val):
+                    if not use_lakeshore:
+                        x_run, y_run = sweep_2450(values, start, stop)
+                        yield list(zip(x_run, y_run))
+                        return
+                    # one temperature reading, taken while the block runs
+                    (x_run, y_run), temperature = self.read_with_temperature(
+                        self.keithley2450.smu, lambda: sweep_2450(values, start, stop), input_channel)
+                    yield [(x, y, temperature) for x, y in zip(x_run, y_run)]
+
+                yield {"x_label": k2450_source_type, "y_label": k2450_measure_type,
+                       "title": "Keithley 2450 Sweep", "sort_x": k2450_adaptive,
+                       **temperature_column}
+                for cycle in range(k2450_cycles):
+                    if worker.should_stop():
+                        return
+                    worker.status_changed.emit(
+                        f"Keithley 2450 sweep: cycle {cycle + 1} of {k2450_cycles}")
+
+                    if k2450_adaptive:
+                        yield from self.adaptive_points(
+                            worker, measure_2450_points, start_val, stop_val, k2450_steps,
+                            k2450_max_points, k2450_threshold)
+                        continue
+
+                    legs = [(start_val, stop_val)]
+                    if dual_sweep:
+                        legs.append((stop_val, start_val))
+                    for leg_start, leg_stop in legs:
+                        yield from measure_2450_points(start=leg_start, stop=leg_stop)
+
+        def acquire(worker):
+            # --- With the Lake Shore: sweep at every setpoint, configuring the SMUs during the first ramp ---
+            if use_lakeshore:
+                prepare = []
+                if use_2636b:
+                    prepare.append((self.keithley.smu, configure_2636b))
+                if use_2450:
+                    prepare.append((self.keithley2450.smu, configure_2450))
+                yield from self.temperature_series(
+                    worker, setpoints, output_channel, input_channel, stability,
+                    lambda setpoint: sweeps(worker), prepare)
+                return
 
-            for cycle in range(cycles):
-                if self.stop_requested:
-                    self.status_label.setText("Sweep stopped.")
-                    return
+            if use_2636b:
+                configure_2636b()
+            if use_2450:
+                configure_2450()
+            yield from sweeps(worker)
 
-                x_cycle, y_cycle = self.keithley2450.sweep(
-                    source_type=source_type,
-                    measure_type=measure_type,
-                    start=start_val,
-                    stop=stop_val,
-                    steps=steps,
-                    delay=0.1
-                )
-                # x_vals.extend(x_cycle)
-                # y_vals.extend(y_cycle)
-
-                x_vals.extend(x_cycle)
-                y_vals.extend(y_cycle)
-
-                if self.dual_sweep_checkbox_2450.isChecked():
-                    x_rev, y_rev = self.keithley2450.sweep(
-                        source_type=source_type,
-                        measure_type=measure_type,
-                        start=stop_val,
-                        stop=start_val,
-                        steps=steps,
-                        delay=0.1
-                    )
-                    x_vals.extend(x_rev)
-                    y_vals.extend(y_rev)
-                self.plot_data(
-                    x_vals, y_vals,
-                    x_label=source_type,
-                    y_label=measure_type,
-                    title=f"Keithley 2450 Sweep (Cycle {cycle + 1})"
-                )
-                QApplication.processEvents()
-                self.stream_data = (x_vals, y_vals)
+        self.start_experiment(acquire, "IV sweep complete.",
+                              error_title="Sweep failed")
 
     def run_ac_iv_lockin_only(self):
         try:
@@ -1124,142 +1514,274 @@ class InstrumentControlGUI(QWidget):
             output_mode = self.lockin_output_mode.currentText()
 
             voltages = np.linspace(start, stop, steps)
-            x_vals, y1_vals, y2_vals = [], [], []
-
-            for v in voltages:
-                if self.stop_requested:
-                    self.status_label.setText("AC IV sweep stopped.")
-                    return
-
-                # ✅ You'll need to implement this in SR830Controller
-                self.lockin.set_offset_voltage(v)
-                time.sleep(0.3)
 
-                if output_mode == "X/Y":
-                    x, y = self.lockin.read_xy()
-                    y1_vals.append(x)
-                    y2_vals.append(y)
-                else:
-                    r, theta = self.lockin.read_rtheta()
-                    y1_vals.append(r)
-                    y2_vals.append(theta)
-                x_vals.append(v)
-
-            if output_mode == "X/Y":
-                self.plot_dual_data(
-                    x_vals, y1_vals, y2_vals, "V (Lock-in Offset)", "X (V)", "Y (V)", "AC I-V (Lock-in Only)")
-            else:
-                self.plot_dual_data(
-                    x_vals, y1_vals, y2_vals, "V (Lock-in Offset)", "R (V)", "θ (°)", "AC I-V (Lock-in Only)")
+            def acquire(worker):
+                yield self.lockin_trace("V (Lock-in Offset)", output_mode, "AC I-V (Lock-in Only)")
+                yield from self.lockin_points(
+                    worker, voltages, self.lockin.set_offset_voltage, output_mode)
 
-            self.status_label.setText("AC IV with Lock-in completed.")
+            self.start_experiment(acquire, "AC IV with Lock-in completed.",
+                                  error_title="AC IV Lock-in only failed",
+                                  stopped_message="AC IV sweep stopped.")
         except Exception as e:
             QMessageBox.critical(
                 self, "Error", f"AC IV Lock-in only failed:\n{e}")
 
-    def run_ac_iv_2636b(self):
+    def ac_iv_experiment(self, smu, settings):
+        """Build the AC I-V measurement for a Keithley source plus the lock-in.
+
+        `settings` are the keyword arguments of smu.configure_smu(), read from
+        the panel beforehand. Returns (smu, prepare, sweep): `prepare` is a
+        list of (resource, fn) pairs, as temperature_series takes them, that
+        configure the lock-in and the SMU and switch the SMU output on;
+        sweep(worker) steps the source and yields the trace and the lock-in
+        points. The caller switches the output off when it is done.
+        """
+        apply_lockin = self.lockin_setup()
+        start = float(self.ac_start_input.text())
+        stop = float(self.ac_stop_input.text())
+        steps = int(self.ac_steps_input.text())
+        source_type = self.ac_source_type.currentText()
+        output_mode = self.lockin_output_mode.currentText()
+
+        voltages = np.linspace(start, stop, steps)
+
+        def configure_smu():
+            smu.configure_smu(source_type=source_type, **settings)
+            smu.output_on()
+
+        def sweep(worker):
+            yield self.lockin_trace(f"{source_type} ({'V' if source_type == 'Voltage' else 'A'})",
+                                    output_mode, f"AC I-V Sweep ({output_mode})")
+            yield from self.lockin_points(
+                worker, voltages, lambda v: smu.set_source_value(source_type, v), output_mode)
+
+        return smu, [(self.lockin.inst, apply_lockin), (smu.smu, configure_smu)], sweep
+
+    def ac_iv_2636b(self):
+        self.keithley.set_channel(f"smu{self.channel_select.currentText().lower()}")
+        return self.ac_iv_experiment(self.keithley, {
+            "current_limit": float(self.compliance_input.text()),
+            "nplc": float(self.nplc_input.text())})
+
+    def ac_iv_2450(self):
+        return self.ac_iv_experiment(self.keithley2450, {
+            "current_limit": float(self.k2450_compliance_input.text()),
+            "nplc": float(self.k2450_nplc_input.text())})
+
+    def run_ac_iv(self, ac_iv):
+        """Configure the instruments and run the `ac_iv` sweep once."""
         try:
-            self.configure_lockin()
-            self.configure_keithley_2636b()
-            start = float(self.ac_start_input.text())
-            stop = float(self.ac_stop_input.text())
-            steps = int(self.ac_steps_input.text())
-            source_type = self.ac_source_type.currentText()
-            output_mode = self.lockin_output_mode.currentText()
-
-            voltages = np.linspace(start, stop, steps)
-            x_vals, y1_vals, y2_vals = [], [], []
-
-            for v in voltages:
-                if self.stop_requested:
-                    self.status_label.setText("AC IV sweep stopped.")
-                    return
-                self.keithley2636b.set_source_value(source_type, v)
-                time.sleep(0.3)
-                if output_mode == "X/Y":
-                    x, y = self.lockin.read_xy()
-                    y1_vals.append(x)
-                    y2_vals.append(y)
-                else:
-                    r, theta = self.lockin.read_rtheta()
-                    y1_vals.append(r)
-                    y2_vals.append(theta)
-                x_vals.append(v)
-
-            if output_mode == "X/Y":
-                self.plot_dual_data(
-                    x_vals, y1_vals, y2_vals, "Voltage (V)", "X (V)", "Y (V)", "AC I-V Sweep (X/Y)")
-            else:
-                self.plot_dual_data(
-                    x_vals, y1_vals, y2_vals, "Voltage (V)", "R (V)", "θ (°)", "AC I-V Sweep (R/θ)")
-
-            self.status_label.setText("AC I-V measurement complete.")
+            smu, prepare, sweep = ac_iv()
+
+            def acquire(worker):
+                try:
+                    # both instruments configure at once, each on its own I/O thread
+                    self.io_pool.gather(*((resource.resource_name, fn) for resource, fn in prepare))
+                    yield from sweep(worker)
+                finally:
+                    smu.output_off()
+
+            self.start_experiment(acquire, "AC I-V measurement complete.",
+                                  error_title="AC IV measurement failed",
+                                  stopped_message="AC IV sweep stopped.")
         except Exception as e:
             QMessageBox.critical(
                 self, "Error", f"AC IV measurement failed:\n{e}")
 
+    def run_ac_iv_2636b(self):
+        self.run_ac_iv(self.ac_iv_2636b)
+
     def run_ac_iv_2450(self):
-        try:
-            self.configure_lockin()
-            self.configure_keithley_2450()
-            start = float(self.ac_start_input.text())
-            stop = float(self.ac_stop_input.text())
-            steps = int(self.ac_steps_input.text())
-            source_type = self.ac_source_type.currentText()
-            output_mode = self.lockin_output_mode.currentText()
+        self.run_ac_iv(self.ac_iv_2450)
 
-            voltages = np.linspace(start, stop, steps)
-            x_vals, y1_vals, y2_vals = [], [], []
+    def run_temp_ac_iv(self, ac_iv):
+        """Stabilize at each setpoint of the series, then run the `ac_iv` sweep there.
 
-            for v in voltages:
-                if self.stop_requested:
-                    self.status_label.setText("AC IV sweep stopped.")
-                    return
-                self.keithley2450.set_source_value(source_type, v)
-                time.sleep(0.3)
-                if output_mode == "X/Y":
-                    x, y = self.lockin.read_xy()
-                    y1_vals.append(x)
-                    y2_vals.append(y)
-                else:
-                    r, theta = self.lockin.read_rtheta()
-                    y1_vals.append(r)
-                    y2_vals.append(theta)
-                x_vals.append(v)
-
-            if output_mode == "X/Y":
-                self.plot_dual_data(
-                    x_vals, y1_vals, y2_vals, "Voltage (V)", "X (V)", "Y (V)", "AC I-V Sweep (X/Y)")
-            else:
-                self.plot_dual_data(
-                    x_vals, y1_vals, y2_vals, "Voltage (V)", "R (V)", "θ (°)", "AC I-V Sweep (R/θ)")
+        The lock-in and the SMU are configured once, while the first setpoint
+        is being approached, and the SMU output stays on for the series.
+        """
+        try:
+            setpoints = self.temperature_setpoints()
+            output_channel = int(self.output_channel_select.currentText())
+            input_channel = self.input_channel_select.currentText()
+            stability = self.stability_settings()
+            smu, prepare, sweep = ac_iv()
+
+            def acquire(worker):
+                try:
+                    yield from self.temperature_series(
+                        worker, setpoints, output_channel, input_channel, stability,
+                        lambda setpoint: sweep(worker), prepare)
+                finally:
+                    smu.output_off()
+
+            temperatures = ", ".join(f"{t:g}" for t in setpoints)
+            self.start_experiment(acquire, f"AC I-V completed at {temperatures} °C",
+                                  error_title="Temp Dependent AC I-V Failed",
+                                  stopped_message="AC IV sweep stopped.")
 
-            self.status_label.setText("AC I-V measurement complete.")
         except Exception as e:
             QMessageBox.critical(
-                self, "Error", f"AC IV measurement failed:\n{e}")
+                self, "Error", f"Temp Dependent AC I-V Failed:\n{e}")
 
     def run_temp_ac_iv_2636b(self):
-        try:
-            # Stabilize temperature
-            target_temp = float(self.temp_input.text())
-            output_channel = int(self.output_channel_select.currentText())
-            input_channel = self.input_channel_select.currentText()
+        self.run_temp_ac_iv(self.ac_iv_2636b)
+
+    def run_temp_ac_iv_2450(self):
+        self.run_temp_ac_iv(self.ac_iv_2450)
+
+    def run_temperature_ramp(self):
+        """Sample continuously while the Lake Shore ramps from Set Temperature to Ramp To.
+
+        The controller's own RAMP moves the setpoint at a fixed rate, so
+        nothing stops to stabilize on the way. The Keithley (or the lock-in
+        when no Keithley is selected) is read every sample interval while a
+        TemperatureTrack polls KRDG? alongside it on the I/O pool, and every
+        reading is plotted against the temperature interpolated to the
+        moment it was taken. The run ends once the ramp has finished and the
+        sample is within the stability band of the end temperature.
+        """
+        selected = self.selected_instruments()
+        start_temp = float(self.temp_input.text())
+        stop_temp = float(self.ramp_stop_input.text())
+        rate = float(self.ramp_rate_input.text())
+        interval = float(self.ramp_interval_input.text())
+        output_channel = int(self.output_channel_select.currentText())
+        input_channel = self.input_channel_select.currentText()
+        stability = self.stability_settings()
+        if rate <= 0:
+            raise ValueError("Ramp rate must be positive.")
 
-            self.lakeshore.set_temperature(target_temp, channel=output_channel)
-            if not self.lakeshore.stabilize_temperature(target_temp, channel=input_channel):
-                QMessageBox.warning(
-                    self, "Warning", "Temperature not stabilized.")
-                return
+        if "Keithley" in selected:
+            channel = self.channel_select.currentText().lower()
+            source_type = self.source_select.currentText()
+            measure_type = self.measure_select.currentText()
+            fixed_value = float(self.fixed_source_input.text())
+            nplc = float(self.nplc_input.text())
+            smu = self.keithley
+
+            def start_output():
+                smu.set_channel(f"smu{channel}")
+                smu.configure_smu(source_type=source_type, source_value=fixed_value,
+                                  current_limit=0.1, source_delay=0.1, nplc=nplc)
+                smu.output_on()
+
+            def measure():
+                return (smu.measure(measure_type),)
+
+            stop_output = smu.output_off
+            resource = smu.smu
+            trace = {"x_label": "T (°C)", "y_label": measure_type,
+                     "title": f"Keithley 2636B: {measure_type} vs Temperature"}
+        elif "Keithley2450" in selected:
+            source_type = self.k2450_source_select.currentText()
+            measure_type = self.k2450_measure_select.currentText()
+            fixed_value = float(self.k2450_fixed_input.text())
+            nplc = float(self.k2450_nplc_input.text())
+            smu = self.keithley2450
 
-            # Then perform AC IV
-            self.run_ac_iv_2636b()
+            def start_output():
+                smu.configure_smu(source_type=source_type, source_value=fixed_value,
+                                  current_limit=0.1, nplc=nplc)
+                smu.smu.write("OUTP ON")
 
-            self.status_label.setText(f"AC I-V completed at {target_temp} °C")
+            def measure():
+                return (smu.measure(measure_type),)
 
-        except Exception as e:
-            QMessageBox.critical(
-                self, "Error", f"Temp Dependent AC I-V Failed:\n{e}")
+            def stop_output():
+                smu.smu.write("OUTP OFF")
+
+            resource = smu.smu
+            trace = {"x_label": "T (°C)", "y_label": measure_type,
+                     "title": f"Keithley 2450: {measure_type} vs Temperature"}
+        elif "LockIn" in selected:
+            self.configure_lockin()
+            output_mode = self.lockin_output_mode.currentText()
+            channels = self.LOCKIN_CHANNELS[output_mode]
+
+            def start_output():
+                pass
+
+            def measure():
+                return self.lockin.snap(*channels)
+
+            stop_output = start_output
+            resource = self.lockin.inst
+            trace = self.lockin_trace("T (°C)", output_mode, "Lock-in vs Temperature")
+        else:
+            raise ValueError("Select a Keithley 2636B, 2450 or lock-in to measure during the ramp.")
+        # time of each reading, since the interpolated temperature is the x axis
+        trace["extra_columns"] = {"time": "Time (s)"}
+        trace.update(self.memory_window())
+
+        lakeshore = self.lakeshore.lakeshore.resource_name
+        # generous limit: the ramp itself plus the time allowed to stabilize
+        ramp_limit = abs(stop_temp - start_temp) / rate * 60.0 + stability["timeout"]
+
+        def acquire(worker):
+            # Go straight to the start temperature, then ramp away from it
+            self.lakeshore.set_ramp(rate, channel=output_channel, enabled=False)
+            if not self.stabilize_lakeshore(worker, start_temp, output_channel, input_channel,
+                                            **stability):
+                return
+            start_output()
+            yield trace
+
+            track = TemperatureTrack(
+                lambda: self.io_pool.submit(
+                    lakeshore, self.lakeshore.get_temperature, input_channel).result(),
+                interval=min(interval, 1.0))
+            pending = deque()
+
+            def tagged(final=False):
+                # readings wait here until a temperature poll after them has arrived
+                while pending:
+                    reading = pending[0]
+                    t = (reading.started + reading.finished) / 2
+                    temperature = track.at(t, final=final)
+                    if temperature is None:
+                        return
+                    pending.popleft()
+                    yield (temperature, *reading.value, t - worker.started_at)
+
+            track.start()
+            scheduler = AcquisitionScheduler(interval, stop_check=worker.should_stop)
+            try:
+                self.lakeshore.set_ramp(rate, channel=output_channel)
+                self.lakeshore.set_temperature(stop_temp, channel=output_channel)
+                ramp_started = next_check = time.perf_counter()
+                for tick in scheduler.ticks():
+                    pending.append(self.io_pool.submit(resource.resource_name, measure).result())
+                    yield from tagged()
+                    if track.error is not None:
+                        raise RuntimeError(f"Temperature polling failed: {track.error}")
+
+                    now = time.perf_counter()
+                    if now < next_check:
+                        continue
+                    next_check = now + 1.0
+                    temperature = track.latest()
+                    ramping = self.io_pool.submit(
+                        lakeshore, self.lakeshore.is_ramping, output_channel).result().value
+                    if temperature is not None:
+                        worker.status_changed.emit(
+                            f"Ramping to {stop_temp} °C at {rate:g} K/min: T = {temperature:.3f} °C")
+                        if not ramping and abs(temperature - stop_temp) <= stability["tolerance"]:
+                            break
+                    if now - ramp_started > ramp_limit:
+                        worker.status_changed.emit(f"{stop_temp} °C not reached in time.")
+                        break
+            finally:
+                track.stop()
+                stop_output()
+                self.lakeshore.set_ramp(rate, channel=output_channel, enabled=False)
+            # readings after the last poll get its temperature
+            yield from tagged(final=True)
+            worker.summary = scheduler.summary()
+
+        self.start_experiment(acquire, f"Temperature ramp to {stop_temp} °C complete.",
+                              error_title="Temperature Ramp Failed")
 
     def run_pulse_iv_2636b(self):
         channel = self.channel_select.currentText().lower()
@@ -1272,25 +1794,24 @@ class InstrumentControlGUI(QWidget):
         pulse_width = 0.01  # seconds
         pulse_delay = 0.1   # seconds
 
-        self.keithley.set_channel(f"smu{channel}")
-        x, y = self.keithley.pulse_iv_sweep(
-            source_type=source_type,
-            measure_type=measure_type,
-            start=start,
-            stop=stop,
-            steps=steps,
-            pulse_width=pulse_width,
-            pulse_delay=pulse_delay,
-            compliance=compliance
-        )
+        def acquire(worker):
+            self.keithley.set_channel(f"smu{channel}")
+            x, y = self.keithley.pulse_iv_sweep(
+                source_type=source_type,
+                measure_type=measure_type,
+                start=start,
+                stop=stop,
+                steps=steps,
+                pulse_width=pulse_width,
+                pulse_delay=pulse_delay,
+                compliance=compliance
+            )
+            yield {"x_label": f"{source_type} Pulse", "y_label": measure_type,
+                   "title": "Pulse IV Sweep"}
+            yield from zip(x, y)
 
-        self.plot_data(
-            x, y,
-            x_label=f"{source_type} Pulse",
-            y_label=measure_type,
-            title="Pulse IV Sweep"
-        )
-        self.stream_data = (x, y)
+        self.start_experiment(acquire, "Pulse IV sweep complete.",
+                              error_title="Pulse IV sweep failed")
 
     def run_impedance_vs_time(self):
         try:
@@ -1303,41 +1824,39 @@ class InstrumentControlGUI(QWidget):
             interval = float(self.imp_interval_input.text())  # seconds
 
             steps = int(duration / interval)
-
-            x_vals, z_vals = [], []
-
-            for i in range(steps):
-                if self.stop_requested:
-                    self.status_label.setText("Sweep stopped.")
+            buffered = self.lockin_buffered_checkbox.isChecked()
+            window = self.memory_window()
+
+            def acquire(worker):
+                yield {"x_label": "Time (s)", "y_label": "Impedance (Ohms)",
+                       "title": "Impedance vs Time", **window}
+                if buffered:
+                    for times, ch1, ch2 in self.lockin_buffered_blocks(
+                            worker, interval, output_mode, duration):
+                        i_measured = ch2 if output_mode == "X/Y" else ch1
+                        with np.errstate(divide="ignore"):
+                            impedance = np.where(np.abs(i_measured) < 1e-12, np.inf,
+                                                 source_amplitude / i_measured)
+                        yield list(zip(times, impedance))
                     return
+                scheduler = AcquisitionScheduler(
+                    interval, stop_check=worker.should_stop)
+                for tick in scheduler.ticks(count=steps):
+                    ch1, ch2 = self.lockin.snap(*self.LOCKIN_CHANNELS[output_mode])
+                    # Y = current-like in X/Y mode, R = magnitude in R/θ mode
+                    i_measured = ch2 if output_mode == "X/Y" else ch1
 
-                t = i * interval
-                if output_mode == "X/Y":
-                    _, i_measured = self.lockin.read_xy()  # Y = current-like
-                else:
-                    r, _ = self.lockin.read_rtheta()       # R = magnitude
-                    i_measured = r
+                    # Avoid division by zero
+                    if abs(i_measured) < 1e-12:
+                        impedance = float('inf')
+                    else:
+                        impedance = source_amplitude / i_measured  # Ohm
 
-                # Avoid division by zero
-                if abs(i_measured) < 1e-12:
-                    impedance = float('inf')
-                else:
-                    impedance = source_amplitude / i_measured  # Ohm
+                    yield tick.actual, impedance
+                worker.summary = scheduler.summary()
 
-                x_vals.append(t)
-                z_vals.append(impedance)
-
-                time.sleep(interval)
-
-            self.plot_data(
-                x_vals, z_vals,
-                x_label="Time (s)",
-                y_label="Impedance (Ohms)",
-                title="Impedance vs Time"
-            )
-            self.stream_data = (x_vals, z_vals)
-            self.status_label.setText(
-                "Impedance vs Time measurement complete.")
+            self.start_experiment(acquire, "Impedance vs Time measurement complete.",
+                                  error_title="Impedance vs Time Failed")
 
         except Exception as e:
             QMessageBox.critical(
@@ -1349,60 +1868,50 @@ class InstrumentControlGUI(QWidget):
 
             start_freq = float(self.lockin_freq_start_input.text())
             stop_freq = float(self.lockin_freq_stop_input.text())
-            interval = float(self.lockin_freq_interval_input.text())
-            freqs = np.arange(start_freq, stop_freq + interval, interval)
+            spacing = self.lockin_freq_spacing_select.currentText()
+            points = int(self.lockin_freq_points_input.text())
             output_mode = self.lockin_output_mode.currentText()
+            amplitude = float(self.lockin_amp_input.text())
 
-            x_vals = []
-            y1_vals = []  # R or X
-            y2_vals = []  # θ or Y (optional)
-
-            for freq in freqs:
-                if self.stop_requested:
-                    self.status_label.setText("Sweep stopped.")
+            if spacing == "Linear":
+                interval = float(self.lockin_freq_interval_input.text())
+                freqs = np.arange(start_freq, stop_freq + interval, interval)
+            elif spacing == "Log":
+                freqs = np.logspace(np.log10(start_freq), np.log10(stop_freq), points)
+            else:
+                max_points = int(self.lockin_freq_max_points_input.text())
+                threshold = float(self.lockin_refine_threshold_input.text()) / 100
+
+            def set_frequency(f):
+                self.lockin.set_reference(f, amplitude)
+
+            def acquire(worker):
+                trace = self.lockin_trace("Frequency (Hz)", output_mode,
+                                          f"Lock-in Frequency Sweep ({output_mode})")
+                if spacing != "Linear":
+                    trace["log_x"] = True
+                if spacing != "Adaptive":
+                    yield trace
+                    yield from self.lockin_points(worker, freqs, set_frequency, output_mode)
                     return
 
-                self.lockin.set_reference(
-                    freq, float(self.lockin_amp_input.text()))
-                time.sleep(0.3)  # allow settling
-
-                if output_mode == "X/Y":
-                    x, y = self.lockin.read_xy()
-                    y1_vals.append(x)
-                    y2_vals.append(y)
-                else:  # R/θ
-                    r, theta = self.lockin.read_rtheta()
-                    y1_vals.append(r)
-                    y2_vals.append(theta)
-
-                x_vals.append(freq)
-
-            # Plotting based on mode
-            if output_mode == "X/Y":
-                self.plot_dual_data(
-                    x_vals, y1_vals, y2_vals,
-                    x_label="Frequency (Hz)",
-                    y1_label="X (V)",
-                    y2_label="Y (V)",
-                    title="Lock-in Frequency Sweep (X/Y)"
-                )
-            else:  # R/θ
-                self.plot_dual_data(
-                    x_vals, y1_vals, y2_vals,
-                    x_label="Frequency (Hz)",
-                    y1_label="R (V)",
-                    y2_label="θ (deg)",
-                    title="Lock-in Frequency Sweep (R/θ)"
-                )
-
-            self.status_label.setText("Lock-in frequency sweep complete.")
-            self.stream_data = (x_vals, y1_vals)
+                # refinement points arrive out of order, so plot them sorted by frequency
+                trace["sort_x"] = True
+                yield trace
+                yield from self.adaptive_points(
+                    worker,
+                    lambda batch: self.lockin_points(worker, batch, set_frequency, output_mode),
+                    start_freq, stop_freq, points, max_points, threshold, log=True, channels=2)
+
+            self.start_experiment(acquire, "Lock-in frequency sweep complete.",
+                                  error_title="Frequency sweep failed")
 
         except Exception as e:
             QMessageBox.critical(
                 self, "Error", f"Frequency sweep failed:\n{e}")
 
     def plot_dual_data(self, x, y1, y2, x_label, y1_label, y2_label, title):
+        self.init_plot()
         self.figure.clear()
         ax1 = self.figure.add_subplot(111)
         ax2 = ax1.twinx()
@@ -1424,471 +1933,155 @@ class InstrumentControlGUI(QWidget):
             harmonics = list(range(1, max_harmonic + 1))
 
             output_mode = self.lockin_output_mode.currentText()
-
-            x_vals, y_vals = [], []
-
-            for n in harmonics:
-                if self.stop_requested:
-                    self.status_label.setText("Sweep stopped.")
-                    return
-
-                freq = base_freq * n
-                self.lockin.set_reference(
-                    freq, float(self.lockin_amp_input.text()))
-                time.sleep(0.3)
-                if output_mode == "X/Y":
-                    _, y = self.lockin.read_xy()
-                else:
-                    r, _ = self.lockin.read_rtheta()
-                    y = r
-                x_vals.append(n)
-                y_vals.append(y)
-
-            self.plot_data(
-                x_vals, y_vals,
-                x_label="Harmonic Number",
-                y_label=f"Lock-in {output_mode.split('/')[1]}",
-                title="Harmonic Detection"
-            )
-            self.stream_data = (x_vals, y_vals)
-            self.status_label.setText("Harmonic detection complete.")
+            amplitude = float(self.lockin_amp_input.text())
+
+            def acquire(worker):
+                yield {"x_label": "Harmonic Number",
+                       "y_label": f"Lock-in {output_mode.split('/')[1]}",
+                       "title": "Harmonic Detection", **self.lockin_range_column()}
+                for n, ch1, ch2, *sensitivity in self.lockin_points(
+                        worker, harmonics,
+                        lambda n: self.lockin.set_reference(base_freq * n, amplitude),
+                        output_mode):
+                    yield (n, ch2 if output_mode == "X/Y" else ch1, *sensitivity)
+
+            self.start_experiment(acquire, "Harmonic detection complete.",
+                                  error_title="Harmonic detection failed")
         except Exception as e:
             QMessageBox.critical(
                 self, "Error", f"Harmonic detection failed:\n{e}")
 
-    # def update_lockin_inputs_visibility(self):
-    #     experiment = self.experiment_select.currentText()
-
-    #     is_freq = experiment == "Frequency Sweep"
-    #     is_harmonic = experiment == "Harmonic Detection"
-
-    #     self.lockin_freq_start_input.setVisible(is_freq)
-    #     self.lockin_freq_stop_input.setVisible(is_freq)
-    #     self.lockin_freq_steps_input.setVisible(is_freq)
-
-    #     self.lockin_harmonics_input.setVisible(is_harmonic)
-    # def update_lockin_inputs_visibility(self):
-    #     is_freq = self.experiment_select.currentText() == "Frequency Sweep"
-
-    #     self.freq_start_layout.setEnabled(is_freq)
-    #     self.freq_stop_layout.setEnabled(is_freq)
-    #     #self.freq_steps_layout.setEnabled(is_freq)
-    #     self.freq_interval_layout.setEnabled(is_freq)
     def update_lockin_inputs_visibility(self):
-        experiment = self.experiment_select.currentText()
+        experiment = find_experiment(self.experiment_select.currentText())
 
-        is_freq = experiment == "Frequency Sweep"
-        is_ac_iv = "AC I-V Measurement" in experiment
-        is_impedance = "Impedance vs Time" in experiment
+        is_freq = experiment is not None and experiment.name == "Frequency Sweep"
 
         # Frequency Sweep Inputs
         self.freq_start_layout.setEnabled(is_freq)
         self.freq_stop_layout.setEnabled(is_freq)
         self.freq_interval_layout.setEnabled(is_freq)
 
-        # AC I-V Inputs (Show/Hide container)
-        if hasattr(self, 'ac_iv_inputs_widget'):
-            self.ac_iv_inputs_widget.setVisible(is_ac_iv)
-
-        # Impedance Inputs (Show/Hide container)
-        if hasattr(self, 'impedance_inputs_widget'):
-            self.impedance_inputs_widget.setVisible(is_impedance)
-
-
-# Replace existing time logging method logic with this fixed version:
-    # def start_time_logging(self):
-    #     selected = [name for name, cb in self.instrument_checkboxes.items() if cb.isChecked()]
-    #     self.stream_data = ([], [])  # Reset
-
-    #     try:
-    #         # Parse timing inputs
-    #         interval_ms = float(self.interval_input.text())
-    #         total_time_ms = float(self.total_time_input.text())
-    #         interval_sec = interval_ms / 1000.0
-    #         total_time_sec = total_time_ms / 1000.0
-
-    #         x_vals, y_vals = [], []
-    #         start_time = time.time()
-    #         next_time = start_time
-
-    #         # Determine which Keithley to use
-    #         if "Keithley" in selected:
-    #             channel = self.channel_select.currentText().lower()
-    #             self.keithley.set_channel(f"smu{channel}")
-    #             source_type = self.source_select.currentText()
-    #             measure_type = self.measure_select.currentText()
-    #             fixed_value = float(self.fixed_source_input.text())
-
-    #             self.keithley.configure_smu(source_type=source_type, source_value=fixed_value, current_limit=0.1)
-    #             self.keithley.output_on()
-
-    #             while True:
-    #                 now = time.time()
-    #                 if now - start_time >= total_time_sec:
-    #                     break
-
-    #                 if now >= next_time:
-    #                     elapsed_ms = (now - start_time) * 1000
-    #                     value = self.keithley.measure(measure_type)
-    #                     x_vals.append(round(elapsed_ms, 1))
-    #                     y_vals.append(value)
-    #                     next_time += interval_sec
-
-    #                 time.sleep(0.001)
-
-    #             self.keithley.output_off()
-    #             title = "Keithley 2636B Time Logging"
-
-    #         elif "Keithley2450" in selected:
-    #             source_type = self.k2450_source_select.currentText()
-    #             measure_type = self.k2450_measure_select.currentText()
-    #             fixed_value = float(self.k2450_start_input.text())
-
-    #             self.keithley2450.configure_smu(source_type=source_type, source_value=fixed_value, current_limit=0.1)
-    #             self.keithley2450.smu.write("OUTP ON")
-
-    #             while True:
-    #                 now = time.time()
-    #                 if now - start_time >= total_time_sec:
-    #                     break
-
-    #                 if now >= next_time:
-    #                     elapsed_ms = (now - start_time) * 1000
-    #                     value = self.keithley2450.measure(measure_type)
-    #                     x_vals.append(round(elapsed_ms, 1))
-    #                     y_vals.append(value)
-    #                     next_time += interval_sec
-
-    #                 time.sleep(0.001)
-
-    #             self.keithley2450.smu.write("OUTP OFF")
-    #             title = "Keithley 2450 Time Logging"
-
-    #         # Plot and store results
-    #         self.plot_data(
-    #             x_vals, y_vals,
-    #             x_label="Time (ms)",
-    #             y_label=measure_type,
-    #             title=title
-    #         )
-    #         self.status_label.setText(f"{title} complete.")
-    #         self.stream_data = (x_vals, y_vals)
-
-    #     except Exception as e:
-    #         QMessageBox.critical(self, "Error", f"Time Logging Failed:\n{e}")
-
-    def start_time_logging(self):
-        selected = [name for name,
-                    cb in self.instrument_checkboxes.items() if cb.isChecked()]
-        self.stream_data = ([], [])  # Reset
+        # Input groups (AC I-V, impedance, ...) of the selected experiment only
+        panels = experiment.panels if experiment is not None else ()
+        for panel in PANELS:
+            getattr(self, panel).setVisible(panel in panels)
 
-        try:
-            # # Parse total time input only (no interval now)
-            # total_time_ms = float(self.total_time_input.text())
-            # total_time_sec = total_time_ms / 1000.0
+    def start_time_logging(self, smus=KEITHLEYS):
+        selected = [name for name in self.selected_instruments() if name in smus]
 
-            # x_vals, y_vals = [], []
-            # start_time = time.time()
+        try:
             interval_ms = float(self.interval_input.text())
             total_time_ms = float(self.total_time_input.text())
             interval_sec = interval_ms / 1000.0
-            total_time_sec = total_time_ms / 1000.0
 
             num_points = int(total_time_ms // interval_ms)
-            x_vals, y_vals = [], []
+            window = self.memory_window()
 
-            start_time = time.time()
             if "Keithley" in selected:
                 channel = self.channel_select.currentText().lower()
-                self.keithley.set_channel(f"smu{channel}")
                 source_type = self.source_select.currentText()
                 measure_type = self.measure_select.currentText()
                 fixed_value = float(self.fixed_source_input.text())
                 nplc = float(self.nplc_input.text())
+                title = "Keithley 2636B Timed Logging"
 
-                self.keithley.configure_smu(
-                    source_type=source_type, source_value=fixed_value, current_limit=0.1, source_delay=0.1, nplc=nplc)
-                self.keithley.output_on()
-
-                # while True:
-                #     now = time.time()
-                #     if now - start_time >= total_time_sec:
-                #         break
-
-                #     elapsed_ms = (now - start_time) * 1000
-                #     value = self.keithley.measure(measure_type)
-                #     x_vals.append(round(elapsed_ms, 1))
-                #     y_vals.append(value)
-
-                #     # Optional: prevent CPU overuse
-                #     time.sleep(0.001)
-
-                # self.keithley.output_off()
-                # title = "Keithley 2636B Time Logging"
-                for i in range(num_points):
-                    if self.stop_requested:
-                        self.status_label.setText("Sweep stopped.")
-                        return
-
-                    scheduled_time = start_time + i * interval_sec
-                    while time.time() < scheduled_time:
-                        time.sleep(0.0005)
-
-                    value = self.keithley.measure(measure_type)
-                    x_vals.append(round(i * interval_ms, 1))
-                    y_vals.append(value)
+                def start_output():
+                    self.keithley.set_channel(f"smu{channel}")
+                    self.keithley.configure_smu(
+                        source_type=source_type, source_value=fixed_value, current_limit=0.1, source_delay=0.1, nplc=nplc)
+                    self.keithley.output_on()
 
-                self.keithley.output_off()
-                title = "Keithley 2636B Timed Logging"
+                measure = self.keithley.measure
+                stop_output = self.keithley.output_off
             elif "Keithley2450" in selected:
                 source_type = self.k2450_source_select.currentText()
                 measure_type = self.k2450_measure_select.currentText()
-                # fixed_value = float(self.k2450_start_input.text())
                 # ✅ Correct: uses fixed source
                 fixed_value = float(self.k2450_fixed_input.text())
                 nplc = float(self.k2450_nplc_input.text())
-                self.keithley2450.configure_smu(
-                    source_type=source_type, source_value=fixed_value, current_limit=0.1, nplc=nplc)
-                self.keithley2450.smu.write("OUTP ON")
-
-                # while True:
-                #     now = time.time()
-                #     if now - start_time >= total_time_sec:
-                #         break
-
-                #     elapsed_ms = (now - start_time) * 1000
-                #     value = self.keithley2450.measure(measure_type)
-                #     x_vals.append(round(elapsed_ms, 1))
-                #     y_vals.append(value)
-
-                #     time.sleep(0.001)
-
-                # self.keithley2450.smu.write("OUTP OFF")
-                # title = "Keithley 2450 Time Logging"
-                for i in range(num_points):
-                    if self.stop_requested:
-                        self.status_label.setText("Sweep stopped.")
-                        return
-
-                    scheduled_time = start_time + i * interval_sec
-                    while time.time() < scheduled_time:
-                        time.sleep(0.0005)
-
-                    value = self.keithley2450.measure(measure_type)
-                    x_vals.append(round(i * interval_ms, 1))
-                    y_vals.append(value)
-
-                self.keithley2450.smu.write("OUTP OFF")
                 title = "Keithley 2450 Timed Logging"
-            # Plot and store results
-            self.plot_data(
-                x_vals, y_vals,
-                x_label="Time (ms)",
-                y_label=measure_type,
-                title=title
-            )
-            self.status_label.setText(f"{title} complete.")
-            self.stream_data = (x_vals, y_vals)
+
+                def start_output():
+                    self.keithley2450.configure_smu(
+                        source_type=source_type, source_value=fixed_value, current_limit=0.1, nplc=nplc)
+                    self.keithley2450.smu.write("OUTP ON")
+
+                measure = self.keithley2450.measure
+
+                def stop_output():
+                    self.keithley2450.smu.write("OUTP OFF")
+
+                if self.k2450_buffered_checkbox.isChecked():
+                    binary = self.k2450_binary_checkbox.isChecked()
+                    # SimpleLoop's delay comes on top of the NPLC integration time
+                    delay = max(interval_sec - nplc / self.keithley2450.line_frequency, 0.0)
+
+                    def acquire(worker):
+                        start_output()
+                        yield {"x_label": "Time (ms)", "y_label": measure_type, "title": title, **window}
+                        blocks = self.keithley2450.buffered_time_log(
+                            measure_type, count=num_points, delay=delay, binary=binary)
+                        try:
+                            for times, values in blocks:
+                                yield list(zip(times * 1000.0, values))
+                                if worker.should_stop():
+                                    return
+                        finally:
+                            blocks.close()
+                            stop_output()
+
+                    self.start_experiment(acquire, f"{title} complete.",
+                                          error_title="Time Logging Failed")
+                    return
+            else:
+                raise ValueError("Select a Keithley 2636B or 2450 for time logging.")
+
+            def acquire(worker):
+                start_output()
+                yield {"x_label": "Time (ms)", "y_label": measure_type, "title": title, **window}
+                try:
+                    scheduler = AcquisitionScheduler(
+                        interval_sec, stop_check=worker.should_stop)
+                    for tick in scheduler.ticks(count=num_points):
+                        value = measure(measure_type)
+                        # actual measurement time, not the scheduled slot
+                        yield round(tick.actual * 1000, 3), value
+                    worker.summary = scheduler.summary()
+                finally:
+                    stop_output()
+
+            self.start_experiment(acquire, f"{title} complete.",
+                                  error_title="Time Logging Failed")
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Time Logging Failed:\n{e}")
-    # def start_time_logging(self):
-    #     selected = [name for name, cb in self.instrument_checkboxes.items() if cb.isChecked()]
-    #     self.stream_data = ([], [])
-
-    #     try:
-    #         interval_ms = float(self.interval_input.text())
-    #         total_time_ms = float(self.total_time_input.text())
-    #         interval_sec = interval_ms / 1000.0
-    #         total_time_sec = total_time_ms / 1000.0
-
-    #         x_vals, y_vals = [], []
-    #         start_time = time.time()
-    #         next_time = start_time
-
-    #         if "Keithley" in selected:
-    #             channel = self.channel_select.currentText().lower()
-    #             self.keithley.set_channel(f"smu{channel}")
-    #             source_type = self.source_select.currentText()
-    #             measure_type = self.measure_select.currentText()
-    #             fixed_value = float(self.fixed_source_input.text())
-
-    #             self.keithley.configure_smu(source_type=source_type, source_value=fixed_value, current_limit=0.1)
-    #             self.keithley.output_on()
-
-    #             while True:
-    #                 now = time.time()
-    #                 elapsed = now - start_time
-    #                 if elapsed >= total_time_sec:
-    #                     break
-
-    #                 if now >= next_time:
-    #                     value = self.keithley.measure(measure_type)
-    #                     elapsed_ms = round((now - start_time) * 1000, 1)
-    #                     x_vals.append(elapsed_ms)
-    #                     y_vals.append(value)
-    #                     next_time += interval_sec
-
-    #                 time.sleep(0.0005)
-
-    #             self.keithley.output_off()
-    #             title = "Keithley 2636B Logging"
-
-    #         elif "Keithley2450" in selected:
-    #             source_type = self.k2450_source_select.currentText()
-    #             measure_type = self.k2450_measure_select.currentText()
-    #             fixed_value = float(self.k2450_start_input.text())
-
-    #             self.keithley2450.configure_smu(source_type=source_type, source_value=fixed_value, current_limit=0.1)
-    #             self.keithley2450.smu.write("OUTP ON")
-
-    #             while True:
-    #                 now = time.time()
-    #                 elapsed = now - start_time
-    #                 if elapsed >= total_time_sec:
-    #                     break
-
-    #                 if now >= next_time:
-    #                     value = self.keithley2450.measure(measure_type)
-    #                     elapsed_ms = round((now - start_time) * 1000, 1)
-    #                     x_vals.append(elapsed_ms)
-    #                     y_vals.append(value)
-    #                     next_time += interval_sec
-
-    #                 time.sleep(0.0005)
-
-    #             self.keithley2450.smu.write("OUTP OFF")
-    #             title = "Keithley 2450 Logging"
-
-    #         # Plot and store results
-    #         self.plot_data(
-    #             x_vals, y_vals,
-    #             x_label="Time (ms)",
-    #             y_label=measure_type,
-    #             title=title
-    #         )
-    #         self.status_label.setText(f"{title} complete.")
-    #         self.stream_data = (x_vals, y_vals)
-
-    #     except Exception as e:
-    #         QMessageBox.critical(self, "Error", f"Time Logging Failed:\n{e}")
-    # def start_time_logging(self):
-    #     selected = [name for name, cb in self.instrument_checkboxes.items() if cb.isChecked()]
-    #     self.stream_data = ([], [])
-
-    #     try:
-    #         interval_ms = float(self.interval_input.text())
-    #         total_time_ms = float(self.total_time_input.text())
-    #         interval_sec = interval_ms / 1000.0
-    #         total_time_sec = total_time_ms / 1000.0
-
-    #         x_vals, y_vals = [], []
-    #         start_time = time.time()
-    #         next_time = start_time
-
-    #         if "Keithley" in selected:
-    #             channel = self.channel_select.currentText().lower()
-    #             self.keithley.set_channel(f"smu{channel}")
-    #             source_type = self.source_select.currentText()
-    #             measure_type = self.measure_select.currentText()
-    #             fixed_value = float(self.fixed_source_input.text())
-
-    #             self.keithley.configure_smu(source_type=source_type, source_value=fixed_value, current_limit=0.1)
-    #             self.keithley.output_on()
-
-    #             while True:
-    #                 now = time.time()
-    #                 elapsed = now - start_time
-    #                 if elapsed >= total_time_sec:
-    #                     break
-
-    #                 if now >= next_time:
-    #                     value = self.keithley.measure(measure_type)
-    #                     elapsed_ms = round((now - start_time) * 1000, 1)
-    #                     x_vals.append(elapsed_ms)
-    #                     y_vals.append(value)
-    #                     next_time += interval_sec
-
-    #                 time.sleep(0.0005)
-
-    #             self.keithley.output_off()
-    #             title = "Keithley 2636B Logging"
-
-    #         elif "Keithley2450" in selected:
-    #             source_type = self.k2450_source_select.currentText()
-    #             measure_type = self.k2450_measure_select.currentText()
-    #             fixed_value = float(self.k2450_start_input.text())
-
-    #             self.keithley2450.configure_smu(source_type=source_type, source_value=fixed_value, current_limit=0.1)
-    #             self.keithley2450.smu.write("OUTP ON")
-
-    #             while True:
-    #                 now = time.time()
-    #                 elapsed = now - start_time
-    #                 if elapsed >= total_time_sec:
-    #                     break
-
-    #                 if now >= next_time:
-    #                     value = self.keithley2450.measure(measure_type)
-    #                     elapsed_ms = round((now - start_time) * 1000, 1)
-    #                     x_vals.append(elapsed_ms)
-    #                     y_vals.append(value)
-    #                     next_time += interval_sec
-
-    #                 time.sleep(0.0005)
-
-    #             self.keithley2450.smu.write("OUTP OFF")
-    #             title = "Keithley 2450 Logging"
-
-    #         # Plot and store results
-    #         self.plot_data(
-    #             x_vals, y_vals,
-    #             x_label="Time (ms)",
-    #             y_label=measure_type,
-    #             title=title
-    #         )
-    #         self.status_label.setText(f"{title} complete.")
-    #         self.stream_data = (x_vals, y_vals)
-
-    #     except Exception as e:
-    #         QMessageBox.critical(self, "Error", f"Time Logging Failed:\n{e}")
-    def update_temperature_display(self):
-        try:
-            if self.use_temp_checkbox.isChecked():
-                input_channel = self.input_channel_select.currentText()
-                current_temp = self.lakeshore.get_temperature(
-                    channel=input_channel)
-                self.live_temp_label.setText(
-                    f"Current Temperature: {current_temp:.2f} °C")
-            else:
-                self.live_temp_label.setText("Temperature Control Disabled")
-        except Exception:
-            self.live_temp_label.setText("Current Temperature: -- °C")
 
-    def update_temperature_display(self):
-        try:
-            if hasattr(self, "use_temp_checkbox") and self.use_temp_checkbox.isChecked():
-                input_channel = self.input_channel_select.currentText()
-                current_temp = self.lakeshore.get_temperature(
-                    channel=input_channel)
-                self.live_temp_label.setText(
-                    f"Current Temperature: {current_temp:.2f} °C")
-            elif self.lakeshore325_controls.isVisible():
-                input_channel = int(
-                    self.l325_input_channel_select.currentText())
-                current_temp = self.lakeshore325.get_temperature(
-                    input_channel=input_channel)
-                self.l325_live_temp_label.setText(
-                    f"Current Temperature: {current_temp:.2f} °C")
-            else:
-                self.live_temp_label.setText("Temperature Control Disabled")
-                self.l325_live_temp_label.setText(
-                    "Temperature Control Disabled")
-        except Exception:
-            self.live_temp_label.setText("Current Temperature: -- °C")
-            self.l325_live_temp_label.setText("Current Temperature: -- °C")
+    def watch_lakeshore(self):
+        """Monitor the Lake Shore 335 on the selected sensor channel, once connected."""
+        if self.lakeshore.lakeshore is not None:
+            self.temperature_monitor.watch(
+                "LakeShore", self.lakeshore.address, self.lakeshore.get_temperature,
+                self.input_channel_select.currentText())
+
+    def watch_lakeshore325(self):
+        """Monitor the Lake Shore 325 on the selected input channel, once connected."""
+        if self.lakeshore325.instrument is not None:
+            self.temperature_monitor.watch(
+                "LakeShore325", self.lakeshore325.address, self.lakeshore325.get_temperature,
+                int(self.l325_input_channel_select.currentText()))
+
+    def on_temperature_reading(self, name, value, timestamp):
+        label = self.live_temp_label if name == "LakeShore" else self.l325_live_temp_label
+        label.setText(f"Current Temperature: {value:.2f} °C")
+
+    def on_temperature_failed(self, name, message):
+        label = self.live_temp_label if name == "LakeShore" else self.l325_live_temp_label
+        label.setText("Current Temperature: -- °C")
 
     def plot_data(self, x_data, y_data, x_label="X", y_label="Y", title="Measurement Plot"):
+        import mplcursors
+
+        self.init_plot()
         self.figure.clear()
         self.ax = self.figure.add_subplot(111)
         line, = self.ax.plot(x_data, y_data, 'b-')
@@ -1915,73 +2108,31 @@ class InstrumentControlGUI(QWidget):
             duration = float(self.lockin_duration_input.text())
             interval = float(self.lockin_interval_input.text())
             output_mode = self.lockin_output_mode.currentText()
-
-            timestamps = []
-            y1_vals, y2_vals = [], []
-            start_time = time.time()
-
-            while time.time() - start_time < duration:
-                if self.stop_requested:
-                    self.status_label.setText("AC signal measurement stopped.")
+            buffered = self.lockin_buffered_checkbox.isChecked()
+            window = self.memory_window()
+
+            def acquire(worker):
+                yield {**self.lockin_trace("Time (s)", output_mode,
+                                           f"Lock-in AC Signal ({output_mode})"), **window}
+                if buffered:
+                    for times, ch1, ch2 in self.lockin_buffered_blocks(
+                            worker, interval, output_mode, duration):
+                        yield list(zip(times, ch1, ch2))
                     return
-                t = time.time() - start_time
-                if output_mode == "X/Y":
-                    x, y = self.lockin.read_xy()
-                    y1_vals.append(x)
-                    y2_vals.append(y)
-                else:
-                    r, theta = self.lockin.read_rtheta()
-                    y1_vals.append(r)
-                    y2_vals.append(theta)
-                timestamps.append(t)
-                time.sleep(interval)
-
-            if output_mode == "X/Y":
-                self.plot_dual_data(timestamps, y1_vals, y2_vals, "Time (s)",
-                                    "X (V)", "Y (V)", "Lock-in AC Signal (X/Y)")
-            else:
-                self.plot_dual_data(timestamps, y1_vals, y2_vals, "Time (s)",
-                                    "R (V)", "θ (°)", "Lock-in AC Signal (R/θ)")
-
-            self.status_label.setText("AC signal measurement complete.")
+                scheduler = AcquisitionScheduler(
+                    interval, stop_check=worker.should_stop)
+                for tick in scheduler.ticks(duration=duration):
+                    ch1, ch2 = self.lockin.snap(*self.LOCKIN_CHANNELS[output_mode])
+                    yield tick.actual, ch1, ch2
+                worker.summary = scheduler.summary()
+
+            self.start_experiment(acquire, "AC signal measurement complete.",
+                                  error_title="AC signal measurement failed",
+                                  stopped_message="AC signal measurement stopped.")
         except Exception as e:
             QMessageBox.critical(
                 self, "Error", f"AC signal measurement failed:\n{e}")
 
-    def run_lockin_harmonic_detection(self):
-        try:
-            self.configure_lockin()
-            base_freq = float(self.lockin_freq_input.text())
-            harmonics = [1, 2, 3, 4, 5]  # 1st to 5th harmonic
-            output_mode = self.lockin_output_mode.currentText()
-
-            x_vals, y_vals = [], []
-
-            for n in harmonics:
-                freq = base_freq * n
-                self.lockin.set_reference(
-                    freq, float(self.lockin_amp_input.text()))
-                time.sleep(0.3)
-                if output_mode == "X/Y":
-                    _, y = self.lockin.read_xy()
-                else:
-                    r, _ = self.lockin.read_rtheta()
-                    y = r
-                x_vals.append(n)
-                y_vals.append(y)
-
-            self.plot_data(
-                x_vals, y_vals,
-                x_label="Harmonic Number",
-                y_label=f"Lock-in {output_mode.split('/')[1]}",
-                title="Harmonic Detection"
-            )
-            self.stream_data = (x_vals, y_vals)
-            self.status_label.setText("Harmonic detection complete.")
-        except Exception as e:
-            QMessageBox.critical(
-                self, "Error", f"Harmonic detection failed:\n{e}")
-
     def get_unit_scale(self):
         unit = self.y_unit_select.currentText()
         scale_dict = {
@@ -1993,7 +2144,23 @@ class InstrumentControlGUI(QWidget):
         }
         return scale_dict.get(unit, 1), f"Current ({unit})"
 
+    def init_plot(self):
+        """Create the matplotlib figure, canvas and live plot if not done yet."""
+        if self.figure is not None:
+            return
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+        from matplotlib.figure import Figure
+
+        self.figure = Figure()
+        self.canvas = FigureCanvas(self.figure)
+        self.ax = self.figure.add_subplot(111)
+        self.ax.grid(True)
+        self.canvas.draw()
+        self.plot_area.layout().addWidget(self.canvas)
+        self.live_plot = LivePlot(self.figure, self.canvas)
+
     def clear_plot(self):
+        self.init_plot()
         self.figure.clear()
         self.ax = self.figure.add_subplot(111)
         self.ax.grid(True)
@@ -2005,10 +2172,22 @@ class InstrumentControlGUI(QWidget):
             self, "Save Plot", "", "PNG Files (*.png);;All Files (*)", options=options
         )
         if file_name:
+            self.init_plot()
             self.figure.savefig(file_name)
             QMessageBox.information(
                 self, "Saved", f"Plot saved to:\n{file_name}")
 
+    def dropped_points_note(self):
+        """Warning for saves of a run whose in-memory buffers dropped their oldest points."""
+        kept = sum(len(buffer) for buffer in self.run_buffers.values())
+        total = sum(buffer.total_written for buffer in self.run_buffers.values())
+        if kept == total:
+            return ""
+        note = f"\n\nOnly the last {kept} of {total} points were kept in memory"
+        if self.run_recorder is not None:
+            note += f"; the full run is in {self.run_recorder.path}"
+        return note + "."
+
     def save_csv(self):
         options = QFileDialog.Options()
         file_name, _ = QFileDialog.getSaveFileName(
@@ -2016,26 +2195,61 @@ class InstrumentControlGUI(QWidget):
         )
         if file_name:
             try:
+                if self.data_buffer is None:
+                    raise ValueError("No data acquired yet.")
                 with open(file_name, 'w') as f:
-                    f.write("X,Y\n")
-                    for x, y in zip(self.stream_data[0], self.stream_data[1]):
-                        f.write(f"{x},{y}\n")
+                    for title, buffer in self.run_buffers.items():
+                        if len(self.run_buffers) > 1:
+                            f.write(f"# {title}\n")
+                        f.write("X,Y\n")
+                        for x, y in zip(buffer.column("x"), buffer.column("y1")):
+                            f.write(f"{x},{y}\n")
                 QMessageBox.information(
-                    self, "Saved", f"Data saved to:\n{file_name}")
+                    self, "Saved", f"Data saved to:\n{file_name}{self.dropped_points_note()}")
             except Exception as e:
                 QMessageBox.critical(
                     self, "Error", f"Failed to save CSV:\n{e}")
 
+    def save_binary(self):
+        options = QFileDialog.Options()
+        file_name, _ = QFileDialog.getSaveFileName(
+            self, "Save Data", "", "HDF5 Files (*.h5);;NumPy Archives (*.npz);;All Files (*)", options=options
+        )
+        if file_name:
+            try:
+                if self.data_buffer is None:
+                    raise ValueError("No data acquired yet.")
+                save_data(file_name,
+                          [(self.run_traces[title], buffer)
+                           for title, buffer in self.run_buffers.items()],
+                          self.run_metadata)
+                QMessageBox.information(
+                    self, "Saved", f"Data saved to:\n{file_name}{self.dropped_points_note()}")
+            except Exception as e:
+                QMessageBox.critical(
+                    self, "Error", f"Failed to save data:\n{e}")
+
     def closeEvent(self, event):
+        if self.worker is not None and self.worker.isRunning():
+            self.worker.stop()
+            self.worker.wait()
         self.keithley.disconnect()
         self.lakeshore.disconnect()
         self.keithley2450.disconnect()
+        self.temperature_monitor.stop()
+        self.io_pool.close()
+        self.rm.close()
         event.accept()
 
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    gui = InstrumentControlGUI()
+    # --simulate runs against simulated instruments instead of VISA hardware
+    rm = None
+    if "--simulate" in sys.argv:
+        from simulated_instruments import SimulatedResourceManager
+        rm = SimulatedResourceManager()
+    gui = InstrumentControlGUI(rm=rm)
     gui.resize(1000, 700)
     gui.show()
     sys.exit(app.exec_())
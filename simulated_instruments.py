@@ -0,0 +1,718 @@
+import cmath
+import math
+import random
+import re
+import struct
+import threading
+import time
+from collections import deque
+
+from pyvisa import constants
+from pyvisa.errors import VisaIOError
+
+
+SIM_ADDRESSES = {
+    "Keithley2636B": "USB0::0x05E6::0x2636::4481069::0::INSTR",
+    "Keithley2450": "USB0::0x05E6::0x2450::04411193::0::INSTR",
+    "SR830": "GPIB0::8::INSTR",
+    "LakeShore335": "GPIB0::12::INSTR",
+    "LakeShore325": "GPIB0::13::INSTR",
+}
+
+
+def dut_current(voltage, limit):
+    """Test device: 10 kOhm in parallel with a silicon-like diode, clipped at compliance."""
+    current = voltage / 10e3 + 1e-12 * (math.exp(min(voltage, 2.0) / 0.05) - 1)
+    return max(-limit, min(limit, current))
+
+
+class SimulatedInstrument:
+    """In-process stand-in for a pyvisa message-based resource.
+
+    Subclasses implement handle(command) for their SCPI/TSP command set and
+    queue replies with reply(). Every write and read costs latency / 2 to
+    mimic the bus round-trip; `noise` is the relative Gaussian noise added
+    to readings.
+    """
+
+    idn = "SIMULATED,INSTRUMENT,0,1.0"
+
+    def __init__(self, resource_name, latency=0.002, noise=1e-3, seed=None):
+        self.resource_name = resource_name
+        self.latency = latency
+        self.noise = noise
+        self.timeout = 5000
+        self.write_termination = "\n"
+        self.read_termination = "\n"
+        self._output = deque()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    # --- pyvisa resource API -------------------------------------------
+    def write(self, command):
+        time.sleep(self.latency / 2)
+        with self._lock:
+            self.handle(command.strip())
+
+    def read(self):
+        time.sleep(self.latency / 2)
+        with self._lock:
+            if not self._output:
+                raise VisaIOError(constants.VI_ERROR_TMO)
+            item = self._output.popleft()
+        if isinstance(item, bytes):
+            return item.decode("latin-1")
+        return item + "\n"
+
+    def query(self, command):
+        self.write(command)
+        return self.read()
+
+    def read_raw(self):
+        time.sleep(self.latency / 2)
+        with self._lock:
+            if not self._output:
+                raise VisaIOError(constants.VI_ERROR_TMO)
+            item = self._output.popleft()
+        return item if isinstance(item, bytes) else (item + "\n").encode()
+
+    def query_binary_values(self, command, datatype="f", is_big_endian=False, container=list,
+                            header_fmt="ieee", expect_termination=True, data_points=None):
+        self.write(command)
+        raw = self.read_raw()
+        if header_fmt == "empty":
+            payload = raw
+        else:
+            # IEEE 488.2 definite-length block: #<n><length><payload>
+            digits = int(raw[1:2])
+            length = int(raw[2:2 + digits])
+            payload = raw[2 + digits:2 + digits + length]
+        size = struct.calcsize(datatype)
+        order = ">" if is_big_endian else "<"
+        values = struct.unpack(f"{order}{len(payload) // size}{datatype}", payload)
+        return container(values)
+
+    def read_stb(self):
+        time.sleep(self.latency / 4)
+        with self._lock:
+            return self.status_byte()
+
+    def flush(self, mask):
+        with self._lock:
+            self._output.clear()
+
+    def close(self):
+        pass
+
+    # --- helpers for subclasses ------------------------------------------
+    def reply(self, text):
+        self._output.append(text)
+
+    def reply_binary(self, values, datatype="d", header=True):
+        payload = struct.pack(f"<{len(values)}{datatype}", *values)
+        if not header:
+            self._output.append(payload)
+            return
+        length = str(len(payload))
+        self._output.append(f"#{len(length)}{length}".encode() + payload + b"\n")
+
+    def noisy(self, value, floor=1e-12):
+        return value + self._rng.gauss(0.0, self.noise * abs(value) + floor)
+
+    def status_byte(self):
+        """Serial poll status byte; subclasses report their summary bits here."""
+        return 0
+
+    def handle(self, command):
+        if command == "*IDN?":
+            self.reply(self.idn)
+
+
+class Simulated2636B(SimulatedInstrument):
+    """Keithley 2636B answering the TSP commands used by Keithley2636B."""
+
+    idn = "Keithley Instruments Inc., Model 2636B, 4481069, 4.0.0 (simulated)"
+    line_frequency = 60.0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._loading_script = False
+        self.levels = []
+        # (time it is ready, text) of the sweep the instrument is running
+        self._pending = None
+        self._reset()
+
+    def _reset(self):
+        self.smu = {ch: {"func": "volts", "levelv": 0.0, "leveli": 0.0, "output": False,
+                         "limiti": 0.1, "limitv": 20.0, "nplc": 1.0, "delay": 0.0}
+                    for ch in ("smua", "smub")}
+
+    def _reading(self, ch, kind, wait=True):
+        state = self.smu[ch]
+        if wait:
+            time.sleep(state["nplc"] / self.line_frequency)
+        if not state["output"]:
+            voltage, current = 0.0, 0.0
+        elif state["func"] == "volts":
+            voltage = state["levelv"]
+            current = dut_current(voltage, state["limiti"])
+        else:
+            current = state["leveli"]
+            voltage = max(-state["limitv"], min(state["limitv"], current * 10e3))
+        if kind == "i":
+            return self.noisy(current)
+        if kind == "v":
+            return self.noisy(voltage, 1e-6)
+        return self.noisy(voltage / current if current else float("inf"))
+
+    def _sweep(self, ch, src, meas, start, stop, n, levels):
+        """Readings of a triggered sweep, and how long the instrument takes for it."""
+        state = self.smu[ch]
+        if levels is None:
+            levels = [start + (stop - start) * i / (n - 1) for i in range(n)] if n > 1 else [start]
+        values = []
+        state["output"] = True
+        for level in levels:
+            state["levelv" if src == "v" else "leveli"] = level
+            values.extend([level, self._reading(ch, meas, wait=False)])
+        state["output"] = False
+        return values, len(levels) * (state["delay"] + state["nplc"] / self.line_frequency)
+
+    def _deliver(self):
+        """Queue the printbuffer reply of a finished sweep."""
+        with self._lock:
+            if self._pending and time.perf_counter() >= self._pending[0]:
+                self.reply(self._pending[1])
+                self._pending = None
+
+    def status_byte(self):
+        return 0x10 if self._output else 0
+
+    def read_stb(self):
+        self._deliver()
+        return super().read_stb()
+
+    def read(self):
+        # like the real instrument, a read waits (up to the timeout) for a running sweep
+        with self._lock:
+            due = self._pending[0] if self._pending and not self._output else None
+        if due is not None:
+            time.sleep(min(max(0.0, due - time.perf_counter()), self.timeout / 1000))
+        self._deliver()
+        return super().read()
+
+    def handle(self, command):
+        if self._loading_script:
+            match = re.match(r"function (\w+)\(", command)
+            if match:
+                self._script_function = match.group(1)
+            if command == "endscript":
+                self._loading_script = False
+            return
+        if command.startswith("loadscript "):
+            self._loading_script = True
+            return
+        if command in ("reset()", "*RST"):
+            self._reset()
+            return
+
+        match = re.fullmatch(r"(smu[ab])\.source\.(levelv|leveli|limiti|limitv|delay) = (\S+)", command)
+        if match:
+            self.smu[match.group(1)][match.group(2)] = float(match.group(3))
+            return
+        match = re.fullmatch(r"(smu[ab])\.source\.output = smu[ab]\.OUTPUT_(ON|OFF)", command)
+        if match:
+            self.smu[match.group(1)]["output"] = match.group(2) == "ON"
+            return
+        match = re.fullmatch(r"(smu[ab])\.source\.func = smu[ab]\.OUTPUT_DC(VOLTS|AMPS)", command)
+        if match:
+            self.smu[match.group(1)]["func"] = "volts" if match.group(2) == "VOLTS" else "amps"
+            return
+        match = re.fullmatch(r"(smu[ab])\.measure\.nplc = (\S+)", command)
+        if match:
+            self.smu[match.group(1)]["nplc"] = float(match.group(2))
+            return
+
+        match = re.fullmatch(r'print\("([^"]*)" \.\. tostring\((smu[ab])\.measure\.([ivr])\(\)\)\)', command)
+        if match:
+            self.reply(f"{match.group(1)}{self._reading(match.group(2), match.group(3)):.7e}")
+            return
+        if command == "print(localnode.linefreq)":
+            self.reply(f"{self.line_frequency:g}")
+            return
+        match = re.fullmatch(r"print\((smu[ab])\.measure\.([ivr])\(\)\)", command)
+        if match:
+            self.reply(f"{self._reading(match.group(1), match.group(2)):.7e}")
+            return
+
+        if command == "daqsweep_levels = {}":
+            self.levels = []
+            return
+        match = re.fullmatch(
+            r"for _, v in ipairs\(\{(.*)\}\) do table\.insert\(daqsweep_levels, v\) end", command)
+        if match:
+            self.levels.extend(float(v) for v in match.group(1).split(","))
+            return
+        match = re.fullmatch(
+            r'print\("([^"]*)"\) daqsweep_(smu[ab])_([vi])([ivr])\((\S+), (\S+), (\d+), (nil|daqsweep_levels)\)',
+            command)
+        if match:
+            tag, ch, src, meas = match.group(1, 2, 3, 4)
+            start, stop, n = float(match.group(5)), float(match.group(6)), int(match.group(7))
+            levels = None if match.group(8) == "nil" else list(self.levels)
+            self.reply(tag)
+            values, duration = self._sweep(ch, src, meas, start, stop, n, levels)
+            self._pending = (time.perf_counter() + duration, ", ".join(f"{v:.7e}" for v in values))
+            return
+
+        super().handle(command)
+
+
+class Simulated2450(SimulatedInstrument):
+    """Keithley 2450 answering the SCPI commands used by Keithley2450."""
+
+    idn = "KEITHLEY INSTRUMENTS,MODEL 2450,04411193,1.7.0 (simulated)"
+    line_frequency = 60.0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._reset()
+
+    def _reset(self):
+        self.func = "VOLT"
+        self.sense = "CURR"
+        self.level = 0.0
+        self.limit = 0.1
+        self.nplc = 1.0
+        self.output = False
+        self.binary = False
+        self.sweep_levels = None
+        self.sweep_delay = 0.0
+        self.source_list = []
+        self.sweep = None
+        self.loop = None
+        self.buffer = []
+
+    def _value(self, kind):
+        if not self.output:
+            voltage, current = 0.0, 0.0
+        elif self.func == "VOLT":
+            voltage, current = self.level, dut_current(self.level, self.limit)
+        else:
+            current, voltage = self.level, self.level * 10e3
+        if kind == "CURR":
+            return self.noisy(current)
+        if kind == "VOLT":
+            return self.noisy(voltage, 1e-6)
+        return self.noisy(voltage / current if current else float("inf"))
+
+    def _measure(self, kind):
+        time.sleep(self.nplc / self.line_frequency)
+        return self._value(kind)
+
+    def _fill_sweep_buffer(self):
+        """Add the sweep points the instrument would have measured by now."""
+        if self.sweep is None:
+            return
+        period = self.sweep_delay + self.nplc / self.line_frequency
+        elapsed = time.perf_counter() - self.sweep["start"]
+        levels = self.sweep["levels"]
+        due = min(len(levels), int(elapsed / period) if period > 0 else len(levels))
+        while len(self.buffer) < due:
+            self.level = levels[len(self.buffer)]
+            self.buffer.append({"REL": 0.0, "SOUR": self.level, "READ": self._value(self.sense)})
+        if len(self.buffer) >= len(levels):
+            self.sweep = None
+
+    def _fill_loop_buffer(self):
+        """Add the SimpleLoop readings the instrument would have taken by now."""
+        self._fill_sweep_buffer()
+        if self.loop is None:
+            return
+        period = self.loop["delay"] + self.nplc / self.line_frequency
+        elapsed = time.perf_counter() - self.loop["start"]
+        due = min(self.loop["count"], int(elapsed / period) + 1 if period > 0 else self.loop["count"])
+        while len(self.buffer) < due:
+            rel = len(self.buffer) * period
+            self.buffer.append({"REL": rel, "SOUR": self.level, "READ": self._value(self.sense)})
+        if len(self.buffer) >= self.loop["count"]:
+            self.loop = None
+
+    def handle(self, command):
+        upper = command.upper()
+        if upper == "*RST":
+            self._reset()
+            return
+        match = re.fullmatch(r"SOUR:FUNC (VOLT|CURR)", upper)
+        if match:
+            self.func = match.group(1)
+            return
+        match = re.fullmatch(r"SOUR:(VOLT|CURR) (\S+)", upper)
+        if match:
+            self.level = float(match.group(2))
+            return
+        match = re.fullmatch(r"SENS:(CURR|VOLT):PROT (\S+)", upper)
+        if match:
+            self.limit = float(match.group(2))
+            return
+        match = re.fullmatch(r'SENS:FUNC "(CURR|VOLT|RES)"', upper)
+        if match:
+            self.sense = match.group(1)
+            return
+        match = re.fullmatch(r"SENS:(CURR|VOLT):NPLC (\S+)", upper)
+        if match:
+            self.nplc = float(match.group(2))
+            return
+        match = re.fullmatch(r":?OUTP (ON|OFF)", upper)
+        if match:
+            self.output = match.group(1) == "ON"
+            return
+        if upper == ":SYST:LFR?":
+            self.reply(f"{self.line_frequency:g}")
+            return
+        match = re.fullmatch(r"MEAS:(CURR|VOLT|RES)\?", upper)
+        if match:
+            self.reply(f"{self._measure(match.group(1)):.7e}")
+            return
+
+        if upper.startswith("TRAC:CLE"):
+            self.buffer = []
+            return
+        match = re.fullmatch(r"FORM:DATA (REAL|ASC)", upper)
+        if match:
+            self.binary = match.group(1) == "REAL"
+            return
+        match = re.fullmatch(r"SOUR:SWE:(VOLT|CURR):LIN (\S+), (\S+), (\d+), (\S+),.*", upper)
+        if match:
+            start, stop, n = float(match.group(2)), float(match.group(3)), int(match.group(4))
+            self.func = match.group(1)
+            self.sweep_levels = [start + (stop - start) * i / (n - 1) for i in range(n)] if n > 1 else [start]
+            self.sweep_delay = float(match.group(5))
+            return
+        match = re.fullmatch(r"SOUR:LIST:(VOLT|CURR)(:APP)? (.+)", upper)
+        if match:
+            values = [float(v) for v in match.group(3).split(",")]
+            self.source_list = self.source_list + values if match.group(2) else values
+            return
+        match = re.fullmatch(r"SOUR:SWE:(VOLT|CURR):LIST \S+, (\S+),.*", upper)
+        if match:
+            self.func = match.group(1)
+            self.sweep_levels = list(self.source_list)
+            self.sweep_delay = float(match.group(2))
+            return
+        match = re.fullmatch(r'TRIG:LOAD "SIMPLELOOP", (\d+), (\S+), .*', upper)
+        if match:
+            self.sweep_levels = None
+            self.loop = {"count": int(match.group(1)), "delay": float(match.group(2)), "start": None}
+            return
+        if upper == "INIT":
+            if self.sweep_levels is not None:
+                self.sweep = {"levels": self.sweep_levels, "start": time.perf_counter()}
+                self.sweep_levels = None
+                self.output = True
+            elif self.loop is not None:
+                self.loop["start"] = time.perf_counter()
+            return
+        if upper == "ABOR":
+            self.loop = None
+            self.sweep = None
+            return
+        if upper.startswith("TRAC:ACT?"):
+            self._fill_loop_buffer()
+            self.reply(str(len(self.buffer)))
+            return
+        match = re.fullmatch(r'TRAC:DATA\? (\d+), (\d+), "DEFBUFFER1", (.+)', upper)
+        if match:
+            self._fill_loop_buffer()
+            first, last = int(match.group(1)), int(match.group(2))
+            elements = [e.strip() for e in match.group(3).split(",")]
+            values = [row[e] for row in self.buffer[first - 1:last] for e in elements]
+            if self.binary:
+                self.reply_binary(values)
+            else:
+                self.reply(",".join(f"{v:.7e}" for v in values))
+            return
+
+        super().handle(command)
+
+
+class SimulatedSR830(SimulatedInstrument):
+    """SR830 lock-in measuring an RC low-pass (corner 1 kHz) driven by its sine output.
+
+    Outputs beyond the selected sensitivity clip at 1.1x full scale and latch
+    the output-overload bit of LIAS.
+    """
+
+    idn = "Stanford_Research_Systems,SR830,s/n00000,ver1.07 (simulated)"
+    corner_hz = 1000.0
+    gain = 1e-3
+    # SENS index -> full scale in volts
+    sensitivities = [m * 10.0 ** e for e in range(-9, 0) for m in (2, 5, 10)]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.frequency = 1000.0
+        self.amplitude = 1.0
+        self.time_constant_index = 8
+        self.sensitivity_index = 26
+        self.filter_slope_index = 1
+        # LIAS latched bits and the LIAE enable mask summarised in serial poll bit 3
+        self.lia_status = 0
+        self.lia_enable = 0
+        # AUXV output voltages, channels 1-4
+        self.aux_out = {channel: 0.0 for channel in range(1, 5)}
+        # Data buffer: display codes stored for CH1/CH2 (X/Y or R/θ) and samples taken so far
+        self.displays = {1: 1, 2: 2}
+        self.sample_rate = 512.0
+        self.buffer = {1: [], 2: []}
+        self.buffer_started = None
+        self.buffer_paused_at = None
+
+    def _fill_buffer(self):
+        """Add the samples the buffer would have stored since STRT (one-shot mode)."""
+        if self.buffer_started is None:
+            return
+        now = self.buffer_paused_at or time.perf_counter()
+        due = min(16383, int((now - self.buffer_started) * self.sample_rate) + 1)
+        while len(self.buffer[1]) < due:
+            signal = self._signal()
+            for ch in (1, 2):
+                self.buffer[ch].append(self._parameter(self.displays[ch], signal))
+
+    def _signal(self):
+        response = self.gain * self.amplitude / complex(1.0, self.frequency / self.corner_hz)
+        signal = complex(self.noisy(response.real, 1e-9), self.noisy(response.imag, 1e-9))
+        full_scale = self.sensitivities[self.sensitivity_index]
+        if max(abs(signal.real), abs(signal.imag)) > full_scale:
+            limit = 1.1 * full_scale
+            self.lia_status |= 0x04
+            signal = complex(max(-limit, min(limit, signal.real)),
+                             max(-limit, min(limit, signal.imag)))
+        return signal
+
+    def status_byte(self):
+        self._signal()  # an overload persisting right now latches as well
+        return 0x08 if self.lia_status & self.lia_enable else 0
+
+    def _parameter(self, code, signal):
+        """Value of OUTP?/SNAP? parameter `code`; the displays show X and Y."""
+        if code in (1, 10):
+            return signal.real
+        if code in (2, 11):
+            return signal.imag
+        if code == 3:
+            return abs(signal)
+        if code == 4:
+            return math.degrees(cmath.phase(signal))
+        if code == 9:
+            return self.frequency
+        return 0.0  # aux inputs
+
+    def handle(self, command):
+        upper = command.upper()
+        match = re.fullmatch(r"FREQ (\S+)", upper)
+        if match:
+            self.frequency = float(match.group(1))
+            return
+        match = re.fullmatch(r"SLVL (\S+)", upper)
+        if match:
+            self.amplitude = float(match.group(1))
+            return
+        match = re.fullmatch(r"OFLT (\d+)", upper)
+        if match:
+            self.time_constant_index = int(match.group(1))
+            return
+        match = re.fullmatch(r"AUXV ([1-4]),\s*(\S+)", upper)
+        if match:
+            self.aux_out[int(match.group(1))] = float(match.group(2))
+            return
+        match = re.fullmatch(r"AUXV\? ([1-4])", upper)
+        if match:
+            self.reply(f"{self.aux_out[int(match.group(1))]:.3f}")
+            return
+        match = re.fullmatch(r"SENS (\d+)", upper)
+        if match:
+            self.sensitivity_index = int(match.group(1))
+            return
+        match = re.fullmatch(r"OFSL (\d)", upper)
+        if match:
+            self.filter_slope_index = int(match.group(1))
+            return
+        if upper == "OFLT?":
+            self.reply(str(self.time_constant_index))
+            return
+        if upper == "OFSL?":
+            self.reply(str(self.filter_slope_index))
+            return
+        if upper == "SENS?":
+            self.reply(str(self.sensitivity_index))
+            return
+        match = re.fullmatch(r"LIAE (\d+)", upper)
+        if match:
+            self.lia_enable = int(match.group(1))
+            return
+        if upper == "LIAS?":
+            self._signal()
+            self.reply(str(self.lia_status))
+            self.lia_status = 0
+            return
+        match = re.fullmatch(r"(OUTP|SNAP)\? ?([\d,]+)", upper)
+        if match:
+            signal = self._signal()
+            codes = [int(c) for c in match.group(2).split(",")]
+            self.reply(",".join(f"{self._parameter(c, signal):.6e}" for c in codes))
+            return
+
+        match = re.fullmatch(r"DDEF ([12]),(\d),\d", upper)
+        if match:
+            ch, display = int(match.group(1)), int(match.group(2))
+            # CH1: 0 = X, 1 = R; CH2: 0 = Y, 1 = θ
+            self.displays[ch] = {(1, 0): 1, (1, 1): 3, (2, 0): 2, (2, 1): 4}.get((ch, display), 0)
+            return
+        match = re.fullmatch(r"SRAT (\d+)", upper)
+        if match:
+            self.sample_rate = 0.0625 * 2 ** int(match.group(1))
+            return
+        if upper == "REST":
+            self.buffer = {1: [], 2: []}
+            self.buffer_started = self.buffer_paused_at = None
+            return
+        if upper == "STRT":
+            self.buffer_started = time.perf_counter()
+            self.buffer_paused_at = None
+            return
+        if upper == "PAUS":
+            if self.buffer_started is not None:
+                self.buffer_paused_at = time.perf_counter()
+            return
+        if upper == "SPTS?":
+            self._fill_buffer()
+            self.reply(str(len(self.buffer[1])))
+            return
+        match = re.fullmatch(r"TRCB\? ([12]),(\d+),(\d+)", upper)
+        if match:
+            self._fill_buffer()
+            ch, first, count = (int(g) for g in match.groups())
+            self.reply_binary(self.buffer[ch][first:first + count], "f", header=False)
+            return
+        super().handle(command)
+
+
+class SimulatedLakeShore(SimulatedInstrument):
+    """Temperature controller whose sample relaxes exponentially to the setpoint.
+
+    With RAMP enabled the setpoint itself moves towards a new SETP value at
+    the ramp rate (K/min) and the sample follows it. Readings carry `noise`
+    kelvin of sensor noise (absolute, unlike the relative noise of the
+    other instruments).
+    """
+
+    def __init__(self, *args, time_constant=20.0, start_kelvin=295.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.time_constant = time_constant
+        self.kelvin = start_kelvin
+        # setpoint is where the loop is now; target is the last SETP value
+        self.setpoint = start_kelvin
+        self.target = start_kelvin
+        self.ramp_enabled = False
+        self.ramp_rate = 0.0
+        self._updated = time.monotonic()
+
+    def _advance(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        # While ramping, step the setpoint in small slices; after that the decay is exact
+        while elapsed > 0 and self.setpoint != self.target:
+            dt = min(elapsed, 0.05)
+            step = self.ramp_rate / 60.0 * dt
+            if self.setpoint < self.target:
+                self.setpoint = min(self.setpoint + step, self.target)
+            else:
+                self.setpoint = max(self.setpoint - step, self.target)
+            self.kelvin = self.setpoint + (self.kelvin - self.setpoint) * math.exp(
+                -dt / self.time_constant)
+            elapsed -= dt
+        decay = math.exp(-elapsed / self.time_constant)
+        self.kelvin = self.setpoint + (self.kelvin - self.setpoint) * decay
+
+    def _temperature(self):
+        self._advance()
+        return self.kelvin + self._rng.gauss(0.0, self.noise)
+
+    def handle(self, command):
+        upper = command.upper()
+        match = re.fullmatch(r"SETP (\d),\s*(\S+)", upper)
+        if match:
+            self._advance()
+            self.target = float(match.group(2))
+            if not self.ramp_enabled or self.ramp_rate <= 0:
+                self.setpoint = self.target
+            return
+        if re.fullmatch(r"SETP\? ?\d?", upper):
+            self._advance()
+            self.reply(f"{self.setpoint:.3f}")
+            return
+        match = re.fullmatch(r"RAMP (\d),\s*([01]),\s*(\S+)", upper)
+        if match:
+            self._advance()
+            self.ramp_enabled = match.group(2) == "1"
+            self.ramp_rate = float(match.group(3))
+            if not self.ramp_enabled:
+                self.setpoint = self.target
+            return
+        if re.fullmatch(r"RAMP\? ?\d?", upper):
+            self.reply(f"{int(self.ramp_enabled)},{self.ramp_rate:.3f}")
+            return
+        if re.fullmatch(r"RAMPST\? ?\d?", upper):
+            self._advance()
+            self.reply("1" if self.setpoint != self.target else "0")
+            return
+        if re.fullmatch(r"KRDG\? ?\w?", upper):
+            self.reply(f"{self._temperature():+.4f}")
+            return
+        if re.fullmatch(r"RANGE\? ?\d?", upper):
+            self.reply("1")
+            return
+        super().handle(command)
+
+
+class SimulatedLakeShore335(SimulatedLakeShore):
+    idn = "LSCI,MODEL335,LSA0000/#######,1.0 (simulated)"
+
+
+class SimulatedLakeShore325(SimulatedLakeShore):
+    idn = "LSCI,MODEL325,LSA0000,1.0 (simulated)"
+
+
+class SimulatedResourceManager:
+    """Drop-in for pyvisa.ResourceManager serving one simulated instrument per address."""
+
+    def __init__(self, latency=0.002, noise=1e-3, temperature_time_constant=20.0, seed=None):
+        self.instruments = {
+            SIM_ADDRESSES["Keithley2636B"]: Simulated2636B(
+                SIM_ADDRESSES["Keithley2636B"], latency, noise, seed),
+            SIM_ADDRESSES["Keithley2450"]: Simulated2450(
+                SIM_ADDRESSES["Keithley2450"], latency, noise, seed),
+            SIM_ADDRESSES["SR830"]: SimulatedSR830(
+                SIM_ADDRESSES["SR830"], latency, noise, seed),
+            SIM_ADDRESSES["LakeShore335"]: SimulatedLakeShore335(
+                SIM_ADDRESSES["LakeShore335"], latency, noise, seed,
+                time_constant=temperature_time_constant),
+            SIM_ADDRESSES["LakeShore325"]: SimulatedLakeShore325(
+                SIM_ADDRESSES["LakeShore325"], latency, noise, seed,
+                time_constant=temperature_time_constant),
+        }
+
+    def list_resources(self):
+        return tuple(self.instruments)
+
+    def open_resource(self, address):
+        if address not in self.instruments:
+            raise VisaIOError(constants.VI_ERROR_RSRC_NFOUND)
+        instrument = self.instruments[address]
+        instrument.flush(constants.VI_READ_BUF_DISCARD)
+        return instrument
+
+    def close(self):
+        pass
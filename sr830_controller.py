@@ -1,14 +1,44 @@
-import pyvisa
 import logging
 import time
 
+import numpy as np
+
+from visa_resources import shared_resource_manager
+
 logging.basicConfig(filename='instrument_gui.log', level=logging.INFO)
 
 
 class SR830Controller:
-    def __init__(self, address=None):
+    # SNAP? parameter codes
+    SNAP_PARAMETERS = {"X": 1, "Y": 2, "R": 3, "THETA": 4,
+                       "AUX1": 5, "AUX2": 6, "AUX3": 7, "AUX4": 8,
+                       "FREQ": 9, "CH1": 10, "CH2": 11}
+    # SRAT index -> samples per second (index 14 is the external trigger)
+    SAMPLE_RATES = [0.0625 * 2 ** i for i in range(14)]
+    BUFFER_SIZE = 16383
+    # DDEF display settings for CH1/CH2 per output mode
+    BUFFER_DISPLAYS = {"X/Y": (0, 0), "R/θ": (1, 1)}
+    # OFLT index -> time constant in seconds (10 µs ... 30 ks)
+    TIME_CONSTANTS = [10e-6, 30e-6, 100e-6, 300e-6, 1e-3, 3e-3, 10e-3, 30e-3, 100e-3, 300e-3,
+                      1, 3, 10, 30, 100, 300, 1e3, 3e3, 10e3, 30e3]
+    # OFSL index -> filter slope in dB/oct, and the time constants needed to settle to 99%
+    FILTER_SLOPES = [6, 12, 18, 24]
+    SETTLE_TIME_CONSTANTS = [5, 7, 9, 10]
+    # SENS index -> full-scale sensitivity in volts (2 nV ... 1 V)
+    SENSITIVITIES = [m * 10.0 ** e for e in range(-9, 0) for m in (2, 5, 10)]
+    # LIAS bits 0-2: input, filter and output overload; bit 3 of the serial poll
+    # status byte summarises them once enabled with LIAE
+    OVERLOAD_BITS = 0x07
+    LIA_STATUS_BIT = 0x08
+
+    def __init__(self, address=None, rm=None):
+        # Cached OFLT/OFSL indices; read from the instrument when still unknown
+        self.time_constant_index = None
+        self.filter_slope_index = None
+        self.sensitivity_index = None
+        self._overload_reporting = False
         try:
-            self.rm = pyvisa.ResourceManager()
+            self.rm = rm or shared_resource_manager()
             self.address = address or self._find_device()
             self.inst = self.rm.open_resource(self.address)
             self.inst.write_termination = '\n'
@@ -24,6 +54,9 @@ class SR830Controller:
         for res in self.rm.list_resources():
             try:
                 inst = self.rm.open_resource(res)
+            except Exception:
+                continue
+            try:
                 inst.write_termination = '\n'
                 inst.read_termination = '\n'
                 idn = inst.query("*IDN?").strip()
@@ -32,6 +65,8 @@ class SR830Controller:
                     return res
             except Exception:
                 continue
+            finally:
+                inst.close()
         raise Exception(
             "SR830 Lock-in Amplifier not found. Check connections.")
 
@@ -64,45 +99,270 @@ class SR830Controller:
         except Exception as e:
             logging.warning(f"Failed to set reference: {e}")
 
+    def set_offset_voltage(self, voltage, output=1):
+        """DC voltage on an aux output (AUXV, ±10.5 V); the sine output has no DC offset of its own."""
+        if not -10.5 <= voltage <= 10.5:
+            raise ValueError(f"Aux output voltage {voltage} V is outside ±10.5 V")
+        self.inst.write(f'AUXV {output},{voltage:.3f}')
+
     def set_time_constant(self, value_index):
         try:
             self.inst.write(f'OFLT {value_index}')
+            self.time_constant_index = int(value_index)
             logging.info(f"Set time constant index to {value_index}")
         except Exception as e:
             logging.warning(f"Failed to set time constant: {e}")
 
+    def set_filter_slope(self, slope_index):
+        try:
+            self.inst.write(f'OFSL {slope_index}')
+            self.filter_slope_index = int(slope_index)
+            logging.info(
+                f"Set filter slope to {self.FILTER_SLOPES[self.filter_slope_index]} dB/oct")
+        except Exception as e:
+            logging.warning(f"Failed to set filter slope: {e}")
+
+    def time_constant(self):
+        """Output filter time constant in seconds."""
+        if self.time_constant_index is None:
+            self.time_constant_index = int(self.inst.query('OFLT?'))
+        return self.TIME_CONSTANTS[self.time_constant_index]
+
+    def settle_time(self):
+        """Time for the output to reach 99% of a step: 5 to 10 time constants depending on slope."""
+        if self.filter_slope_index is None:
+            self.filter_slope_index = int(self.inst.query('OFSL?'))
+        return self.SETTLE_TIME_CONSTANTS[self.filter_slope_index] * self.time_constant()
+
+    def settle(self, parameters=("X", "Y"), tolerance=None, sleep=time.sleep):
+        """
+        Wait for the output filter to settle after a source or reference change,
+        then return a SNAP? reading of `parameters`.
+
+        Without `tolerance` this waits settle_time() and reads once. With a
+        relative `tolerance` (e.g. 0.001) the outputs are read every time
+        constant and the wait ends as soon as two successive readings agree
+        to within it, or after settle_time() at the latest.
+
+        `sleep` does the waiting and may return False to abort (e.g. a
+        worker's interruptible sleep); settle then returns None.
+        """
+        wait = self.settle_time()
+        if tolerance is None:
+            if sleep(wait) is False:
+                return None
+            return self.snap(*parameters)
+
+        step = self.time_constant()
+        waited = 0.0
+        previous = None
+        while True:
+            if sleep(step) is False:
+                return None
+            waited += step
+            reading = self.snap(*parameters)
+            if previous is not None and all(
+                    abs(new - old) <= tolerance * max(abs(new), abs(old))
+                    for new, old in zip(reading, previous)):
+                return reading
+            if waited >= wait:
+                return reading
+            previous = reading
+
     def set_sensitivity(self, level_index):
         try:
             self.inst.write(f'SENS {level_index}')
+            self.sensitivity_index = int(level_index)
             logging.info(f"Set sensitivity level index to {level_index}")
         except Exception as e:
             logging.warning(f"Failed to set sensitivity: {e}")
 
+    def sensitivity(self):
+        """Full-scale sensitivity in volts."""
+        if self.sensitivity_index is None:
+            self.sensitivity_index = int(self.inst.query('SENS?'))
+        return self.SENSITIVITIES[self.sensitivity_index]
+
+    def overloaded(self):
+        """
+        True if an input, filter or output overload was latched since the last call.
+
+        The serial poll status byte is checked first, so the common no-overload
+        case costs a bus poll rather than a query; LIAS? is only read (which
+        also clears the latch) when the summary bit is set.
+        """
+        if not self._overload_reporting:
+            self.inst.write(f'LIAE {self.OVERLOAD_BITS}')
+            self.inst.query('LIAS?')  # clear anything latched before now
+            self._overload_reporting = True
+        try:
+            if not self.inst.read_stb() & self.LIA_STATUS_BIT:
+                return False
+        except Exception:
+            pass  # no serial poll on this interface; fall back to the query
+        return bool(int(self.inst.query('LIAS?')) & self.OVERLOAD_BITS)
+
+    def autorange_settle(self, parameters=("X", "Y"), tolerance=None, sleep=time.sleep,
+                         upper=0.9, lower=0.3, max_changes=10):
+        """
+        settle() and read `parameters`, adjusting the sensitivity until the
+        signal sits between `lower` and `upper` of full scale without overload.
+
+        R is read in the same SNAP? as `parameters`, so a reading that is in
+        range costs no extra query beyond the overload check. A clipped
+        reading says little about the true level, so an overload steps the
+        sensitivity up a decade (3 ranges); otherwise the range is chosen
+        directly from R. With the SR830's 2-2.5x range steps, lower < upper /
+        2.5 gives hysteresis: a new range never lands outside the band.
+
+        Returns (reading, full-scale volts), or None if `sleep` aborted.
+        """
+        with_r = "R" not in (p.upper() for p in parameters)
+        names = tuple(parameters) + (("R",) if with_r else ())
+        full_scale = self.sensitivity()
+        for _ in range(max_changes + 1):
+            values = self.settle(names, tolerance=tolerance, sleep=sleep)
+            if values is None:
+                return None
+            reading = values[:-1] if with_r else values
+            magnitude = abs(values[-1] if with_r else
+                            values[[p.upper() for p in parameters].index("R")])
+            index = self.sensitivity_index
+
+            if self.overloaded():
+                # Transients right after a source step also latch; only act if it persists
+                if sleep(self.time_constant()) is False:
+                    return None
+                overload = self.overloaded()
+            else:
+                overload = False
+            if overload:
+                target = min(index + 3, len(self.SENSITIVITIES) - 1)
+            elif magnitude > upper * full_scale or magnitude < lower * full_scale:
+                target = next((i for i, fs in enumerate(self.SENSITIVITIES)
+                               if magnitude < upper * fs), len(self.SENSITIVITIES) - 1)
+            else:
+                target = index
+            if target == index:
+                return reading, full_scale
+
+            self.set_sensitivity(target)
+            full_scale = self.SENSITIVITIES[target]
+            logging.info(f"Autorange: sensitivity {full_scale:g} V full scale")
+        return reading, full_scale
+
+    def snap(self, *parameters):
+        """
+        Read 2 to 6 parameters sampled at the same instant with one SNAP? query.
+
+        Parameters are names from SNAP_PARAMETERS (case-insensitive, "θ" also
+        means THETA), e.g. snap("R", "THETA", "FREQ"). Returns a tuple of
+        floats in the order requested.
+        """
+        if not 2 <= len(parameters) <= 6:
+            raise ValueError("SNAP? reads between 2 and 6 parameters")
+        codes = []
+        for name in parameters:
+            key = "THETA" if name == "θ" else name.upper()
+            if key not in self.SNAP_PARAMETERS:
+                raise ValueError(f"Unknown SNAP? parameter: {name}")
+            codes.append(str(self.SNAP_PARAMETERS[key]))
+        response = self.inst.query(f"SNAP? {','.join(codes)}")
+        values = tuple(float(v) for v in response.split(','))
+        if len(values) != len(codes):
+            raise ValueError(f"Unexpected SNAP? response: {response.strip()}")
+        return values
+
     def read_xy(self):
         try:
-            response = self.inst.query('OUTP? 1,2')
-            x, y = map(float, response.split(','))
-            return x, y
+            return self.snap("X", "Y")
         except Exception as e:
             logging.warning(f"Failed to read X/Y: {e}")
             return 0.0, 0.0
 
     def read_rtheta(self):
         try:
-            r = float(self.inst.query('OUTP? 3'))
-            theta = float(self.inst.query('OUTP? 4'))
-            return r, theta
+            return self.snap("R", "THETA")
         except Exception as e:
             logging.warning(f"Failed to read R/θ: {e}")
             return 0.0, 0.0
 
+    def sample_rate_index(self, rate):
+        """SRAT index of the slowest sample rate at or above `rate` (max 512 Hz)."""
+        for index, value in enumerate(self.SAMPLE_RATES):
+            if value >= rate:
+                return index
+        return len(self.SAMPLE_RATES) - 1
+
+    def _read_trace(self, channel, first, count):
+        """Read `count` points of buffer `channel` starting at `first` with TRCB?."""
+        return self.inst.query_binary_values(
+            f"TRCB? {channel},{first},{count}", datatype='f', is_big_endian=False,
+            header_fmt='empty', expect_termination=False, data_points=count,
+            container=np.array)
+
+    def buffered_stream(self, rate=512.0, output_mode="X/Y", duration=None, poll_interval=0.2):
+        """
+        Sample CH1/CH2 into the SR830's internal buffer and stream them out in blocks.
+
+        The lock-in samples at the SRAT rate closest above `rate` (up to
+        512 Hz) on its own clock, while this generator polls SPTS? and pulls
+        the new points of both channels with binary TRCB? transfers. Yields
+        numpy arrays (seconds since the start, ch1, ch2), where the channels
+        are X/Y or R/θ according to `output_mode`.
+
+        The buffer holds 16383 points, so longer runs are split into
+        segments: the buffer is reset and restarted when it is full, leaving
+        a gap of one poll in the time axis. Runs until `duration` seconds of
+        samples have been read, or forever if None; closing the generator
+        pauses the buffer.
+        """
+        index = self.sample_rate_index(rate)
+        rate = self.SAMPLE_RATES[index]
+        display1, display2 = self.BUFFER_DISPLAYS[output_mode]
+        self.inst.write(f'DDEF 1,{display1},0')
+        self.inst.write(f'DDEF 2,{display2},0')
+        self.inst.write(f'SRAT {index}')
+        self.inst.write('SEND 0')   # one-shot: stop storing when full
+        self.inst.write('TSTR 0')
+        logging.info(f"SR830 buffered acquisition at {rate} Hz ({output_mode})")
+
+        total = None if duration is None else int(duration * rate)
+        emitted = 0
+        stream_start = None
+        try:
+            while total is None or emitted < total:
+                self.inst.write('REST')
+                self.inst.write('STRT')
+                now = time.perf_counter()
+                if stream_start is None:
+                    stream_start = now
+                segment_start = now - stream_start
+                capacity = self.BUFFER_SIZE if total is None else min(
+                    self.BUFFER_SIZE, total - emitted)
+
+                read = 0
+                while read < capacity:
+                    time.sleep(poll_interval)
+                    stored = min(int(self.inst.query('SPTS?')), capacity)
+                    if stored > read:
+                        count = stored - read
+                        ch1 = self._read_trace(1, read, count)
+                        ch2 = self._read_trace(2, read, count)
+                        times = segment_start + (read + np.arange(count)) / rate
+                        read = stored
+                        emitted += count
+                        yield times, ch1, ch2
+        finally:
+            self.inst.write('PAUS')
+
     def disconnect(self):
         self.close()
 
     def close(self):
         try:
+            # the resource manager is shared with the other drivers; only release our session
             self.inst.close()
-            self.rm.close()
             logging.info("SR830 connection closed.")
         except Exception as e:
             logging.warning(f"SR830 close error: {e}")
@@ -0,0 +1,61 @@
+# Temperature Stabilization experiments, imported on first use through experiment_registry
+from acquisition_scheduler import AcquisitionScheduler
+from temperature_settling import TemperatureSettler
+
+# Seconds between temperature readings while settling
+POLL_INTERVAL = 0.5
+
+
+def stabilization(set_temperature, read_temperature, target, tolerance=0.1, window=10.0,
+                  timeout=300):
+    """Experiment that sets `target` (°C) and records the temperature until it is stable."""
+    def acquire(worker):
+        set_temperature(target)
+        yield {"x_label": "Time (s)", "y_label": "T (°C)",
+               "title": f"Stabilizing at {target} °C"}
+        settler = TemperatureSettler(target, tolerance, window)
+        scheduler = AcquisitionScheduler(POLL_INTERVAL, stop_check=worker.should_stop)
+        for tick in scheduler.ticks(duration=timeout):
+            temperature = read_temperature()
+            if temperature is None:
+                raise RuntimeError("Temperature reading failed.")
+            settler.add(tick.actual, temperature)
+            worker.status_changed.emit(settler.status())
+            yield tick.actual, temperature
+            if settler.is_stable():
+                worker.summary = f"stable after {tick.actual:.0f} s"
+                return
+        if not worker.should_stop():
+            raise RuntimeError(f"{target} °C not reached within {timeout:g} s.")
+    return acquire
+
+
+def run_lakeshore335(gui):
+    target = float(gui.temp_input.text())
+    output_channel = int(gui.output_channel_select.currentText())
+    input_channel = gui.input_channel_select.currentText()
+    lakeshore = gui.lakeshore
+    acquire = stabilization(
+        lambda celsius: lakeshore.set_temperature(celsius, channel=output_channel),
+        lambda: lakeshore.get_temperature(input_channel),
+        target, **gui.stability_settings())
+    gui.start_experiment(acquire, f"Temperature stable at {target} °C.",
+                         error_title="Temperature stabilization failed",
+                         stopped_message="Temperature stabilization stopped.")
+
+
+def run_lakeshore325(gui):
+    # The 325 takes and reports kelvin; its panel has no stability fields, so defaults apply
+    target = float(gui.l325_temp_input.text())
+    input_channel = int(gui.l325_input_channel_select.currentText())
+    lakeshore = gui.lakeshore325
+
+    def read_celsius():
+        kelvin = lakeshore.get_temperature(input_channel)
+        return None if kelvin is None else kelvin - 273.15
+
+    acquire = stabilization(
+        lambda celsius: lakeshore.set_temperature(celsius + 273.15), read_celsius, target)
+    gui.start_experiment(acquire, f"Temperature stable at {target} °C.",
+                         error_title="Temperature stabilization failed",
+                         stopped_message="Temperature stabilization stopped.")
@@ -0,0 +1,115 @@
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+
+class StreamRecorder:
+    """Append-only CSV recorder that writes acquired rows from its own thread.
+
+    write() never blocks: rows are collected into chunks and handed to a
+    bounded queue; if the disk falls behind and the queue is full the rows
+    stay in memory and go out with the next chunk. Every chunk is flushed to
+    the OS as soon as it is written, and synced to disk at most every
+    `fsync_interval` seconds (0 = every chunk, None = never), so a crash
+    loses at most the last interval of data.
+
+    Subclasses change the file format by overriding _open, _begin_block,
+    _write_chunk, _sync and _close, all of which run on the writer thread.
+    """
+
+    _CLOSE = object()
+
+    def __init__(self, path, metadata=None, chunk_size=256, max_queue=64, fsync_interval=5.0):
+        self.path = path
+        # file the rows are streamed to; subclasses may write `path` from it at the end
+        self.stream_path = path
+        self.metadata = dict(metadata or {})
+        self.chunk_size = chunk_size
+        self.fsync_interval = fsync_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._pending = []
+        self._columns = 0
+        self._last_fsync = time.monotonic()
+        self.error = None
+        self._open()
+        self._thread = threading.Thread(
+            target=self._run, name="StreamRecorder", daemon=True)
+        self._thread.start()
+
+    def begin_trace(self, trace, columns):
+        """Start a new block of rows with the given trace labels and columns."""
+        self._submit(block=True)
+        self._columns = len(columns)
+        # Block headers are rare, so waiting for room here is harmless.
+        self._queue.put(("begin", trace, list(columns)))
+
+    def write(self, rows):
+        self._pending.extend(rows)
+        if len(self._pending) >= self.chunk_size:
+            self._submit()
+
+    def close(self):
+        """Write everything still pending, then stop the writer thread."""
+        self._submit(block=True)
+        self._queue.put(self._CLOSE)
+        self._thread.join()
+        self._close()
+
+    def _submit(self, block=False):
+        """Hand pending rows to the writer; without `block`, keep them if the queue is full."""
+        if not self._pending:
+            return
+        rows = np.array(self._pending, dtype=np.float64).reshape(-1, self._columns)
+        try:
+            self._queue.put(rows, block=block)
+        except queue.Full:
+            return
+        self._pending = []
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is self._CLOSE:
+                return
+            try:
+                if isinstance(item, tuple):
+                    self._begin_block(item[1], item[2])
+                else:
+                    self._write_chunk(item)
+                now = time.monotonic()
+                if self.fsync_interval is not None and now - self._last_fsync >= self.fsync_interval:
+                    self._sync()
+                    self._last_fsync = now
+            except Exception as e:
+                self.error = e
+                print(f"[ERROR] Stream recorder write failed: {e}")
+
+    def _open(self):
+        self._file = open(self.stream_path, "a")
+        for key, value in self.metadata.items():
+            self._file.write(f"# {key} = {value}\n")
+        self._file.flush()
+
+    def _begin_block(self, trace, columns):
+        labels = [trace.get("x_label", "x"), trace.get("y_label", "y1")]
+        if "y2_label" in trace:
+            labels.append(trace["y2_label"])
+        labels.extend(trace.get("extra_columns", {}).values())
+        self._file.write(
+            f"# {trace.get('title', '')}\n# {', '.join(labels)}\n{','.join(columns)}\n")
+        self._file.flush()
+
+    def _write_chunk(self, rows):
+        np.savetxt(self._file, rows, delimiter=",", fmt="%.10g")
+        self._file.flush()
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+
+    def _close(self):
+        self._file.flush()
+        self._sync()
+        self._file.close()
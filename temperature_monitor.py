@@ -0,0 +1,85 @@
+import threading
+import time
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class TemperatureMonitor(QObject):
+    """Keep the latest reading of each temperature controller, polled off the GUI thread.
+
+    Controllers are added with watch(name, resource_name, read): `read` is
+    called every `interval` seconds through the I/O pool, so a slow reply
+    never stalls the GUI. The driver's session must come from a
+    SessionPool: its lock (see visa_resources.PooledSession) makes the
+    monitor's query wait for any query an experiment has in flight on the
+    same instrument, or on its GPIB board, instead of interleaving with it.
+    `read` should accept max_age and reuse a reading the driver took within
+    that time; while an experiment is reading the same sensor anyway the
+    monitor then costs no bus traffic at all.
+
+    Every reading is published through reading_ready(name, value,
+    time.monotonic()) and kept for latest(), so experiments and metadata
+    can use it without querying.
+    """
+
+    reading_ready = pyqtSignal(str, float, float)
+    reading_failed = pyqtSignal(str, str)
+
+    def __init__(self, io_pool, interval=1.0, parent=None):
+        super().__init__(parent)
+        self.io_pool = io_pool
+        self.interval = interval
+        self._sources = {}
+        self._latest = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="TemperatureMonitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def watch(self, name, resource_name, read, *args):
+        """Poll read(*args, max_age=interval) on `resource_name`'s I/O thread as `name`."""
+        with self._lock:
+            self._sources[name] = (resource_name, read, args)
+
+    def unwatch(self, name):
+        with self._lock:
+            self._sources.pop(name, None)
+            self._latest.pop(name, None)
+
+    def latest(self, name, max_age=None):
+        """Last value read for `name`, or None if there is none (or it is older than max_age s)."""
+        with self._lock:
+            reading = self._latest.get(name)
+        if reading is None or (max_age is not None and time.monotonic() - reading[1] > max_age):
+            return None
+        return reading[0]
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                sources = list(self._sources.items())
+            for name, (resource_name, read, args) in sources:
+                try:
+                    value = self.io_pool.submit(
+                        resource_name, lambda: read(*args, max_age=self.interval)).result().value
+                except Exception as e:
+                    self.reading_failed.emit(name, str(e))
+                    continue
+                if value is None:
+                    self.reading_failed.emit(name, "no reading")
+                    continue
+                now = time.monotonic()
+                with self._lock:
+                    if name not in self._sources:
+                        continue
+                    self._latest[name] = (value, now)
+                self.reading_ready.emit(name, float(value), now)
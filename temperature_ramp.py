@@ -0,0 +1,73 @@
+import threading
+from collections import deque
+
+import numpy as np
+
+
+class TemperatureTrack:
+    """Temperatures polled in the background, interpolated to the times of other readings.
+
+    `read` is called in a loop on its own thread and must return a
+    TimedReading of a temperature (see io_scheduler); the reading is
+    stamped at the middle of its round-trip. at(t) then gives the
+    temperature at any perf_counter() time t by linear interpolation
+    between the polls either side of it, so a measurement taken while the
+    temperature ramps gets the temperature of the moment it was made rather
+    than of the last poll before it.
+
+    Callers must ask for times in increasing order: samples older than the
+    last time asked for are dropped, which keeps an overnight ramp from
+    growing the history without bound.
+    """
+
+    def __init__(self, read, interval=0.1):
+        self._read = read
+        self.interval = interval
+        self._times = deque()
+        self._temperatures = deque()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.error = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="TemperatureTrack", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                reading = self._read()
+            except Exception as e:
+                self.error = e
+                print(f"[ERROR] Temperature polling failed: {e}")
+                return
+            if reading.value is not None:
+                with self._lock:
+                    self._times.append((reading.started + reading.finished) / 2)
+                    self._temperatures.append(reading.value)
+            self._stop.wait(self.interval)
+
+    def latest(self):
+        """Most recent temperature polled, or None before the first poll."""
+        with self._lock:
+            return self._temperatures[-1] if self._temperatures else None
+
+    def at(self, t, final=False):
+        """Temperature at perf_counter() time t, or None until a poll after t has arrived.
+
+        With `final` (polling has stopped) times past the last poll get the
+        last temperature instead of None.
+        """
+        with self._lock:
+            if not self._times or (self._times[-1] < t and not final):
+                return None
+            while len(self._times) > 2 and self._times[1] <= t:
+                self._times.popleft()
+                self._temperatures.popleft()
+            return float(np.interp(t, self._times, self._temperatures))
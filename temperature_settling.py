@@ -0,0 +1,115 @@
+import math
+from collections import deque
+
+import numpy as np
+
+
+class TemperatureSettler:
+    """Decide from a rolling window of readings when a temperature has settled.
+
+    Readings are add()ed as (time in s, temperature). The temperature counts
+    as stable once, over the last `window` seconds:
+
+    - the mean is within `tolerance` of the target,
+    - the standard deviation is at most `max_std` (default tolerance / 3),
+    - the fitted drift is at most `max_slope` per second (default: less
+      than `tolerance` over the whole window),
+    - and every reading for at least `min_time_in_band` seconds (default the
+      full window) has stayed within `tolerance`.
+
+    A single reading crossing the band on its way past the target therefore
+    does not count, while a temperature that is already steady is accepted
+    after one window instead of after a fixed wait.
+
+    While the temperature is still approaching, remaining() fits an
+    exponential to the recent error and predicts how long until the
+    criteria can be met.
+    """
+
+    def __init__(self, target, tolerance=0.1, window=10.0, max_std=None, max_slope=None,
+                 min_time_in_band=None):
+        self.target = target
+        self.tolerance = tolerance
+        self.window = window
+        self.max_std = tolerance / 3 if max_std is None else max_std
+        self.max_slope = tolerance / window if max_slope is None else max_slope
+        self.min_time_in_band = window if min_time_in_band is None else min_time_in_band
+        self.readings = deque()
+        # Time of the first reading of the current unbroken run inside the band
+        self.in_band_since = None
+        self.started = None
+
+    def add(self, t, temperature):
+        if self.started is None:
+            self.started = t
+        self.readings.append((t, temperature))
+        # keep at least three readings so a short window can still be judged
+        while len(self.readings) > 3 and t - self.readings[0][0] > self.window:
+            self.readings.popleft()
+        if abs(temperature - self.target) <= self.tolerance:
+            if self.in_band_since is None:
+                self.in_band_since = t
+        else:
+            self.in_band_since = None
+
+    def _arrays(self):
+        t, temperature = zip(*self.readings)
+        return np.array(t), np.array(temperature)
+
+    def slope(self):
+        """Least-squares drift over the window, in degrees per second."""
+        if len(self.readings) < 3:
+            return None
+        t, temperature = self._arrays()
+        if t[-1] == t[0]:
+            return None
+        return np.polyfit(t - t[0], temperature, 1)[0]
+
+    def is_stable(self):
+        if len(self.readings) < 3 or self.in_band_since is None:
+            return False
+        now = self.readings[-1][0]
+        if now - self.in_band_since < self.min_time_in_band:
+            return False
+        if now - self.started < self.window:
+            return False
+        _, temperature = self._arrays()
+        slope = self.slope()
+        return (abs(temperature.mean() - self.target) <= self.tolerance
+                and temperature.std() <= self.max_std
+                and slope is not None and abs(slope) <= self.max_slope)
+
+    def remaining(self):
+        """Predicted seconds until stable, or None if the approach cannot be fitted yet."""
+        if len(self.readings) < 3:
+            return None
+        now = self.readings[-1][0]
+        if self.in_band_since is not None:
+            return max(self.min_time_in_band - (now - self.in_band_since), 0.0)
+
+        t, temperature = self._arrays()
+        error = temperature - self.target
+        same_side = np.sign(error) == np.sign(error[-1])
+        t, error = t[same_side], np.abs(error[same_side])
+        if len(t) < 3 or t[-1] == t[0]:
+            return None
+        # |T - target| = A exp(-t / tau) is a straight line in log space
+        rate = np.polyfit(t - t[0], np.log(error), 1)[0]
+        if rate >= 0:
+            return None  # not approaching
+        to_band = math.log(error[-1] / self.tolerance) / -rate
+        return to_band + self.min_time_in_band
+
+    def status(self):
+        """Short progress text for the status bar."""
+        if not self.readings:
+            return "Waiting for temperature readings..."
+        temperature = self.readings[-1][1]
+        if self.in_band_since is not None:
+            dwell = self.readings[-1][0] - self.in_band_since
+            return (f"T = {temperature:.3f}, within ±{self.tolerance:g} of "
+                    f"{self.target:g} for {dwell:.0f} s")
+        eta = self.remaining()
+        if eta is None:
+            return f"T = {temperature:.3f}, approaching {self.target:g}"
+        return f"T = {temperature:.3f}, approaching {self.target:g} (stable in ~{eta:.0f} s)"
@@ -0,0 +1,41 @@
+import numpy as np
+
+from acquisition_buffer import AcquisitionBuffer
+
+
+def test_growing_buffer_doubles_and_keeps_rows():
+    """Past its capacity the buffer doubles, keeping every row in order."""
+    buffer = AcquisitionBuffer(("time", "x", "y1"), capacity=4)
+    buffer.extend([(i, 10 * i, -i) for i in range(5)])
+    assert buffer._data.shape[1] == 8
+    buffer.extend([(i, 10 * i, -i) for i in range(5, 8)])
+    assert buffer._data.shape[1] == 8
+    buffer.append((8, 80, -8))
+    assert buffer._data.shape[1] == 16
+
+    assert len(buffer) == buffer.total_written == 9
+    np.testing.assert_array_equal(buffer.column("x"), 10 * np.arange(9))
+    np.testing.assert_array_equal(buffer.as_array()[2], -np.arange(9))
+    # columns are views into the buffer, not copies
+    assert np.shares_memory(buffer.column("y1"), buffer._data)
+
+
+def test_ring_keeps_the_newest_points_across_wraparound():
+    """With max_points the buffer keeps only the newest rows, oldest first."""
+    buffer = AcquisitionBuffer(("time", "x", "y1"), max_points=5)
+    for i in range(7):
+        buffer.append((i, i, 2 * i))
+    np.testing.assert_array_equal(buffer.column("x"), [2, 3, 4, 5, 6])
+
+    # a block that wraps past the end of the ring
+    buffer.extend([(i, i, 2 * i) for i in range(7, 10)])
+    np.testing.assert_array_equal(buffer.column("x"), [5, 6, 7, 8, 9])
+    np.testing.assert_array_equal(buffer.column("y1"), [10, 12, 14, 16, 18])
+    assert len(buffer) == 5
+    assert buffer.total_written == 10
+
+    # a block longer than the ring keeps only its tail
+    buffer.extend([(i, i, 2 * i) for i in range(10, 22)])
+    np.testing.assert_array_equal(buffer.column("x"), [17, 18, 19, 20, 21])
+    assert buffer.total_written == 22
+    assert np.shares_memory(buffer.column("x"), buffer._data)
@@ -0,0 +1,33 @@
+import time
+
+from acquisition_scheduler import AcquisitionScheduler
+
+
+def test_overrun_skips_missed_deadlines():
+    """A measurement overrunning by 2.5 slots skips the 2 deadlines it missed and stays on the grid."""
+    scheduler = AcquisitionScheduler(interval=0.02)
+    ticks = []
+    for tick in scheduler.ticks(count=10):
+        ticks.append(tick)
+        if tick.index == 2:
+            time.sleep(0.07)
+
+    assert scheduler.missed == 2
+    assert scheduler.samples == len(ticks) == 8
+    # the samples after the overrun land on later grid slots, not bunched up
+    slots = [round(tick.scheduled / 0.02) for tick in ticks]
+    assert slots == [0, 1, 2, 5, 6, 7, 8, 9]
+    assert all(tick.actual >= tick.scheduled for tick in ticks)
+
+
+def test_jitter_statistics():
+    """Jitter is kept as a running count, total and maximum."""
+    scheduler = AcquisitionScheduler(interval=0.005)
+    ticks = list(scheduler.ticks(count=20))
+
+    assert scheduler.samples == 20
+    jitters = [tick.actual - tick.scheduled for tick in ticks]
+    assert abs(scheduler.jitter_total - sum(jitters)) < 1e-6
+    assert abs(scheduler.jitter_max - max(jitters)) < 1e-6
+    assert 0 <= scheduler.jitter_total / scheduler.samples <= scheduler.jitter_max
+    assert scheduler.summary().startswith("20 samples, 0 missed deadlines, jitter mean")
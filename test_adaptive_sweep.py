@@ -0,0 +1,34 @@
+import numpy as np
+
+from adaptive_sweep import AdaptiveSweep
+
+
+def run(sweep, response):
+    for batch in sweep.batches():
+        for x in batch:
+            sweep.add(x, response(x))
+    return np.sort(sweep.x)
+
+
+def test_refines_around_a_step():
+    """Points added after the coarse grid go to the step, until it is bracketed to the resolution."""
+    sweep = AdaptiveSweep(0, 1, initial_points=11, max_points=41, threshold=0.05)
+    x = run(sweep, lambda x: 1.0 if x > 0.503 else 0.0)
+
+    assert len(x) <= 41
+    grid = np.linspace(0, 1, 11)
+    refined = [value for value in x if not np.isclose(grid, value).any()]
+    assert refined
+    assert all(0.3 < value < 0.7 for value in refined)
+    assert sum(abs(value - 0.503) < 0.05 for value in refined) >= 0.75 * len(refined)
+    above = np.searchsorted(x, 0.503)
+    assert x[above] - x[above - 1] <= 4 * sweep.resolution
+
+
+def test_point_budget():
+    """A response that needs more points than max_points stops at the budget."""
+    sweep = AdaptiveSweep(1, 1000, initial_points=5, max_points=20, threshold=0.01, log=True)
+    x = run(sweep, lambda x: np.sin(20 * np.log10(x)))
+
+    assert len(x) == 20
+    assert x[0] == 1 and x[-1] == 1000
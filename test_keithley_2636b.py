@@ -0,0 +1,40 @@
+import pytest
+
+from keithley_2636B import Keithley2636B
+from simulated_instruments import SIM_ADDRESSES, SimulatedResourceManager
+
+
+def connected(sim):
+    keithley = Keithley2636B(rm=sim)
+    assert keithley.connect(SIM_ADDRESSES["Keithley2636B"])
+    return keithley
+
+
+def test_framed_query_discards_stale_responses(capsys):
+    """Replies left in the output queue are skipped until the one tagged for this query."""
+    sim = SimulatedResourceManager(latency=0, seed=1)
+    instrument = sim.instruments[SIM_ADDRESSES["Keithley2636B"]]
+    keithley = connected(sim)
+    keithley.configure_smu(source_type="Voltage", source_value=0.1, nplc=0.01)
+    keithley.output_on()
+
+    # an unread *IDN? reply and the late answer to an earlier query
+    keithley.smu.write("*IDN?")
+    instrument.reply("#999#1.0e-3")
+
+    current = keithley.measure("Current")
+    assert abs(current - 1e-5) < 1e-6  # 0.1 V across the simulated 10 kOhm
+    assert not instrument._output
+    assert capsys.readouterr().out.count("Discarding stale response") == 2
+
+
+def test_framed_query_gives_up_after_max_stale():
+    """Only max_stale untagged lines are read before the query fails."""
+    sim = SimulatedResourceManager(latency=0, seed=1)
+    instrument = sim.instruments[SIM_ADDRESSES["Keithley2636B"]]
+    keithley = connected(sim)
+    for _ in range(3):
+        instrument.reply("junk")
+
+    with pytest.raises(RuntimeError, match="after 2 stale lines"):
+        keithley._read_until_tag(keithley._next_tag(), max_stale=2)
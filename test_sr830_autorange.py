@@ -0,0 +1,60 @@
+from simulated_instruments import SIM_ADDRESSES, SimulatedResourceManager
+from sr830_controller import SR830Controller
+
+
+def lockin(sensitivity_index):
+    """Simulated SR830 reading about 0.71 mV (1 V at 1 kHz into the 1 kHz RC corner)."""
+    sim = SimulatedResourceManager(latency=0, seed=1)
+    controller = SR830Controller(SIM_ADDRESSES["SR830"], rm=sim)
+    controller.set_reference(1000, 1.0)
+    controller.set_sensitivity(sensitivity_index)
+    return controller
+
+
+def no_wait(seconds):
+    pass
+
+
+def record_sensitivity_changes(controller):
+    changes = []
+    write = controller.inst.write
+
+    def recording_write(command):
+        if command.startswith("SENS "):
+            changes.append(int(command.split()[1]))
+        write(command)
+    controller.inst.write = recording_write
+    return changes
+
+
+def test_overload_steps_the_range_up():
+    """From the 2 nV range the clipped signal overloads; the range goes up a decade at a time."""
+    controller = lockin(0)
+    changes = record_sensitivity_changes(controller)
+    (x, y), full_scale = controller.autorange_settle(sleep=no_wait)
+
+    # 0.2 mV still overloads, 2 mV puts R at 0.35 of full scale: inside the band
+    assert changes == [3, 6, 9, 12, 15, 18]
+    assert full_scale == 2e-3
+    assert 0.3 < abs(complex(x, y)) / full_scale < 0.9
+    assert not controller.overloaded()
+
+
+def test_small_signal_steps_the_range_down():
+    """On the 1 V range the signal is below the band; the range is chosen directly from R."""
+    controller = lockin(26)
+    changes = record_sensitivity_changes(controller)
+    (x, y), full_scale = controller.autorange_settle(sleep=no_wait)
+
+    # one change straight to the lowest range R fits in, none in between
+    assert changes == [17]
+    assert full_scale == 1e-3
+    assert 0.3 < abs(complex(x, y)) / full_scale < 0.9
+
+
+def test_in_range_signal_keeps_the_sensitivity():
+    """A reading already inside the band changes nothing."""
+    controller = lockin(17)
+    (x, y), full_scale = controller.autorange_settle(sleep=no_wait)
+    assert full_scale == 1e-3
+    assert controller.sensitivity_index == 17
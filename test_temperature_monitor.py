@@ -0,0 +1,58 @@
+import threading
+
+from PyQt5.QtCore import Qt
+
+from io_scheduler import InstrumentIOPool
+from lakeshore import LakeShoreController335
+from simulated_instruments import SIM_ADDRESSES, SimulatedResourceManager
+from temperature_monitor import TemperatureMonitor
+from visa_resources import SessionPool
+
+
+def test_monitor_and_stabilize_share_the_lakeshore():
+    """The monitor polls the 335 while stabilize_temperature reads it; no query may overlap another."""
+    address = SIM_ADDRESSES["LakeShore335"]
+    sim = SimulatedResourceManager(latency=0.02, seed=1)
+    instrument = sim.instruments[address]
+
+    # record every query that starts while another is still in flight
+    in_flight = [0]
+    overlaps = []
+    counter_lock = threading.Lock()
+    query = instrument.query
+
+    def watched_query(command):
+        with counter_lock:
+            in_flight[0] += 1
+            if in_flight[0] > 1:
+                overlaps.append(command)
+        try:
+            return query(command)
+        finally:
+            with counter_lock:
+                in_flight[0] -= 1
+    instrument.query = watched_query
+
+    lakeshore = LakeShoreController335(rm=SessionPool(sim))
+    assert lakeshore.connect(address)
+    io_pool = InstrumentIOPool()
+    monitor = TemperatureMonitor(io_pool, interval=0.01)
+    failures = []
+    monitor.reading_failed.connect(
+        lambda name, message: failures.append(message), Qt.DirectConnection)
+    monitor.watch("LakeShore", address, lakeshore.get_temperature, "A")
+
+    monitor.start()
+    try:
+        target = lakeshore.get_temperature("A")
+        lakeshore.set_temperature(target)
+        stable = lakeshore.stabilize_temperature(
+            target, tolerance=0.5, timeout=10, window=1.0, poll_interval=0.01)
+    finally:
+        monitor.stop()
+        io_pool.close()
+
+    assert stable
+    assert overlaps == []
+    assert failures == []
+    assert monitor.latest("LakeShore") is not None
@@ -0,0 +1,45 @@
+import math
+
+from temperature_settling import TemperatureSettler
+
+
+def approach(t):
+    """Exponential approach to 20 °C from 25 °C with a 10 s time constant."""
+    return 20.0 + 5.0 * math.exp(-t / 10.0)
+
+
+def test_eta_and_stability_on_an_exponential_approach():
+    """remaining() predicts the band entry plus the dwell; is_stable() agrees with it."""
+    settler = TemperatureSettler(20.0, tolerance=0.1, window=5.0)
+    stable_at = None
+    for i in range(200):
+        t = i * 0.5
+        settler.add(t, approach(t))
+        if t == 10.0:
+            # 5 exp(-t / 10) reaches 0.1 at t = 39.1 s, then 5 s in the band
+            assert abs(settler.remaining() - (39.1 + 5.0 - 10.0)) < 1.0
+            assert "stable in ~" in settler.status()
+        if settler.is_stable():
+            stable_at = t
+            break
+
+    # first reading in the band is at 39.5 s, stable one window later
+    assert stable_at == 44.5
+    assert settler.remaining() == 0.0
+
+
+def test_passing_through_the_band_is_not_stable():
+    """A temperature crossing the target on its way elsewhere never counts as settled."""
+    settler = TemperatureSettler(20.0, tolerance=0.1, window=5.0)
+    for i in range(40):
+        t = i * 0.5
+        settler.add(t, 15.0 + 0.5 * t)  # passes 20 °C at t = 10 s
+        assert not settler.is_stable()
+
+
+def test_noisy_plateau_outside_the_std_limit():
+    """A plateau on target but noisier than max_std stays unstable."""
+    settler = TemperatureSettler(20.0, tolerance=0.1, window=5.0, max_std=0.01)
+    for i in range(40):
+        settler.add(i * 0.5, 20.0 + (0.05 if i % 2 else -0.05))
+    assert not settler.is_stable()
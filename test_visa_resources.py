@@ -0,0 +1,36 @@
+import threading
+import time
+
+from keithley_2636B import Keithley2636B
+from simulated_instruments import SIM_ADDRESSES, SimulatedResourceManager
+from visa_resources import SessionPool
+
+
+def test_tsp_sweep_leaves_the_gpib_board_free():
+    """A hardware-timed sweep on a GPIB 2636B must not hold the board while it runs."""
+    sim = SimulatedResourceManager(seed=1)
+    # move the 2636B onto the board the Lake Shore sits on
+    address = "GPIB0::26::INSTR"
+    sim.instruments[address] = sim.instruments.pop(SIM_ADDRESSES["Keithley2636B"])
+    pool = SessionPool(sim)
+    keithley = Keithley2636B(rm=pool)
+    assert keithley.connect(address)
+    keithley.configure_smu(nplc=1, source_delay=0)
+    lakeshore = pool.open_resource(SIM_ADDRESSES["LakeShore335"])
+
+    latencies = []
+
+    def poll_neighbour():
+        for _ in range(10):
+            start = time.perf_counter()
+            lakeshore.query("*IDN?")
+            latencies.append(time.perf_counter() - start)
+            time.sleep(0.02)
+
+    neighbour = threading.Thread(target=poll_neighbour)
+    neighbour.start()
+    x, y = keithley.tsp_sweep(start=0, stop=1, steps=30)  # about 0.5 s at 60 Hz
+    neighbour.join()
+
+    assert len(x) == len(y) == 30
+    assert max(latencies) < 0.1
@@ -0,0 +1,194 @@
+import threading
+import time
+from contextlib import nullcontext
+
+# pyvisa.constants.VI_READ_BUF_DISCARD, without importing pyvisa at startup
+VI_READ_BUF_DISCARD = 4
+# IEEE 488.2 status byte bit set while a reply is waiting in the output queue
+MAV = 0x10
+
+
+def bus_of(resource_name):
+    """Shared bus a VISA resource sits on ("GPIB0", ...), or None for point-to-point links."""
+    board = resource_name.split("::", 1)[0].upper()
+    return board if board.startswith("GPIB") else None
+
+
+def exclusive(session):
+    """Context that keeps other threads off `session` for a multi-call transaction.
+
+    A write followed by its read must not have another thread's query in
+    between. Pooled sessions hold their io_lock; any other resource gets a
+    no-op context.
+    """
+    return getattr(session, "io_lock", None) or nullcontext()
+
+
+def wait_for_message(session, timeout, poll_interval=0.02):
+    """Serial-poll `session` until a reply is waiting (MAV), for at most `timeout` s.
+
+    Use this before reading the result of a long instrument-timed
+    operation: a blocking read would hold the GPIB board for the whole
+    operation, while each poll holds it only for the poll itself.
+    """
+    deadline = time.monotonic() + timeout
+    while not session.read_stb() & MAV:
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"No reply within {timeout:.0f} s")
+        time.sleep(poll_interval)
+
+
+class PooledSession:
+    """A driver's handle on a pooled VISA session.
+
+    Attribute access goes straight to the underlying resource, so drivers
+    use it like the object open_resource() normally returns. close() only
+    hands the session back to the pool; it stays open for the next connect.
+
+    Every I/O call (write, read, query, ...) holds the session's io_lock,
+    shared by all handles and threads using the address, so a query is
+    never split by another thread's traffic whoever makes it: an experiment
+    on its worker, the I/O pool or the temperature monitor. On a GPIB board
+    the call also holds the board's lock, since only one device can talk
+    on a board at a time; USB and LAN sessions never wait for it. A read
+    that waits for a long instrument-timed operation would keep the board
+    for all that time, so drivers poll with wait_for_message() first.
+    """
+
+    IO_METHODS = frozenset((
+        "write", "write_raw", "read", "read_raw", "read_bytes", "query",
+        "query_ascii_values", "query_binary_values", "read_stb", "flush", "clear"))
+
+    def __init__(self, pool, key, session, io_lock, bus_lock=None):
+        object.__setattr__(self, "_pool", pool)
+        object.__setattr__(self, "_key", key)
+        object.__setattr__(self, "_session", session)
+        object.__setattr__(self, "io_lock", io_lock)
+        object.__setattr__(self, "_bus_lock", bus_lock)
+
+    def __getattr__(self, name):
+        attr = getattr(self._session, name)
+        if name not in self.IO_METHODS:
+            return attr
+
+        def locked(*args, **kwargs):
+            with self.io_lock, self._bus_lock or nullcontext():
+                return attr(*args, **kwargs)
+        return locked
+
+    def __setattr__(self, name, value):
+        setattr(self._session, name, value)
+
+    def close(self):
+        self._pool.release(self._key)
+
+
+class SessionPool:
+    """Resource manager that opens each VISA address once and shares the session.
+
+    Drop-in for pyvisa.ResourceManager as far as the drivers are concerned
+    (list_resources, open_resource, close). The wrapped resource manager is
+    only created on first use, so constructing drivers costs nothing until
+    something is actually connected. Reopening an address returns the
+    session already open, after a health check (*IDN?) that replaces it if
+    the instrument stopped answering while nobody held it, so reconnects are quick and two
+    drivers never hold separate sessions to one GPIB device.
+    """
+
+    def __init__(self, rm=None, factory=None):
+        self._rm = rm
+        # pyvisa itself is only imported once a resource manager is needed
+        self._factory = factory
+        self._sessions = {}
+        self._in_use = {}
+        self._address_locks = {}
+        # address -> RLock around every I/O call, board -> Lock (see PooledSession)
+        self._io_locks = {}
+        self._bus_locks = {}
+        self._lock = threading.Lock()
+
+    @property
+    def rm(self):
+        with self._lock:
+            if self._rm is None:
+                if self._factory is None:
+                    import pyvisa
+                    self._factory = pyvisa.ResourceManager
+                self._rm = self._factory()
+            return self._rm
+
+    def list_resources(self, *args):
+        return self.rm.list_resources(*args)
+
+    def open_resource(self, address, **kwargs):
+        key = address.upper()
+        with self._lock:
+            address_lock = self._address_locks.setdefault(key, threading.Lock())
+        # different addresses open and health-check in parallel
+        with address_lock:
+            with self._lock:
+                session = self._sessions.get(key)
+                held = self._in_use.get(key, 0)
+            # a session another driver holds is left alone; flushing it could eat its reply
+            if session is not None and not held and not self._healthy(session):
+                with self._lock:
+                    self._discard(key)
+                session = None
+            if session is None:
+                session = self.rm.open_resource(address, **kwargs)
+            with self._lock:
+                self._sessions[key] = session
+                self._in_use[key] = self._in_use.get(key, 0) + 1
+                io_lock = self._io_locks.setdefault(key, threading.RLock())
+                bus = bus_of(key)
+                bus_lock = None if bus is None else self._bus_locks.setdefault(bus, threading.Lock())
+        return PooledSession(self, key, session, io_lock, bus_lock)
+
+    def release(self, key):
+        with self._lock:
+            if self._in_use.get(key):
+                self._in_use[key] -= 1
+
+    def in_use(self, address):
+        """Number of driver handles currently holding the session to `address`."""
+        return self._in_use.get(address.upper(), 0)
+
+    def _healthy(self, session):
+        try:
+            # drop replies a previous user left unread, then make sure it still answers
+            session.flush(VI_READ_BUF_DISCARD)
+            session.query("*IDN?")
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, key):
+        session = self._sessions.pop(key, None)
+        self._in_use.pop(key, None)
+        if session is not None:
+            try:
+                session.close()
+            except Exception:
+                pass
+
+    def close(self):
+        """Close every pooled session and the resource manager."""
+        with self._lock:
+            for key in list(self._sessions):
+                self._discard(key)
+            if self._rm is not None:
+                self._rm.close()
+                self._rm = None
+
+
+_shared_pool = None
+_shared_lock = threading.Lock()
+
+
+def shared_resource_manager():
+    """The process-wide SessionPool used by drivers that are not given a resource manager."""
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = SessionPool()
+        return _shared_pool